@@ -48,10 +48,15 @@ class ArchiveControl(object):
         project_root = self.dit.config.get_project_root()
         #archive_dir = '{}/{}/{}/'.format(project_root, issue_dir, archive_dir)
         archive_dir = os.path.abspath(archive_dir)
+        # packed issues are archived as issue files
+        self.dit.unpack_issues([issue.identifier for issue in issues])
         issue_files = []
         for issue in issues:
             issue_file = '{}/{}/issue-{}.yaml'.format(project_root, issue_dir, issue.identifier)
             issue_files.append(issue_file)
+            log_file = '{}/{}/issue-{}.log'.format(project_root, issue_dir, issue.identifier)
+            if os.path.exists(log_file):
+                issue_files.append(log_file)
 
         try:
             if os.path.exists(archive_dir) is False:
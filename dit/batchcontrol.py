@@ -0,0 +1,357 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit batch operations
+
+Applies a stream of operations, read as JSON Lines, to Dit issues
+without any interactive prompts.
+"""
+
+import json
+
+from common.items import DitIssue
+from common.errors import DitError, ApplicationError
+from common import constants
+
+
+class BatchControl(object):
+    """
+    Applies operations to issues through a DitControl.
+
+    Each input line is a JSON object with an "op" field naming the
+    operation, and the fields of the operation. Issues are referred
+    to with an "issue" field containing an issue name or identifier.
+    A result is written for every operation as a JSON object on its
+    own line, containing the line number of the operation, "ok" and
+    either the result fields or an "error" message. An "id" field of
+    an operation is copied to its result.
+
+    Operations:
+    - add: title, description, type, component, status, release,
+           creator, references, comment
+    - edit: issue, title, description, type, component, comment
+    - comment: issue, comment
+    - reference: issue, reference, comment
+    - assign: issue, release (null for unassigned), comment
+    - start, stop: issue, comment
+    - close: issue, disposition (name or index), comment
+    - remove: issue
+    - show: issue
+    - list: release, status (both optional)
+    """
+    def __init__(self, dit):
+        """
+        Initialize BatchControl.
+
+        Parameters:
+        - dit: DitControl to apply the operations with
+        """
+        self.dit = dit
+        self.operations = {
+            'add': self.add_issue,
+            'edit': self.edit_issue,
+            'comment': self.comment_issue,
+            'reference': self.add_reference,
+            'assign': self.assign_issue,
+            'start': self.start_work,
+            'stop': self.stop_work,
+            'close': self.close_issue,
+            'remove': self.remove_issue,
+            'show': self.show_issue,
+            'list': self.list_issues,
+        }
+        # valid values are read once for the whole batch
+        self._valid_values = None
+
+    def run(self, input_stream, output_stream):
+        """
+        Apply operations read from a stream.
+        Results are written as soon as each operation is applied.
+
+        Parameters:
+        - input_stream: text stream of JSON Lines operations
+        - output_stream: text stream to write the results to
+
+        Returns:
+        - (number of succeeded operations, number of failed operations)
+        """
+        succeeded = 0
+        failed = 0
+        for number, line in enumerate(input_stream, 1):
+            if not line.strip():
+                continue
+            result = self.apply_line(line)
+            result['line'] = number
+            if result['ok']:
+                succeeded += 1
+            else:
+                failed += 1
+            output_stream.write(json.dumps(result, ensure_ascii=False, sort_keys=True) + '\n')
+            output_stream.flush()
+        return succeeded, failed
+
+    def apply_line(self, line):
+        """
+        Apply an operation given as a line of JSON.
+
+        Parameters:
+        - line: JSON object as a string
+
+        Returns:
+        - result as a dictionary, with "ok" set to True or False
+        """
+        try:
+            operation = json.loads(line)
+        except ValueError as e:
+            return {'ok': False, 'error': "Invalid JSON: {}".format(e)}
+        if not isinstance(operation, dict):
+            return {'ok': False, 'error': "Operation is not a JSON object"}
+
+        result = {}
+        if 'id' in operation:
+            result['id'] = operation['id']
+        try:
+            func = self.operations.get(operation.get('op'))
+            if func is None:
+                raise ApplicationError("Unknown operation: {}".format(operation.get('op')))
+            result.update(func(operation) or {})
+            result['ok'] = True
+        except (ApplicationError, TypeError, ValueError, AttributeError) as e:
+            result['ok'] = False
+            result['error'] = getattr(e, 'error_message', None) or str(e)
+        return result
+
+    def add_issue(self, operation):
+        """
+        Add a new issue.
+        """
+        title = operation.get('title')
+        if not isinstance(title, str) or not title:
+            raise ApplicationError("Missing title")
+        valid = self._get_valid_values()
+        issue = DitIssue(title)
+        issue.description = self._get_text(operation, 'description')
+        issue.issue_type = self._get_choice(operation, 'type', valid['types'],
+                                            valid['default_type'])
+        issue.component = self._get_choice(operation, 'component', valid['components'], None)
+        issue.status = self._get_choice(operation, 'status', valid['states'],
+                                        constants.issue_states.UNSTARTED)
+        issue.disposition = ""
+        issue.creator = operation.get('creator') or self.dit.config.get_default_creator()
+        issue.release = self._get_release(operation)
+        issue.references = [str(reference) for reference in operation.get('references', [])]
+        # the issue given is not changed when adding through a dit daemon
+        identifier = self.dit.add_issue(issue, self._get_text(operation, 'comment'))
+        added = self.dit.get_issue_from_cache(identifier)
+        return {'issue': identifier, 'name': added.name if added is not None else None}
+
+    def edit_issue(self, operation):
+        """
+        Change title, description, type or component of an issue.
+        """
+        issue = self.dit.get_issue_content(self._get_identifier(operation))
+        valid = self._get_valid_values()
+        if 'title' in operation:
+            if not operation['title']:
+                raise ApplicationError("Missing title")
+            issue.title = str(operation['title'])
+        if 'description' in operation:
+            issue.description = self._get_text(operation, 'description')
+        if 'type' in operation:
+            issue.issue_type = self._get_choice(operation, 'type', valid['types'], None)
+        if 'component' in operation:
+            issue.component = self._get_choice(operation, 'component',
+                                               valid['components'], None)
+        self.dit.edit_issue(issue, self._get_text(operation, 'comment'))
+        return {'issue': issue.identifier}
+
+    def comment_issue(self, operation):
+        """
+        Add a comment to an issue.
+        """
+        identifier = self._get_identifier(operation)
+        self.dit.add_comment(identifier, self._get_text(operation, 'comment'))
+        return {'issue': identifier}
+
+    def add_reference(self, operation):
+        """
+        Add a reference to an issue.
+        """
+        identifier = self._get_identifier(operation)
+        self.dit.add_reference(identifier, self._get_text(operation, 'reference'),
+                               self._get_text(operation, 'comment'))
+        return {'issue': identifier}
+
+    def assign_issue(self, operation):
+        """
+        Assign an issue to a release, or unassign it.
+        """
+        identifier = self._get_identifier(operation)
+        self.dit.assign_issue(identifier, self._get_release(operation),
+                              self._get_text(operation, 'comment'))
+        return {'issue': identifier}
+
+    def start_work(self, operation):
+        """
+        Start working on an issue.
+        """
+        identifier = self._get_identifier(operation)
+        self.dit.start_work(identifier, self._get_text(operation, 'comment'))
+        return {'issue': identifier}
+
+    def stop_work(self, operation):
+        """
+        Stop working on an issue.
+        """
+        identifier = self._get_identifier(operation)
+        self.dit.stop_work(identifier, self._get_text(operation, 'comment'))
+        return {'issue': identifier}
+
+    def close_issue(self, operation):
+        """
+        Close an issue with a disposition.
+        """
+        identifier = self._get_identifier(operation)
+        dispositions = self._get_valid_values()['dispositions']
+        disposition = operation.get('disposition', 0)
+        if isinstance(disposition, int) and not isinstance(disposition, bool):
+            if not 0 <= disposition < len(dispositions):
+                raise ApplicationError("Invalid disposition: {}".format(disposition))
+            disposition = dispositions[disposition]
+        elif disposition not in dispositions:
+            raise ApplicationError("Invalid disposition: {}".format(disposition))
+        self.dit.close_issue(identifier, disposition, self._get_text(operation, 'comment'))
+        return {'issue': identifier}
+
+    def remove_issue(self, operation):
+        """
+        Remove an issue.
+        """
+        identifier = self._get_identifier(operation)
+        self.dit.drop_issue(identifier)
+        return {'issue': identifier}
+
+    def show_issue(self, operation):
+        """
+        Get content of an issue.
+        """
+        issue = self.dit.get_issue_content(self._get_identifier(operation))
+        return {
+            'issue': issue.identifier,
+            'name': issue.name,
+            'title': issue.title,
+            'description': issue.description,
+            'type': issue.issue_type,
+            'component': issue.component,
+            'status': issue.status,
+            'disposition': issue.disposition,
+            'creator': issue.creator,
+            'created': self._format_time(issue.created),
+            'release': issue.release,
+            'references': list(issue.references or []),
+            'log': [[self._format_time(entry.timestamp), entry.creator,
+                     entry.action, entry.comment] for entry in issue.log],
+        }
+
+    def list_issues(self, operation):
+        """
+        List summaries of open issues, optionally of a release or with a status.
+        """
+        release = operation.get('release')
+        status = operation.get('status')
+        issues = []
+        for item in self.dit.get_items(refresh=False):
+            if not isinstance(item, DitIssue):
+                continue
+            if release is not None and item.release != release:
+                continue
+            if status is not None and item.status != status:
+                continue
+            issues.append({'issue': item.identifier, 'name': item.name, 'title': item.title,
+                           'status': item.status, 'release': item.release})
+        return {'issues': issues}
+
+    def _get_identifier(self, operation):
+        """
+        Get identifier of the issue of an operation.
+
+        Raises:
+        - DitError if the issue is not found
+        """
+        issue_name = operation.get('issue')
+        if not isinstance(issue_name, str) or not issue_name:
+            raise ApplicationError("Missing issue")
+        identifier = self.dit.get_issue_identifier(issue_name)
+        if identifier is None:
+            raise DitError("Unknown issue: {}".format(issue_name))
+        return identifier
+
+    def _get_release(self, operation):
+        """
+        Get release of an operation, None if unassigned.
+
+        Raises:
+        - ApplicationError if the release is not an unreleased release
+        """
+        release = operation.get('release')
+        if release in (None, "", constants.releases.UNASSIGNED):
+            return None
+        if release not in self._get_valid_values()['releases']:
+            raise ApplicationError("Invalid release: {}".format(release))
+        return release
+
+    @staticmethod
+    def _get_text(operation, field):
+        """
+        Get a text field of an operation, empty if not given.
+        """
+        value = operation.get(field)
+        if value is None:
+            return ""
+        return str(value)
+
+    @staticmethod
+    def _get_choice(operation, field, choices, default):
+        """
+        Get a field of an operation, checking it is one of the valid choices.
+
+        Raises:
+        - ApplicationError if the value is not valid
+        """
+        value = operation.get(field)
+        if value in (None, ""):
+            return default
+        if value not in choices:
+            raise ApplicationError("Invalid {}: {}".format(field, value))
+        return value
+
+    @staticmethod
+    def _format_time(timestamp):
+        """
+        Format a timestamp for JSON output.
+        """
+        if hasattr(timestamp, 'isoformat'):
+            return timestamp.isoformat()
+        if timestamp is None:
+            return None
+        return str(timestamp)
+
+    def _get_valid_values(self):
+        """
+        Get valid values of issue fields from the configuration.
+        """
+        if self._valid_values is None:
+            config = self.dit.config
+            app_configs = config.get_app_configs()
+            components = config.get_valid_components() or []
+            self._valid_values = {
+                'types': config.get_valid_issue_types(),
+                'default_type': app_configs.default_issue_type,
+                'states': config.get_valid_issue_states(),
+                'components': [getattr(component, 'name', component)
+                               for component in components],
+                'dispositions': app_configs.issue_dispositions,
+                'releases': config.get_releases(constants.release_states.UNRELEASED, True),
+            }
+        return self._valid_values
@@ -0,0 +1,60 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from common.errors import ApplicationError
+
+
+class CacheLoader(QThread):
+    """
+    A thread reading issue summaries in the background.
+
+    Summaries are read with DitControl.read_summaries and emitted
+    in batches. The batches are added to the cache in the GUI thread,
+    so the cache itself is never used by this thread. The index, the change
+    tracker and the issue parser of DitControl are used by this thread until
+    it has finished, so the GUI disables actions using them meanwhile.
+    """
+    # list of IssueSummary objects, number of issues loaded, total number of issues
+    batch_loaded = pyqtSignal(object, int, int)
+
+    def __init__(self, dit, batch_size=None, parent=None):
+        """
+        Initialize CacheLoader.
+
+        Parameters:
+        - dit: DitControl to read the summaries with
+        - batch_size: (optional) maximum number of summaries in a batch
+        - parent: (optional) parent QObject
+        """
+        super(CacheLoader, self).__init__(parent)
+        self.dit = dit
+        self.batch_size = batch_size
+        self.error_message = None
+
+    def run(self):
+        """
+        Read the summaries, until all are read or loading is cancelled.
+        """
+        try:
+            for summaries, loaded, total in self.dit.read_summaries(self.batch_size):
+                if self.isInterruptionRequested():
+                    break
+                self.batch_loaded.emit(summaries, loaded, total)
+        except ApplicationError as e:
+            self.error_message = e.error_message
+
+    def cancel(self):
+        """
+        Stop loading and wait for the thread to finish.
+        Loading is stopped after the batch being read.
+        """
+        self.requestInterruption()
+        self.wait()
@@ -0,0 +1,188 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import os
+
+
+class ChangeSet(object):
+    """
+    Changes detected in issue files and the project file.
+    """
+    def __init__(self):
+        """
+        Initialize an empty ChangeSet
+        """
+        self.added = {}
+        self.modified = {}
+        self.removed = []
+        self.project_changed = False
+
+    def changed_issues(self):
+        """
+        Get added and modified issue files.
+
+        Returns:
+        - a dictionary of issue identifiers mapped to status information,
+          like in IssueModel.scan_issue_files
+        """
+        changed = dict(self.added)
+        changed.update(self.modified)
+        return changed
+
+    def has_issue_changes(self):
+        """
+        Check if any issue files have changed.
+
+        Returns:
+        - True if issues were added, modified or removed
+        """
+        return bool(self.added or self.modified or self.removed)
+
+    def is_empty(self):
+        """
+        Check if nothing has changed.
+
+        Returns:
+        - True if there are no changes
+        """
+        return not self.has_issue_changes() and not self.project_changed
+
+
+class ChangeTracker(object):
+    """
+    Detects changes in issue files and the project file
+    by comparing file status information between scans.
+    An issue is modified also when its separate log file changes.
+
+    A generation counter is increased on every scan that finds
+    changes. Each tracked file remembers the generation in which
+    it was last changed.
+    """
+    def __init__(self, issuemodel, project_file=None):
+        """
+        Initialize ChangeTracker
+
+        Parameters:
+        - issuemodel: IssueModel used to scan issue files
+        - project_file: (optional) path to the project file to track
+        """
+        self.issuemodel = issuemodel
+        self.project_file = project_file
+        self.generation = 0
+        self.file_stats = {}
+        self.file_generations = {}
+        self.project_stat = None
+        self.project_generation = 0
+
+    def reset(self):
+        """
+        Forget all tracked files.
+        On the next scan every existing file is reported as added.
+        """
+        self.file_stats = {}
+        self.file_generations = {}
+        self.project_stat = None
+
+    def detect_changes(self):
+        """
+        Scan issue files and the project file for changes
+        since the previous scan.
+
+        Returns:
+        - a ChangeSet
+        """
+        changes = ChangeSet()
+        current_stats = self.issuemodel.scan_issue_files()
+
+        for identifier, stat in current_stats.items():
+            old_stat = self.file_stats.get(identifier)
+            if old_stat is None:
+                changes.added[identifier] = stat
+            elif old_stat != stat:
+                changes.modified[identifier] = stat
+        for identifier in self.file_stats:
+            if identifier not in current_stats:
+                changes.removed.append(identifier)
+
+        project_stat = self._get_project_stat()
+        if project_stat != self.project_stat:
+            changes.project_changed = True
+
+        if not changes.is_empty():
+            self.generation += 1
+            for identifier in changes.changed_issues():
+                self.file_generations[identifier] = self.generation
+            for identifier in changes.removed:
+                self.file_generations.pop(identifier, None)
+            if changes.project_changed:
+                self.project_generation = self.generation
+
+        self.file_stats = current_stats
+        self.project_stat = project_stat
+        return changes
+
+    def track(self, file_stats):
+        """
+        Track issue files with given status information, as if they
+        had been found by the previous scan. Used when the issues have
+        been loaded without scanning the issue files.
+
+        Parameters:
+        - file_stats: issue identifiers mapped to status information,
+                      like in IssueModel.scan_issue_files
+        """
+        self.generation += 1
+        self.file_stats = dict(file_stats)
+        self.file_generations = dict.fromkeys(self.file_stats, self.generation)
+
+    def detect_project_change(self):
+        """
+        Check the project file for changes since the previous scan,
+        without scanning the issue files.
+
+        Returns:
+        - a ChangeSet without issue changes
+        """
+        changes = ChangeSet()
+        project_stat = self._get_project_stat()
+        if project_stat != self.project_stat:
+            changes.project_changed = True
+            self.generation += 1
+            self.project_generation = self.generation
+        self.project_stat = project_stat
+        return changes
+
+    def get_file_generation(self, identifier):
+        """
+        Get the generation in which an issue file was last changed.
+
+        Parameters:
+        - identifier: issue hash identifier
+
+        Returns:
+        - generation number
+        - None if the issue file is not tracked
+        """
+        return self.file_generations.get(identifier)
+
+    def _get_project_stat(self):
+        """
+        Get status information of the project file.
+
+        Returns:
+        - (mtime_ns, size) tuple
+        - None if the file doesn't exist
+        """
+        if self.project_file is None:
+            return None
+        try:
+            stat_result = os.stat(self.project_file)
+        except OSError:
+            return None
+        return (stat_result.st_mtime_ns, stat_result.st_size)
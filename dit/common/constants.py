@@ -52,7 +52,8 @@ release_states = Constants(
 issue_states = Constants(
         UNSTARTED='unstarted',
         IN_PROGRESS='in progress',
-        PAUSED='paused'
+        PAUSED='paused',
+        CLOSED='closed'
         )
 
 issue_types = Constants(
@@ -60,3 +61,9 @@ issue_types = Constants(
         TASK='task',
         BUGFIX='bugfix'
         )
+
+write_durability = Constants(
+        NONE='none',
+        FILE='file',
+        BATCH='batch'
+        )
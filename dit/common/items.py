@@ -9,11 +9,68 @@ A GUI frontend for Dit issue tracker
 
 import os
 import datetime
+import collections
 from abc import ABCMeta, abstractmethod
 
 from common import constants
+from common.errors import ApplicationError
+from common.utils.template import template_cache
 import common.utils.time
 
+# directory of the HTML templates
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.realpath(__file__)),
+                            '..', '..', 'ui', 'templates', '')
+
+class LogEntry(collections.namedtuple('LogEntry',
+        ['timestamp', 'creator', 'action', 'comment'])):
+    """
+    An entry in the event log of an item.
+
+    Entries are tuples, so the fields can also be accessed
+    by index, entry[0] being the timestamp and entry[3] the comment.
+    In files log entries are stored as lists.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_lists(cls, log, value_pool=None):
+        """
+        Convert a log read from a file to log entries.
+        Entries not in the expected format are kept as they are.
+
+        Parameters:
+        - log: list of log entries as lists
+        - value_pool: (optional) pool used to intern creators and actions
+
+        Returns:
+        - list of LogEntry objects
+        - None if log is None
+        """
+        if log is None:
+            return None
+        if value_pool is None:
+            return [cls._make(entry) if len(entry) == 4 else entry for entry in log]
+        intern = value_pool.intern
+        return [cls(entry[0], intern(entry[1]), intern(entry[2]), entry[3])
+                if len(entry) == 4 else entry for entry in log]
+
+    @staticmethod
+    def to_lists(log):
+        """
+        Convert log entries to lists for writing to a file.
+
+        Parameters:
+        - log: list of log entries
+
+        Returns:
+        - list of log entries as lists
+        - None if log is None
+        """
+        if log is None:
+            return None
+        return [list(entry) for entry in log]
+
+
 class DitItem(object):
     """
     A Dit item abstract baseclass.
@@ -23,6 +80,7 @@ class DitItem(object):
     particular item or just the type and a title.
     """
     __metaclass__ = ABCMeta
+    __slots__ = ('title', 'log')
 
     @abstractmethod
     def __init__(self, title: str):
@@ -45,9 +103,13 @@ class DitItem(object):
         pass
 
     @abstractmethod
-    def toHtml(self):
+    def toHtml(self, format_times=None):
         """
         Representation of the item's content as HTML.
+
+        Parameters:
+        - format_times: (optional) function formatting a list of timestamps
+                        to strings, common.utils.time.human_time_diffs by default
         """
         pass
 
@@ -61,15 +123,11 @@ class DitItem(object):
         - creator: who made the change
         - comment: (optional) a comment to the log, empty by default
         """
-        log_entry = [] # format: [ timestamp, creator, action, comment ]
         if timestamp is None:
             timestamp = datetime.datetime.now(datetime.timezone.utc)
         if comment is None:
             comment = ''
-        log_entry.append(timestamp)
-        log_entry.append(creator)
-        log_entry.append(action)
-        log_entry.append(comment)
+        log_entry = LogEntry(timestamp, creator, action, comment)
         if not self.log:
             self.log = []
         self.log.append(log_entry)
@@ -90,50 +148,44 @@ class DitItem(object):
         text = '</p>' + text
         return text
 
-    def _format_log_html(self, template_file):
+    def _format_log_html(self, template_file, format_times):
         """
         Format item's event log to HTML according to a given template file
 
         Parameters:
         - template: a HTML template file to use
+        - format_times: function formatting a list of timestamps to strings
 
         Returns:
         - log as HTML
         """
-        if self.log:
-            with open(template_file, 'r') as stream:
-                log_template_html = stream.readlines()
-
-            log_html = ''
-            for entry in self.log:
-                # timestamp, creator, action, comment
-                timestamp = common.utils.time.human_time_diff(entry[0].isoformat(' '))
-                creator = entry[1]
-                action = entry[2]
-                if len(entry) > 3:
-                    comment = self._format_text_to_html(entry[3])
-                else:
-                    comment = ''
-
-                entry_html = ''
-                for line in log_template_html:
-                    line = line.replace('[ACTION]', action, 1)
-                    line = line.replace('[TIMESTAMP]', timestamp, 1)
-                    line = line.replace('[CREATOR]', creator, 1)
-                    line = line.replace('[COMMENT]', comment, 1)
-                    entry_html += line
-
-                log_html += entry_html
-        else:
-            log_html = ''
-
-        return log_html
+        if not self.log:
+            return ''
+
+        template = template_cache.get_template(template_file)
+        output = []
+        timestamps = format_times([entry[0] for entry in self.log])
+        for entry, timestamp in zip(self.log, timestamps):
+            # timestamp, creator, action, comment
+            if len(entry) > 3:
+                comment = self._format_text_to_html(entry[3])
+            else:
+                comment = ''
+            template.render_to(output, {
+                'ACTION': entry[2],
+                'TIMESTAMP': timestamp,
+                'CREATOR': entry[1],
+                'COMMENT': comment,
+            })
+        return ''.join(output)
 
 
 class DitRelease(DitItem):
     """
     A Dit item containing the information of a release.
     """
+    __slots__ = ('name', 'status', 'release_time')
+
     def __init__(self, title, name=None, status=None, release_time=None, log=None):
         """
         Initialize new DitRelease.
@@ -141,7 +193,7 @@ class DitRelease(DitItem):
         super(DitRelease, self).__init__(title)
         self.name = name
         self.status = status
-        self.log = log
+        self.log = LogEntry.from_lists(log)
         if not self.log:
             self.log = []
 
@@ -161,38 +213,37 @@ class DitRelease(DitItem):
         item_str = "{} {}".format(self.name, self.title)
         return item_str
 
-    def toHtml(self):
+    def toHtml(self, format_times=None):
         """
         Representation of the release content as HTML.
-        """
-        my_path = os.path.dirname(os.path.realpath(__file__))
-        release_template_file = my_path + '/../../ui/templates/release_template.html'
-        release_log_template_file = my_path + '/../../ui/templates/release_log_template.html'
-
-        with open(release_template_file, 'r') as stream:
-            template_html = stream.readlines()
 
-        log_html = self._format_log_html(release_log_template_file)
+        Parameters:
+        - format_times: (optional) function formatting a list of timestamps
+                        to strings, common.utils.time.human_time_diffs by default
+        """
+        if format_times is None:
+            format_times = common.utils.time.human_time_diffs
+        template = template_cache.get_template(TEMPLATE_DIR + 'release_template.html')
+        log_html = self._format_log_html(TEMPLATE_DIR + 'release_log_template.html',
+                                         format_times)
 
         release_time = self.release_time_as_string()
         if release_time is None:
             release_time = 'N/A'
 
-        # release html output
-        html = ''
-        for line in template_html:
-            line = line.replace('[NAME]', self.name, 1)
-            line = line.replace('[TITLE]', self.title, 1)
-            if self.status:
-                status = self.status
-            else:
-                status = 'unknown'
-            line = line.replace('[STATUS]', status, 1)
-            line = line.replace('[RELEASE_TIME]', release_time, 1)
-            line = line.replace('[EVENT_LOG]', log_html, 1)
-            html += line
+        if self.status:
+            status = self.status
+        else:
+            status = 'unknown'
 
-        return html
+        # release html output
+        return template.render({
+            'NAME': self.name,
+            'TITLE': self.title,
+            'STATUS': status,
+            'RELEASE_TIME': release_time,
+            'EVENT_LOG': log_html,
+        })
 
     def can_be_archived(self):
         """
@@ -226,7 +277,13 @@ class DitIssue(DitItem):
     The item can contain all data of that particular issue or
     just the type and a title.
     A status is also commonly set for issues.
+
+    Version is the version of the issue file the issue was read from,
+    used to detect if the file has been changed by someone else.
     """
+    __slots__ = ('name', 'issue_type', 'component', 'status', 'disposition', 'description',
+                 'creator', 'created', 'release', 'references', 'identifier', 'version')
+
     def __init__(self, title: str, name=None, issue_type=None, component=None,
             status=None, disposition="", description=None, creator=None, created=None,
             release=None, references=None, identifier=None, log=None):
@@ -251,6 +308,7 @@ class DitIssue(DitItem):
             self.references = []
         self.identifier = identifier
         self.log = log
+        self.version = None
 
     def __str__(self):
         """
@@ -262,7 +320,7 @@ class DitIssue(DitItem):
             name = ""
 
         if self.created:
-            created_ago = common.utils.time.human_time_diff(self.created.isoformat(' '))
+            created_ago = common.utils.time.human_time_diff(self.created)
         else:
             created_ago = "?"
 
@@ -292,9 +350,9 @@ class DitIssue(DitItem):
 
         # event log entries
         if self.log:
-            for entry in self.log:
+            timestamps = common.utils.time.human_time_diffs(entry[0] for entry in self.log)
+            for entry, timestamp in zip(self.log, timestamps):
                 # timestamp, creator, action, comment
-                timestamp = common.utils.time.human_time_diff(entry[0].isoformat(' '))
                 creator = entry[1]
                 action = entry[2]
                 if len(entry) > 3:
@@ -324,19 +382,20 @@ class DitIssue(DitItem):
         return status_color
 
 
-    def toHtml(self):
+    def toHtml(self, format_times=None):
         """
         Representation of the issue content as HTML.
-        """
-        my_path = os.path.dirname(os.path.realpath(__file__))
-        issue_template_file = my_path + '/../../ui/templates/issue_template.html'
-        issue_log_template_file = my_path + '/../../ui/templates/issue_log_entry_template.html'
 
-        with open(issue_template_file, 'r') as stream:
-            template_html = stream.readlines()
+        Parameters:
+        - format_times: (optional) function formatting a list of timestamps
+                        to strings, common.utils.time.human_time_diffs by default
+        """
+        if format_times is None:
+            format_times = common.utils.time.human_time_diffs
+        template = template_cache.get_template(TEMPLATE_DIR + 'issue_template.html')
 
         if self.created:
-            created_ago = common.utils.time.human_time_diff(self.created.isoformat(' '))
+            created_ago = format_times([self.created])[0]
         else:
             created_ago = "?"
 
@@ -345,32 +404,160 @@ class DitIssue(DitItem):
         else:
             release = constants.releases.UNASSIGNED
 
-        references_html = '<ol>'
+        references_html = ['<ol>']
         if self.references:
             for reference in self.references:
-                references_html += "<li>{}</li>\n".format(reference)
-        references_html += '</ol>'
+                references_html.append("<li>{}</li>\n".format(reference))
+        references_html.append('</ol>')
 
-        log_html = self._format_log_html(issue_log_template_file)
+        log_html = self._format_log_html(TEMPLATE_DIR + 'issue_log_entry_template.html',
+                                         format_times)
 
         description = self._format_text_to_html(self.description)
 
-        html = ''
-        for line in template_html:
-            line = line.replace('[NAME]', self.name, 1)
-            line = line.replace('[TITLE]', self.title, 1)
-            line = line.replace('[DESCRIPTION]', description, 1)
-            line = line.replace('[ISSUE_TYPE]', self.issue_type, 1)
-            line = line.replace('[CREATOR]', self.creator, 1)
-            line = line.replace('[STATUS]', self.status, 1)
-            line = line.replace('[STATUS_COLOR]', self._get_status_color(), 1)
-            line = line.replace('[CREATOR]', self.creator, 1)
-            line = line.replace('[CREATED]', created_ago, 1)
-            line = line.replace('[RELEASE]', release, 1)
-            line = line.replace('[COMPONENT]', self.component, 1)
-            line = line.replace('[REFERENCES]', references_html, 1)
-            line = line.replace('[IDENTIFIER]', self.identifier, 1)
-            line = line.replace('[EVENT_LOG]', log_html, 1)
-            html += line
-
-        return html
+        return template.render({
+            'NAME': self.name,
+            'TITLE': self.title,
+            'DESCRIPTION': description,
+            'ISSUE_TYPE': self.issue_type,
+            'STATUS': self.status,
+            'STATUS_COLOR': self._get_status_color(),
+            'CREATOR': self.creator,
+            'CREATED': created_ago,
+            'RELEASE': release,
+            'COMPONENT': self.component,
+            'REFERENCES': ''.join(references_html),
+            'IDENTIFIER': self.identifier,
+            'EVENT_LOG': log_html,
+        })
+
+
+class LazyDitIssue(DitIssue):
+    """
+    A Dit item containing summary information of an issue.
+
+    Rest of the content is read with a loader function the first
+    time any of it is accessed. After that the issue behaves like
+    a normal DitIssue.
+    """
+    __slots__ = ('_loader',)
+
+    LAZY_FIELDS = ('issue_type', 'disposition', 'description', 'creator', 'references', 'log',
+                   'version')
+
+    def __init__(self, title, name=None, status=None, component=None, created=None,
+            release=None, identifier=None, loader=None):
+        """
+        Initialize new LazyDitIssue.
+
+        Parameters:
+        - loader: a function returning a complete DitIssue
+                  for the identifier of this issue
+        """
+        # DitIssue.__init__ would set the lazy fields
+        self.title = title
+        self.name = name
+        self.status = status
+        self.component = component
+        self.created = created
+        self.release = release
+        self.identifier = identifier
+        self._loader = loader
+
+    def __getattr__(self, name):
+        """
+        Load the rest of the issue, when a field not loaded yet is accessed.
+        Called only if the attribute is not found otherwise.
+        """
+        if name in LazyDitIssue.LAZY_FIELDS and self._loader is not None:
+            self._load()
+            return object.__getattribute__(self, name)
+        raise AttributeError("'{}' object has no attribute '{}'".format(
+                self.__class__.__name__, name))
+
+    def is_loaded(self):
+        """
+        Check if the full content of the issue has been loaded.
+
+        Returns:
+        - True if all fields are available without loading
+        """
+        return self._loader is None
+
+    def _load(self):
+        """
+        Load the fields not set yet.
+        Fields already set on this issue are not changed.
+
+        Raises:
+        - any exception raised by the loader
+        """
+        issue = self._loader(self.identifier)
+        for field in LazyDitIssue.LAZY_FIELDS:
+            try:
+                object.__getattribute__(self, field)
+            except AttributeError:
+                setattr(self, field, getattr(issue, field))
+        self._loader = None
+
+    def __reduce__(self):
+        """
+        Pickle the issue without its loader, which may refer to a whole
+        IssueModel. Fields not loaded yet are not loaded for pickling,
+        they can't be loaded in the copy either.
+        """
+        fields = {}
+        for cls in LazyDitIssue.__mro__:
+            for field in getattr(cls, '__slots__', ()):
+                try:
+                    fields[field] = object.__getattribute__(self, field)
+                except AttributeError:
+                    pass
+        if self._loader is not None:
+            fields['_loader'] = _load_copied_issue
+        return (LazyDitIssue, (self.title,), (None, fields))
+
+
+def _load_copied_issue(identifier):
+    """
+    Loader of a copied LazyDitIssue.
+
+    Raises:
+    - ApplicationError always, a copy can't be loaded
+    """
+    raise ApplicationError("Content of a copied issue {} can't be loaded, "
+                           "read the issue again instead".format(identifier))
+
+
+class IssueSummary(collections.namedtuple('IssueSummary',
+        ['identifier', 'title', 'status', 'release', 'component', 'created'])):
+    """
+    Summary information of an issue.
+
+    Contains only the fields needed to list and name issues,
+    so it can be stored in an index or passed between processes
+    cheaply. Status and release are in the readable format used
+    by DitIssue.
+    """
+    __slots__ = ()
+
+    def to_dit_issue(self, loader=None):
+        """
+        Create a new DitIssue containing the summary information.
+
+        Parameters:
+        - loader: (optional) a function returning a complete DitIssue
+                  for an identifier, used to load the rest of the fields
+                  when they are needed
+
+        Returns:
+        - new LazyDitIssue, if a loader is given
+        - new DitIssue with rest of the fields left empty otherwise
+        """
+        if loader is not None:
+            return LazyDitIssue(self.title, self.identifier, status=self.status,
+                    component=self.component, created=self.created, release=self.release,
+                    identifier=self.identifier, loader=loader)
+        return DitIssue(self.title, self.identifier, component=self.component,
+                status=self.status, disposition=None, created=self.created,
+                release=self.release, identifier=self.identifier)
@@ -0,0 +1,93 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Debouncing of events
+
+A burst of events, like file system notifications while
+a version control system updates many files, is coalesced
+into one, handled after the burst has ended.
+"""
+
+import time
+
+
+class Debouncer(object):
+    """
+    Coalesces bursts of events.
+
+    Pending events are due when no new events have arrived within
+    the delay. A continuous stream of events is still handled
+    at latest max_delay after the first pending event.
+    """
+    def __init__(self, delay, max_delay=None):
+        """
+        Initialize Debouncer.
+
+        Parameters:
+        - delay: seconds to wait for more events
+        - max_delay: (optional) maximum seconds to wait after the first
+                     pending event, by default no maximum
+        """
+        self.delay = delay
+        self.max_delay = max_delay
+        self.event_count = 0
+        self.first_event = None
+        self.last_event = None
+
+    def add_event(self, now=None):
+        """
+        Add an event.
+
+        Parameters:
+        - now: (optional) time of the event, from time.monotonic
+
+        Returns:
+        - seconds until the pending events are due
+        """
+        if now is None:
+            now = time.monotonic()
+        if self.event_count == 0:
+            self.first_event = now
+        self.last_event = now
+        self.event_count += 1
+        return self.time_until_due(now)
+
+    def time_until_due(self, now=None):
+        """
+        Get time until the pending events are due.
+
+        Parameters:
+        - now: (optional) current time, from time.monotonic
+
+        Returns:
+        - seconds until due, zero if already due
+        - None if there are no pending events
+        """
+        if self.event_count == 0:
+            return None
+        if now is None:
+            now = time.monotonic()
+        due = self.last_event + self.delay
+        if self.max_delay is not None:
+            due = min(due, self.first_event + self.max_delay)
+        return max(due - now, 0)
+
+    def take(self, now=None):
+        """
+        Take the pending events, if they are due.
+
+        Parameters:
+        - now: (optional) current time, from time.monotonic
+
+        Returns:
+        - number of events coalesced
+        - 0 if there are no pending events, or they are not due yet
+        """
+        if self.time_until_due(now) != 0:
+            return 0
+        count = self.event_count
+        self.event_count = 0
+        self.first_event = None
+        self.last_event = None
+        return count
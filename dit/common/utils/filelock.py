@@ -0,0 +1,102 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Advisory file locks
+
+Cooperating processes, and threads of a process, take an exclusive
+lock on a lock file before modifying the resource it protects.
+The locks are advisory, so they don't stop other programs from
+modifying the resource.
+"""
+
+import os
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows, locking is skipped
+    fcntl = None
+
+
+class FileLock(object):
+    """
+    An exclusive advisory lock held on a lock file.
+
+    The lock is taken with flock on a new open file, so separate
+    FileLocks of the same file exclude each other also within a process.
+    The lock file is created if needed and left in place when released,
+    unless it is removed with remove while the lock is held. A lock
+    taken on a file that was removed meanwhile is taken again on the
+    new file. Used as a context manager, the lock is held within the
+    with block.
+    """
+    def __init__(self, path):
+        """
+        Initialize FileLock.
+
+        Parameters:
+        - path: lock file, None to not lock anything
+        """
+        self.path = path
+        self._fd = None
+
+    def acquire(self):
+        """
+        Take the lock, waiting until it is available.
+
+        Raises:
+        - OSError if the lock file can't be opened or locked
+        """
+        if self.path is None or fcntl is None:
+            return
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+                locked = os.fstat(fd)
+                try:
+                    current = os.stat(self.path)
+                except FileNotFoundError:
+                    current = None
+            except BaseException:
+                os.close(fd)
+                raise
+            if current is not None and (current.st_ino, current.st_dev) == \
+                    (locked.st_ino, locked.st_dev):
+                self._fd = fd
+                return
+            # removed by the previous holder of the lock
+            os.close(fd)
+
+    def remove(self):
+        """
+        Remove the lock file, and release the lock.
+        Can be used only while the lock is held.
+
+        Raises:
+        - OSError if the lock file can't be removed
+        """
+        if self._fd is None:
+            return
+        try:
+            os.remove(self.path)
+        finally:
+            self.release()
+
+    def release(self):
+        """
+        Release the lock, if it is held.
+        """
+        if self._fd is not None:
+            fd = self._fd
+            self._fd = None
+            # closing the file releases the lock
+            os.close(fd)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
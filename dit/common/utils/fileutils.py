@@ -7,7 +7,9 @@ General Python file utilities
 
 import os
 import stat
+import random
 import shutil
+import hashlib
 
 
 def find_file_along_path(filename, path="."):
@@ -90,3 +92,86 @@ def move_files(files, path):
     except (IOError, shutil.Error):
         # undo stuff that was already done?
         raise
+
+def get_cache_directory(path):
+    """
+    Get a directory for locally cached data of a given path.
+
+    The directory is located under the user's cache directory
+    ($XDG_CACHE_HOME or ~/.cache) and it is unique for each
+    given path. The directory is created if it doesn't exist.
+
+    Parameters:
+    - path: path the cached data is related to (for example issue directory)
+
+    Returns:
+    - path to the cache directory
+
+    Raises:
+    - OSError if the directory can't be created
+    """
+    cache_home = os.environ.get('XDG_CACHE_HOME')
+    if not cache_home:
+        cache_home = os.path.join(os.path.expanduser('~'), '.cache')
+    path_hash = hashlib.sha1(os.path.realpath(path).encode('utf-8')).hexdigest()
+    cache_dir = os.path.join(cache_home, 'dit', path_hash)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+def write_file_atomically(path, data, sync=False):
+    """
+    Replace content of a file atomically.
+
+    The data is written to a temporary file in the same directory,
+    which is then renamed over the file. Readers see either the old
+    or the new content, never a partially written file.
+    The temporary file starts with a dot and ends with ".tmp".
+
+    Parameters:
+    - path: file to write
+    - data: text or bytes to write
+    - sync: (optional) flush the data to disk before renaming the file
+
+    Raises:
+    - OSError, IOError
+    """
+    directory, name = os.path.split(path)
+    temp_path = os.path.join(directory, ".{}.{}-{}.tmp".format(
+            name, os.getpid(), random.getrandbits(32)))
+    try:
+        # created like the file itself, so permissions follow umask
+        with open(temp_path, 'xb' if isinstance(data, bytes) else 'x') as stream:
+            stream.write(data)
+            if sync:
+                stream.flush()
+                os.fsync(stream.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def sync_directory(path):
+    """
+    Flush entries of a directory to disk, making renames
+    and new files in it durable.
+    Does nothing on platforms not able to sync directories.
+
+    Parameters:
+    - path: directory to sync
+
+    Raises:
+    - OSError if syncing fails
+    """
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0))
+    except OSError:
+        if os.name == 'nt':
+            return
+        raise
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
@@ -5,10 +5,21 @@
 General utilities for issue handling
 """
 
+from common import constants
+
+
 class IssueUtils(object):
     """
     Class to hold general utils for issue handling
     """
+    # sorting order for issue states, unknown states are sorted last
+    STATE_ORDER = {
+        constants.issue_states.IN_PROGRESS: 0,
+        constants.issue_states.PAUSED: 1,
+        constants.issue_states.UNSTARTED: 2,
+        constants.issue_states.CLOSED: 3
+    }
+
     def __init__(self):
         """
         This class doesn't need to be instantiated.
@@ -26,18 +37,6 @@ class IssueUtils(object):
         Returns:
         - new sorted list
         """
-        issues.sort(key=IssueUtils._status_sorting_func)
+        state_order = IssueUtils.STATE_ORDER.get
+        issues.sort(key=lambda issue: state_order(issue.status, 3))
         return issues
-
-    @staticmethod
-    def _status_sorting_func(issue):
-        """
-        Define sorting order for issue states
-        """
-        state_order = {
-            "in progress": 0,
-            "paused": 1,
-            "unstarted": 2,
-            "closed": 3
-        }
-        return state_order.get(issue.status, 3)
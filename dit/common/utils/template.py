@@ -0,0 +1,121 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Compiled HTML templates
+
+Templates are text files with placeholders like [TITLE].
+A template is compiled once to a list of text fragments and
+placeholder names, and rendered by joining the fragments and
+the values of the placeholders in a single pass.
+"""
+
+import os
+import re
+
+
+class HtmlTemplate(object):
+    """
+    A compiled template.
+
+    Placeholders without a value are left to the output as they are.
+    Values inserted to the output are not searched for placeholders.
+    """
+    PLACEHOLDER_REGEXP = re.compile(r'\[([A-Z_]+)\]')
+
+    def __init__(self, text):
+        """
+        Compile a template.
+
+        Parameters:
+        - text: template text
+        """
+        # even items are text fragments, odd items placeholder names
+        self.parts = self.PLACEHOLDER_REGEXP.split(text)
+        self.placeholders = frozenset(self.parts[1::2])
+
+    def render(self, values):
+        """
+        Render the template.
+
+        Parameters:
+        - values: dictionary of placeholder names mapped to their values,
+                  None values are rendered as empty strings
+
+        Returns:
+        - rendered text
+        """
+        output = []
+        self.render_to(output, values)
+        return ''.join(output)
+
+    def render_to(self, output, values):
+        """
+        Render the template to a list of strings.
+        Used to render many items with the same template
+        and to join all of them at once.
+
+        Parameters:
+        - output: list the rendered strings are appended to
+        - values: dictionary of placeholder names mapped to their values
+        """
+        append = output.append
+        parts = self.parts
+        append(parts[0])
+        for i in range(1, len(parts), 2):
+            name = parts[i]
+            try:
+                value = values[name]
+            except KeyError:
+                value = '[{}]'.format(name)
+            if value is not None:
+                append(value)
+            append(parts[i + 1])
+
+
+class TemplateCache(object):
+    """
+    A cache of compiled templates.
+
+    Templates are read from files and compiled when first used.
+    A template is read again if modification time or size
+    of the file has changed.
+    """
+    def __init__(self):
+        """
+        Initialize TemplateCache.
+        """
+        self._templates = {}
+
+    def get_template(self, template_file):
+        """
+        Get a compiled template.
+
+        Parameters:
+        - template_file: path to a template file
+
+        Returns:
+        - compiled HtmlTemplate
+
+        Raises:
+        - OSError if reading the template file fails
+        """
+        stat = os.stat(template_file)
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = self._templates.get(template_file)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        with open(template_file, 'r') as stream:
+            template = HtmlTemplate(stream.read())
+        self._templates[template_file] = (version, template)
+        return template
+
+    def clear(self):
+        """
+        Remove all templates from the cache.
+        """
+        self._templates = {}
+
+
+# templates used by the items
+template_cache = TemplateCache()
@@ -1,42 +1,132 @@
 #! /usr/bin/env python3
 
+import calendar
 import datetime
-import dateutil.relativedelta
-import dateutil.parser
 
 
-def human_time_diff(date_string, max_elements=2):
+# time units used to explain a time difference, largest first
+TIME_UNITS = ('years', 'months', 'days', 'hours', 'minutes', 'seconds')
+SINGULAR_UNITS = {unit: "1 {}".format(unit[:-1]) for unit in TIME_UNITS}
+
+# adding a month to a date moves it forward at least this much
+SHORTEST_MONTH = datetime.timedelta(days=28)
+
+
+def human_time_diff(timestamp, max_elements=2, now=None):
     """
     Express a time difference in a human understandable form.
     Two timescales are used to explain the difference.
     Rest is just left off as it would provide too much details.
 
-    It's assumed that the times are given in UTC. Any time zone information
-    is disregarded.
+    Naive datetimes are assumed to be in UTC.
 
     Parameters:
-    - date_string: ISO date format datetime to count the difference with current time
+    - timestamp: datetime to count the difference with current time,
+                 or the datetime as an ISO format string
     - max_elements: how many words to use to explain the time difference
+    - now: (optional) time to count the difference to, current time by default
 
     Returns:
     - string explaining the difference, not exact
+    - empty string if timestamp is in the future
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    else:
+        now = _to_utc(now)
+    return _explain(_count_difference(_to_utc(timestamp), now), max_elements)
+
+
+def human_time_diffs(timestamps, max_elements=2, now=None):
+    """
+    Express many time differences in a human understandable form.
+    All differences are counted to the same current time.
+
+    Parameters:
+    - timestamps: iterable of datetimes, see human_time_diff
+    - max_elements: how many words to use to explain each time difference
+    - now: (optional) time to count the differences to, current time by default
+
+    Returns:
+    - list of strings explaining the differences
+    """
+    if now is None:
+        now = datetime.datetime.now(datetime.timezone.utc)
+    else:
+        now = _to_utc(now)
+    return [_explain(_count_difference(_to_utc(timestamp), now), max_elements)
+            for timestamp in timestamps]
+
+
+def _to_utc(timestamp):
+    """
+    Convert a datetime or an ISO format string to an aware UTC datetime.
+    """
+    if isinstance(timestamp, str):
+        timestamp = datetime.datetime.fromisoformat(timestamp)
+    if timestamp.tzinfo is datetime.timezone.utc:
+        return timestamp
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=datetime.timezone.utc)
+    return timestamp.astimezone(datetime.timezone.utc)
+
+
+def _add_months(timestamp, months):
+    """
+    Add calendar months to a datetime.
+    Day of month is limited to the length of the resulting month.
+    """
+    year, month = divmod(timestamp.month - 1 + months, 12)
+    year += timestamp.year
+    month += 1
+    day = timestamp.day
+    if day > 28:
+        day = min(day, calendar.monthrange(year, month)[1])
+    return timestamp.replace(year, month, day)
+
+
+def _count_difference(then, now):
+    """
+    Count a calendar difference between two aware datetimes.
+
+    Whole months are counted like calendar months,
+    rest of the difference as days, hours, minutes and seconds.
+
+    Returns:
+    - tuple of years, months, days, hours, minutes and seconds
+    - None if then is after now
+    """
+    delta = now - then
+    if delta < SHORTEST_MONTH:
+        if delta.days < 0:
+            return None
+        months = 0
+    else:
+        months = (now.year - then.year) * 12 + now.month - then.month
+        start = _add_months(then, months)
+        while now < start:
+            months -= 1
+            start = _add_months(then, months)
+        delta = now - start
+    years, months = divmod(months, 12)
+    hours, seconds = divmod(delta.seconds, 3600)
+    minutes, seconds = divmod(seconds, 60)
+    return (years, months, delta.days, hours, minutes, seconds)
+
+
+def _explain(difference, max_elements):
+    """
+    Explain a counted time difference with the largest time units.
     """
-    yourdate = dateutil.parser.parse(date_string).replace(tzinfo=datetime.timezone.utc)
-    now = datetime.datetime.utcnow().replace(tzinfo=datetime.timezone.utc)
-    timediff = dateutil.relativedelta.relativedelta(now, yourdate) # pylint: disable=W0612
-    elements = 0
-    explanation = ""
-    for unit in ['years', 'months', 'days', 'hours', 'minutes', 'seconds']:
-        # pylint: disable=E0602
-        execdict = {}
-        execdict['timediff'] = timediff
-        exec('diff = timediff.' + unit, execdict) # pylint: disable=W0122
-        if execdict['diff'] > 0:
-            explanation = "{}{} {}".format(explanation, str(execdict['diff']), unit)
-            if execdict['diff'] == 1:
-                explanation = explanation[:-1]
-            elements = elements + 1
-            if elements == max_elements:
+    if difference is None:
+        return ""
+    words = []
+    for unit, value in zip(TIME_UNITS, difference):
+        if value > 0:
+            if value == 1:
+                words.append(SINGULAR_UNITS[unit])
+            else:
+                words.append("{} {}".format(value, unit))
+            if len(words) == max_elements:
                 break
-            explanation += ' '
-    return explanation.rstrip()
+    return ' '.join(words)
@@ -14,7 +14,7 @@ import datetime
 import yaml
 
 from yamlconfig import YamlConfig
-from common.items import DitRelease
+from common.items import DitRelease, LogEntry
 from common.errors import ApplicationError
 from common.utils import fileutils
 from common import constants
@@ -163,6 +163,56 @@ class ConfigControl(object):
             return ''
         return creator
 
+    def get_load_workers(self):
+        """
+        Get number of worker processes to use when reading many issues.
+
+        Returns:
+        - number of workers
+        - None to use one worker per CPU
+        """
+        return getattr(self.get_app_configs(), 'load_workers', None)
+
+    def get_render_cache_size(self):
+        """
+        Get number of issues rendered as HTML to keep in memory.
+
+        Returns:
+        - number of rendered issues
+        - None to use the default size
+        """
+        return getattr(self.get_app_configs(), 'render_cache_size', None)
+
+    def get_write_durability(self):
+        """
+        Get durability mode of issue file writes.
+
+        Returns:
+        - one of constants.write_durability
+        - None to use the default mode
+        """
+        return getattr(self.get_app_configs(), 'write_durability', None)
+
+    def get_separate_logs(self):
+        """
+        Check if event logs of issues are written to separate log files.
+
+        Returns:
+        - True to append log entries to separate log files
+        - False to keep logs in the issue files
+        """
+        return bool(getattr(self.get_app_configs(), 'separate_logs', False))
+
+    def get_issue_snapshot(self):
+        """
+        Check if issues are loaded from a binary snapshot when possible.
+
+        Returns:
+        - True to load issues from a snapshot kept in the cache directory
+        - False to always load issues from the issue files
+        """
+        return bool(getattr(self.get_app_configs(), 'issue_snapshot', False))
+
     def set_project_root(self, project_root):
         """
         Set location of project files.
@@ -211,7 +261,7 @@ class DitConfigModel:
         config_file = "{}/{}".format(self.project_root, self.dit_config_file)
         try:
             with open(config_file, 'r') as stream:
-                self.settings = yaml.load(stream, Loader=yaml.Loader)
+                self.settings = YamlConfig.load(stream)
         except Exception:
             self.settings = DitConfigYaml("", "", "")
             return False
@@ -228,13 +278,14 @@ class DitConfigModel:
         config_file = "{}/{}".format(self.project_root, self.dit_config_file)
         try:
             with open(config_file, 'w') as stream:
-                yaml_data = yaml.dump(self.settings, default_flow_style=False)
+                yaml_data = YamlConfig.dump(self.settings, default_flow_style=False)
                 stream.write(yaml_data)
         except Exception:
             return False
         return True
 
 
+@YamlConfig.register_yaml_object
 class DitConfigYaml(yaml.YAMLObject):
 
     yaml_tag = u'!dit.random.org,2008-03-06/config'
@@ -274,7 +325,7 @@ class AppConfigModel:
         config_file = "{}/{}".format(self.project_root, self.app_config_file)
         try:
             with open(config_file, 'r') as stream:
-                self.settings = yaml.load(stream, Loader=yaml.Loader)
+                self.settings = YamlConfig.load(stream)
         except Exception:
             issue_types = ['bugfix', 'feature', 'task', 'enhancement']
             issue_dispositions = ['fixed', "won't fix", 'reorganized', 'invalid']
@@ -294,7 +345,7 @@ class AppConfigModel:
         config_file = "{}/{}".format(self.project_root, self.app_config_file)
         try:
             with open(config_file, 'w') as stream:
-                yaml_data = yaml.dump(self.settings, default_flow_style=False)
+                yaml_data = YamlConfig.dump(self.settings, default_flow_style=False)
                 stream.write(yaml_data)
         except Exception:
             return False
@@ -333,24 +384,36 @@ class AppConfigModel:
         return states
 
 
+@YamlConfig.register_yaml_object
 class AppConfigYaml(yaml.YAMLObject):
 
     yaml_tag = u'!dit.random.org,2008-03-06/guiconfig'
 
     def __init__(self, window_size, remember_window_size, default_issue_type,
-            issue_types, issue_dispositions):
+            issue_types, issue_dispositions, load_workers=None, render_cache_size=None,
+            write_durability=None, separate_logs=False, issue_snapshot=False):
         self.window_size = window_size
         self.remember_window_size = remember_window_size
         self.default_issue_type = default_issue_type
         self.issue_types = issue_types
         self.issue_dispositions = issue_dispositions
+        self.load_workers = load_workers
+        self.render_cache_size = render_cache_size
+        self.write_durability = write_durability
+        self.separate_logs = separate_logs
+        self.issue_snapshot = issue_snapshot
         super(AppConfigYaml, self).__init__()
 
     def __repr__(self):
         return ("%s (window_size=%r, remember_window_size=%r, default_issue_type=%r,"
-                "issue_types=%r, issue_dispositions=%r)") % (
+                "issue_types=%r, issue_dispositions=%r, load_workers=%r,"
+                "render_cache_size=%r, write_durability=%r, separate_logs=%r,"
+                "issue_snapshot=%r)") % (
                 self.__class__.__name__, self.window_size, self.remember_window_size,
-                self.default_issue_type, self.issue_types, self.issue_dispositions)
+                self.default_issue_type, self.issue_types, self.issue_dispositions,
+                getattr(self, 'load_workers', None), getattr(self, 'render_cache_size', None),
+                getattr(self, 'write_durability', None), getattr(self, 'separate_logs', False),
+                getattr(self, 'issue_snapshot', False))
 
 
 class DitProjectModel:
@@ -376,7 +439,7 @@ class DitProjectModel:
             return False
         try:
             with open(self.project_file, 'r') as stream:
-                self.project_data = yaml.load(stream, Loader=yaml.Loader)
+                self.project_data = YamlConfig.load(stream)
         except Exception:
             return False
         return True
@@ -401,7 +464,7 @@ class DitProjectModel:
                 return False
         try:
             with open(self.project_file, 'w') as stream:
-                yaml_data = yaml.dump(self.project_data, default_flow_style=False)
+                yaml_data = YamlConfig.dump(self.project_data, default_flow_style=False)
                 stream.write(yaml_data)
         except Exception:
             return False
@@ -536,11 +599,11 @@ class DitProjectModel:
             release_data['name'] = release.title
             release_data['status'] = self._string_to_release_status(release.status)
             release_data['release_time'] = release.release_time_as_string()
-            release_data['log_events'] = release.log
+            release_data['log_events'] = LogEntry.to_lists(release.log)
         else:
             status = self._string_to_release_status(release.status)
             release_yaml = DitReleaseYaml(release.title, status,
-                    release.release_time_as_string(), release.log)
+                    release.release_time_as_string(), LogEntry.to_lists(release.log))
             self.project_data.releases.append(release_yaml)
         return True
 
@@ -566,7 +629,7 @@ class DitProjectModel:
             release_data['status'] = self._string_to_release_status(constants.release_states.RELEASED)
             release.release_time = datetime.datetime.now(datetime.timezone.utc)
             release_data['release_time'] = release.release_time_as_string()
-            release_data['log_events'] = release.log
+            release_data['log_events'] = LogEntry.to_lists(release.log)
             return True
         return False
 
@@ -657,6 +720,7 @@ class DitProjectModel:
         return None
 
 
+@YamlConfig.register_yaml_object
 class DitProjectYaml(yaml.YAMLObject):
 
     yaml_tag = u'!dit.random.org,2008-03-06/project'
@@ -679,6 +743,7 @@ class DitProjectYaml(yaml.YAMLObject):
     #def __setitem__(self, key, item):
     #    eval("self.{} = item".format(key))
 
+@YamlConfig.register_yaml_object
 class DitComponentYaml(yaml.YAMLObject):
 
     yaml_tag = u'!dit.random.org,2008-03-06/component'
@@ -692,6 +757,7 @@ class DitComponentYaml(yaml.YAMLObject):
                 self.__class__.__name__, self.name)
 
 
+@YamlConfig.register_yaml_object
 class DitReleaseYaml(yaml.YAMLObject):
 
     yaml_tag = u'!dit.random.org,2008-03-06/release'
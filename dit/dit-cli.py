@@ -5,31 +5,32 @@
 Dit commandline client
 """
 
+import os
 import sys
 import getopt
-import textwrap
 import datetime
 from enum import Enum
 
-from pick import pick
-
+# only modules needed by every command are imported here, rest are
+# imported when needed, so simple and scripted commands start fast
 from common import constants
 from common.items import DitRelease, DitIssue
 from common.errors import DitError, ApplicationError
-from ditcontrol import DitControl
-from config import ConfigControl
-from cli.completer import Completer
 
 class DitCommands:
     """A helper class for parsing command line commands and their parameters"""
     class CommandEnum(Enum):
         ADD = 'add'
         ASSIGN = 'assign'
+        BATCH = 'batch'
         CLOSE = 'close'
         COMMENT = 'comment'
+        DAEMON = 'daemon'
+        GC = 'gc'
         INIT = 'init'
         LIST = 'list'
         LIST_IDS = 'list-ids'
+        REINDEX = 'reindex'
         REMOVE = 'remove'
         SHOW = 'show'
         START = 'start'
@@ -47,13 +48,20 @@ class DitCommands:
                                           self.CommandEnum.START.value,
                                           self.CommandEnum.STOP.value]
         self.commands_with_no_params = [self.CommandEnum.ADD.value,
+                                        self.CommandEnum.BATCH.value,
+                                        self.CommandEnum.DAEMON.value,
+                                        self.CommandEnum.GC.value,
                                         self.CommandEnum.INIT.value,
                                         self.CommandEnum.LIST.value,
                                         self.CommandEnum.LIST_IDS.value,
+                                        self.CommandEnum.REINDEX.value,
                                         self.CommandEnum.ADD_COMPONENT.value,
                                         self.CommandEnum.LIST_COMPONENTS.value,
                                         self.CommandEnum.REMOVE_COMPONENT.value]
         self.commands_all = self.commands_with_issue_param + self.commands_with_no_params
+        self.config_commands = [self.CommandEnum.ADD_COMPONENT.value,
+                                self.CommandEnum.LIST_COMPONENTS.value,
+                                self.CommandEnum.REMOVE_COMPONENT.value]
 
 class Status:
     """A simple class to encapsulate error codes."""
@@ -74,9 +82,36 @@ class DitCli:
         self.commands = DitCommands()
         self.command = None
         self.issue_name = None
+        self.config = None
+        self.dit = None
+
+    def create_config(self):
+        """
+        Create the configuration object, not loaded yet.
+        """
+        from config import ConfigControl
         self.config = ConfigControl()
 
-    def load_configs(self):
+    def load_configs(self, load_issues=True):
+        """
+        Load configuration and issues.
+
+        If a dit daemon is running for the project, it is used instead,
+        unless DIT_NO_DAEMON environment variable is set.
+
+        Parameters:
+        - load_issues: (optional) False to load only the configuration,
+                       for commands not using the issues
+        """
+        if not os.environ.get('DIT_NO_DAEMON'):
+            from ditdaemon import DaemonClient
+            dit = DaemonClient.connect_to_project()
+            if dit is not None:
+                self.dit = dit
+                self.config = dit.config
+                return
+
+        self.create_config()
         try:
             self.config.load_configs()
         except ApplicationError as e:
@@ -91,7 +126,9 @@ class DitCli:
                 print(e.error_message)
             sys.exit(1)
 
-        self.dit = DitControl(self.config)
+        if load_issues:
+            from ditcontrol import DitControl
+            self.dit = DitControl(self.config)
 
     def get_user_input(self, prompt):
         value = input(prompt)
@@ -120,17 +157,20 @@ class DitCli:
         return '\n'.join(lines)
 
     def get_user_input_complete(self, prompt, options):
+        from cli.completer import Completer
         completer = Completer(options)
         completer.enable()
         return input(prompt)
         #TODO: disable completer?
 
     def get_user_list_input(self, prompt, options):
+        from pick import pick
         option, _ = pick(options, prompt)
         print(prompt + option)
         return option
 
     def get_user_list_input_index(self, prompt, options):
+        from pick import pick
         option, index = pick(options, prompt)
         print(prompt + option)
         return index
@@ -141,6 +181,7 @@ class DitCli:
         #TODO: improve error handling
         #TODO: check that GUI still works (it may need some changes I have forgotten already)
 
+        self.create_config()
         default_issue_dir = 'issues'
         name = self.get_user_input("Name: ")
         email = self.get_user_input("Email: ")
@@ -168,6 +209,43 @@ class DitCli:
             print("Writing project file failed")
             sys.exit(1)
 
+    def run_daemon(self):
+        """
+        Serve the project to other dit commands until interrupted.
+        """
+        import signal
+        from ditcontrol import DitControl
+        from ditdaemon import DitDaemon, get_socket_path
+        self.create_config()
+        try:
+            self.config.load_configs()
+            self.dit = DitControl(self.config)
+            daemon = DitDaemon(self.dit, get_socket_path(self.config.get_project_root()))
+            daemon.start()
+        except (ApplicationError, OSError) as e:
+            print("Error starting dit daemon: {}".format(getattr(e, 'error_message', e)))
+            return Status.INTERNAL_ERROR
+        print("Dit daemon listening on {}".format(daemon.socket_path))
+        # the socket is removed also when terminated
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(Status.OK))
+        try:
+            daemon.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return Status.OK
+
+    def run_batch(self):
+        """
+        Apply operations read as JSON Lines from standard input,
+        writing a JSON Lines result of each to standard output.
+        """
+        from batchcontrol import BatchControl
+        batch = BatchControl(self.dit)
+        _, failed = batch.run(sys.stdin, sys.stdout)
+        if failed:
+            return Status.DB_ERROR
+        return Status.OK
+
     def add_issue(self):
         """Add new issue to database.
            Read issue input from user, and add new ticket to database."""
@@ -238,11 +316,13 @@ class DitCli:
         items = self.dit.get_items()
         max_name_width = self.dit.get_issue_name_max_len()
 
+        # printed at once, as printing each line is slow with many issues
+        lines = []
         for item in items:
             icon = ' '
             if isinstance(item, DitRelease):
                 # add one empty line as a spacer before releases
-                print("")
+                lines.append("")
                 icon = ''
             # set icon to the added item
             if isinstance(item, DitIssue):
@@ -253,22 +333,43 @@ class DitCli:
                 elif item.status == 'paused':
                     icon = '-'
                 else:
-                    print("Unrecognized issue status ({})".format(item.status))
+                    lines.append("Unrecognized issue status ({})".format(item.status))
             if item.name is None:
                 title = item.title
             else:
                 title = "{0}{1:<{2}}{3}".format(icon, item.name, max_name_width + 1, item.title)
-            print(title)
+            lines.append(title)
+        if lines:
+            print('\n'.join(lines))
         return items
 
     def list_issue_ids(self):
         """List issue identifiers in database."""
-        for item in self.dit.get_items():
-            if isinstance(item, DitIssue):
-                print(item.identifier)
+        identifiers = [item.identifier for item in self.dit.get_items()
+                       if isinstance(item, DitIssue)]
+        if identifiers:
+            print('\n'.join(identifiers))
+
+    def reindex(self):
+        """Rebuild the issue index from issue files."""
+        try:
+            self.dit.reindex()
+        except (DitError, ApplicationError) as e:
+            print("Error rebuilding issue index: {}".format(e.error_message))
+
+    def pack_issues(self):
+        """Move closed issues to the issue pack."""
+        try:
+            count = self.dit.pack_issues()
+        except (DitError, ApplicationError) as e:
+            print("Error packing issues: {}".format(e.error_message))
+            return Status.DB_ERROR
+        print("Packed {} issues".format(count))
+        return Status.OK
 
     def show_issue(self, issue_name):
         """Show content of an issue by identifier."""
+        import textwrap
         try:
             issue = self.dit.get_issue_content(issue_name)
         except NameError:
@@ -442,10 +543,14 @@ class DitCli:
         print("Commands:")
         print(" add                 : add new issue")
         print(" assign              : assign issue to a release")
+        print(" batch               : apply JSON Lines operations from standard input")
         print(" close               : close an issue")
         print(" comment             : add a comment to an issue")
+        print(" daemon              : keep issues loaded to speed up other commands")
+        print(" gc                  : move closed issues to the issue pack")
         print(" list                : list state and titles of all issues in database")
         print(" list_ids            : list identifiers of all issues in database")
+        print(" reindex             : rebuild the issue index")
         print(" remove              : remove an issue from database")
         print(" show                : show content of one issue")
         print(" start               : start work on an issue")
@@ -511,15 +616,21 @@ class DitCli:
             self.add_issue()
         elif self.command == self.commands.CommandEnum.ASSIGN.value:
             self.assign_issue(self.issue_name)
+        elif self.command == self.commands.CommandEnum.BATCH.value:
+            return self.run_batch()
         elif self.command == self.commands.CommandEnum.CLOSE.value:
             self.close_issue(self.issue_name)
         elif self.command == self.commands.CommandEnum.COMMENT.value:
             self.comment_issue(self.issue_name)
+        elif self.command == self.commands.CommandEnum.GC.value:
+            return self.pack_issues()
         # INIT command is not executed from here
         elif self.command == self.commands.CommandEnum.LIST.value:
             self.list_items()
         elif self.command == self.commands.CommandEnum.LIST_IDS.value:
             self.list_issue_ids()
+        elif self.command == self.commands.CommandEnum.REINDEX.value:
+            self.reindex()
         elif self.command == self.commands.CommandEnum.REMOVE.value:
             self.remove_issue(self.issue_name)
         elif self.command == self.commands.CommandEnum.SHOW.value:
@@ -542,13 +653,18 @@ def main(argv):
     """Main function for Dit CLI"""
     dit_cli = DitCli()
     err = dit_cli.parse_options(argv)
-    if err:
+    if err or dit_cli.command is None:
+        # failed, or only help was requested
         return err
 
     if dit_cli.command == dit_cli.commands.CommandEnum.INIT.value:
         return dit_cli.init_dit()
+    if dit_cli.command == dit_cli.commands.CommandEnum.DAEMON.value:
+        return dit_cli.run_daemon()
 
-    dit_cli.load_configs()
+    if dit_cli.config is None:
+        # component commands use only the project configuration
+        dit_cli.load_configs(dit_cli.command not in dit_cli.commands.config_commands)
     return dit_cli.run_command()
 
 
@@ -16,6 +16,8 @@ directory can be kept under version control, alongside project code.
 
 import sys
 import os
+import time
+import functools
 from PyQt5 import QtWidgets, QtGui, uic
 from PyQt5.QtCore import QModelIndex
 
@@ -25,6 +27,9 @@ from common.unused import unused
 from common import constants
 from config import ConfigControl, MOVE_UP, MOVE_DOWN
 from ditcontrol import DitControl
+from itemlistmodel import ItemListModel
+from cacheloader import CacheLoader
+from filewatcher import FileWatcher
 from archivecontrol import ArchiveControl
 from comment_dialog import CommentDialog
 from reference_dialog import ReferenceDialog
@@ -39,6 +44,9 @@ class DitGui(QtWidgets.QMainWindow):
     """
     The main window
     """
+    # minimum time between updates of the list while loading, in seconds
+    LIST_UPDATE_INTERVAL = 0.2
+
     def __init__(self):
         """
         Initialize user interface
@@ -68,12 +76,16 @@ class DitGui(QtWidgets.QMainWindow):
                 print(e.error_message)
                 sys.exit(1)
 
-        self.dit = DitControl(self.config)
+        # issues are loaded in the background after the window is shown
+        self.dit = DitControl(self.config, load_cache=False)
+        self.loader = None
+        self.list_updated = 0.0
 
         self.my_path = os.path.dirname(os.path.realpath(__file__))
         uic.loadUi(self.my_path + '/../ui/main_window.ui', self)
 
-        self.reload_data()
+        self.item_model = ItemListModel(self.my_path + '/../graphics/list/balls', self)
+        self.listViewDitItems.setModel(self.item_model)
 
         self.actions = {}
 
@@ -84,6 +96,12 @@ class DitGui(QtWidgets.QMainWindow):
         self.enable_valid_actions()
 
         self.show_main_window()
+        self.load_data()
+
+        # issues changed outside of Dit GUI are updated to the list
+        self.file_watcher = FileWatcher([self.config.get_issue_directory(),
+                                         self.config.projectconfig.project_file], self)
+        self.file_watcher.changed.connect(self.files_changed)
 
     def show_main_window(self):
         """
@@ -226,14 +244,15 @@ class DitGui(QtWidgets.QMainWindow):
         self.actions['open_settings'].triggered.connect(self.open_settings)
 
         # connect qt creator created actions
-        self.actionReload.triggered.connect(self.reload_data)
+        self.actionReload.triggered.connect(self.load_data)
         self.actionSettings.triggered.connect(self.open_settings)
         self.actionExit.triggered.connect(self.quit_application)
 
-        # main listwidget actions
-        self.listWidgetDitItems.clicked.connect(self.show_item)
-        self.listWidgetDitItems.itemSelectionChanged.connect(self.show_item)
-        self.listWidgetDitItems.customContextMenuRequested.connect(self.context_menu)
+        # main listview actions
+        self.listViewDitItems.clicked.connect(self.show_item)
+        self.listViewDitItems.selectionModel().currentChanged.connect(
+                lambda current, previous: self.show_item(current))
+        self.listViewDitItems.customContextMenuRequested.connect(self.context_menu)
 
     def add_action_shortcuts(self):
         """
@@ -255,7 +274,16 @@ class DitGui(QtWidgets.QMainWindow):
         Enabled (toolbar) actions that are valid at the moment.
         Only common actions and actions valid for an item currently selected
         should be enabled. Others are disabled.
+        While issues are loaded in the background, issue and release
+        actions are disabled, so the loader is the only user of the index.
         """
+        loading = self.loader is not None
+        self.actions['new_issue'].setEnabled(not loading)
+        self.actions['new_release'].setEnabled(not loading)
+        if loading:
+            self._set_issue_actions(False)
+            self._set_release_actions(False)
+            return
         issue = self._get_selected_issue()
         release_name = self._get_selected_release_name()
         if issue:
@@ -421,45 +449,63 @@ class DitGui(QtWidgets.QMainWindow):
         # other common actions
         self.toolBar.addAction(self.actions['open_settings'])
 
-    def reload_data(self, dit_id=None):
-        data = self.dit.get_items()
-        self.listWidgetDitItems.clear()
-
-        max_name_width = self.dit.get_issue_name_max_len()
+    def load_data(self):
+        """
+        Load all issues again in the background.
+        Loading already in progress is cancelled.
+        """
+        self._cancel_loading()
+        self.dit.clear_cache()
+        self._update_list()
+        loader = CacheLoader(self.dit, parent=self)
+        loader.batch_loaded.connect(functools.partial(self._add_loaded_batch, loader))
+        loader.finished.connect(functools.partial(self._loading_finished, loader))
+        self.loader = loader
+        self.statusBar().showMessage("Loading issues...")
+        self.enable_valid_actions()
+        loader.start()
 
-        for item in data:
-            if isinstance(item, DitRelease) and self.listWidgetDitItems.count() > 0:
-                # add one empty line as a spacer (except on the first line)
-                self.listWidgetDitItems.addItem("")
-            if item.name is None:
-                title = item.title
-            else:
-                title = "{0:<{1}}{2}".format(item.name, max_name_width + 1, item.title)
-            self.listWidgetDitItems.addItem(title)
-
-            # set icon to the added item
-            list_item = self.listWidgetDitItems.item(self.listWidgetDitItems.count() - 1)
-            if isinstance(item, DitIssue):
-                if item.status == 'unstarted':
-                    list_item.setIcon(QtGui.QIcon(self.my_path + '/../graphics/list/balls/new.png'))
-                elif item.status == 'in progress':
-                    list_item.setIcon(QtGui.QIcon(self.my_path + '/../graphics/list/balls/started.png'))
-                elif item.status == 'paused':
-                    list_item.setIcon(QtGui.QIcon(self.my_path + '/../graphics/list/balls/paused.png'))
-                else:
-                    print("Unrecognized issue status ({})".format(item.status))
+    def reload_data(self, dit_id=None):
+        if self.loader is not None:
+            # show the issues loaded so far, rest are added as they are loaded
+            self._update_list()
+        else:
+            # only the changed rows are updated to the list view
+            self.item_model.set_items(self.dit.get_items(), self.dit.get_issue_name_max_len())
 
         if dit_id:
             self.show_item(dit_id)
 
+    def files_changed(self, count):
+        """
+        Issue files or the project file have been changed outside of Dit GUI.
+        Only the changed issues are read again.
+        """
+        unused(count)
+        self.reload_data()
+        if self.loader is None:
+            # the shown issue may have changed
+            self.show_item()
+
     def show_item(self, dit_id=None):
+        if self.loader is not None:
+            # issues are read by the loader, the item is shown when it has finished
+            self.textEditDitItem.setHtml("Loading issues...")
+            self.enable_valid_actions()
+            return
+        html = None
         if not dit_id or isinstance(dit_id, QModelIndex):
             # needed so the same function can be connected to GUI
             dit_item = self._get_selected_issue()
+            if dit_item:
+                # rendered issues are cached, the issue is read only if it has changed
+                html = self.dit.get_issue_html(dit_item.identifier)
         else:
             dit_item = self.dit.get_issue_content(dit_id)
-        if dit_item:
-            self.textEditDitItem.setHtml(dit_item.toHtml())
+            if dit_item:
+                html = dit_item.toHtml()
+        if html is not None:
+            self.textEditDitItem.setHtml(html)
         else:
             release_name = self._get_selected_release_name()
             if release_name:
@@ -701,12 +747,65 @@ class DitGui(QtWidgets.QMainWindow):
 
     def closeEvent(self, event):
         unused(event)
+        self._cancel_loading()
         self._save_window_size()
 
     def quit_application(self):
+        self._cancel_loading()
         self._save_window_size()
         QtWidgets.qApp.quit()
 
+    def _add_loaded_batch(self, loader, summaries, loaded, total):
+        """
+        Add a batch of issues loaded in the background to the cache.
+        The list is updated at most every LIST_UPDATE_INTERVAL seconds.
+        """
+        if loader is not self.loader:
+            # left from a cancelled loading
+            return
+        self.dit.add_summaries(summaries)
+        self.statusBar().showMessage("Loading issues {}/{}".format(loaded, total))
+        if time.monotonic() - self.list_updated >= self.LIST_UPDATE_INTERVAL:
+            self._update_list()
+
+    def _loading_finished(self, loader):
+        """
+        Loading issues in the background has finished.
+        """
+        if loader is not self.loader:
+            return
+        self.loader = None
+        loader.deleteLater()
+        if loader.error_message is not None:
+            self._update_list()
+            self.enable_valid_actions()
+            self.statusBar().showMessage("Loading issues failed: " + loader.error_message)
+            return
+        self.statusBar().clearMessage()
+        # issue files changed during loading are read again
+        self.reload_data()
+        self.show_item()
+
+    def _cancel_loading(self):
+        """
+        Cancel loading issues in the background, if in progress.
+        """
+        loader = self.loader
+        if loader is None:
+            return
+        self.loader = None
+        loader.cancel()
+        loader.deleteLater()
+
+    def _update_list(self):
+        """
+        Show the cached issues in the list, without reading changed issue files.
+        """
+        self.dit.sort_cache()
+        self.item_model.set_items(self.dit.get_items(refresh=False),
+                                  self.dit.get_issue_name_max_len())
+        self.list_updated = time.monotonic()
+
     def _get_selected_issue_name(self):
         issue = self._get_selected_issue()
         if not issue:
@@ -728,45 +827,25 @@ class DitGui(QtWidgets.QMainWindow):
                         "Writing application configuration file failed")
 
     def _get_selected_issue_status(self):
-        text = self._get_selected_item_text()
-        if not text:
+        issue = self._get_selected_issue()
+        if not issue:
             return None
-        return self._get_issue_status(text)
+        return issue.status
 
     def _get_selected_release_name(self):
-        text = self._get_selected_item_text()
-        if not text or text == '':
-            return None
-        columns = text.split()
-        if len(columns) < 2:
+        item = self.item_model.get_item(self.listViewDitItems.currentIndex())
+        if not isinstance(item, DitRelease):
             return None
-        if columns[1] not in self.dit.config.get_releases(constants.release_states.UNRELEASED, True):
-            return None
-        return columns[1]
-
-    def _get_selected_item_text(self):
-        item = self.listWidgetDitItems.currentItem()
-        if not item:
-            return None
-        text = str(item.text())
-        if text == "":
-            return None
-        return text
-
-    def _get_issue_status(self, item_text):
-        if not item_text:
+        if item.title not in self.dit.config.get_releases(constants.release_states.UNRELEASED, True):
             return None
-        dit_id = item_text.split(' ', 1)[0]
-        item_status = self.dit.get_issue_status_by_dit_id(dit_id)
-        return item_status
+        return item.title
 
     def _get_selected_issue(self):
-        item_text = self._get_selected_item_text()
-        if not item_text:
+        item = self.item_model.get_item(self.listViewDitItems.currentIndex())
+        if not isinstance(item, DitIssue):
             return None
-        dit_id = item_text.split(' ', 1)[0]
-        item = self.dit.get_issue_from_cache(dit_id)
-        return item
+        # the row may refer to an issue since replaced in the cache
+        return self.dit.get_issue_from_cache(item.identifier)
 
 
 def main():
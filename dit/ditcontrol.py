@@ -7,15 +7,23 @@ Dit GUI
 A GUI frontend for Dit issue tracker
 """
 
+import os
+import time
 import datetime
+import threading
 
 from config import ConfigControl
 from itemcache import ItemCache
-from common.items import DitRelease
+from rendercache import RenderCache
+from common.items import DitRelease, IssueSummary, LogEntry
 from common.errors import ApplicationError, DitError
 from common.utils.issue import IssueUtils
+from common.utils import fileutils
 from common import constants
 from issuemodel import IssueModel, IssueYamlObject
+from issueindex import IssueIndex
+from issuesnapshot import IssueSnapshot
+from changetracker import ChangeTracker
 
 
 class DitControl(object):
@@ -23,49 +31,335 @@ class DitControl(object):
     This class handles communication to Dit command line interface.
     Dit issue data is read using the Dit command line tool.
     """
-    def __init__(self, config):
+    # fields of an issue set when it is edited
+    EDITABLE_FIELDS = ('title', 'issue_type', 'component', 'status', 'disposition',
+                       'description', 'release')
+
+    # a snapshot is not written if the issue directory has been
+    # modified this recently, as a change in the same timestamp
+    # granularity wouldn't change the fingerprint
+    SNAPSHOT_SETTLE_TIME_NS = 2 * 10**9
+
+    def __init__(self, config, load_cache=True):
         """
         Initialize
 
         Parameters:
         - config: ConfigControl object containing valid configuration values
+        - load_cache: (optional) load the cache now, if False the cache is
+                      left empty to be loaded later with reload_cache or
+                      in batches with read_summaries
         """
         if not isinstance(config, ConfigControl):
             raise ApplicationError('Construction failed due to invalid config parameter')
         self.config = config
-        self.issuemodel = IssueModel(self.config.get_issue_directory())
+        self.issuemodel = IssueModel(self.config.get_issue_directory(),
+                                     self.config.get_load_workers(),
+                                     self.config.get_write_durability(),
+                                     self.config.get_separate_logs())
+        self.issueindex = IssueIndex(self.issuemodel)
+        self.changetracker = ChangeTracker(self.issuemodel,
+                self.config.projectconfig.project_file)
         self.item_cache = ItemCache()
-        self.reload_cache()
+        self.issuemodel.value_pool = self.item_cache.value_pool
+        self.render_cache = RenderCache(self.config.get_render_cache_size())
+        self.snapshot = None
+        self.snapshot_file = None
+        if self.config.get_issue_snapshot():
+            try:
+                self.snapshot_file = os.path.join(
+                        fileutils.get_cache_directory(self.issuemodel.issue_dir),
+                        'snapshot.bin')
+            except OSError:
+                pass
+        self._snapshot_writer = None
+        if load_cache:
+            self.reload_cache()
 
     def reload_cache(self):
         """
         Get basic information for all issues in the system.
         Cache that information to memory.
+
+        Summaries of the issues are read from the issue index,
+        so only issue files changed since the last time are parsed.
+        Descriptions and logs are not read, the full content of an issue
+        is loaded when needed with get_issue_content.
+
+        If issue snapshots are enabled, and the issue directory hasn't
+        been changed since the snapshot was written, the issues are
+        read from the snapshot instead, when they are needed. Issue files
+        are still scanned, and the issues changed since the snapshot was
+        written, like files edited in place, are read again. Otherwise
+        a new snapshot is written in the background.
+        """
+        self.clear_cache()
+        self.changetracker.reset()
+        fingerprint = None
+        if self.snapshot_file is not None:
+            fingerprint = self.issuemodel.get_directory_fingerprint()
+            if fingerprint is not None and self._load_snapshot(fingerprint):
+                self.refresh_cache()
+                return
+        scanned = time.time_ns()
+        self.changetracker.detect_changes()
+        summaries = self.issueindex.get_summaries(self.changetracker.file_stats)
+        self.add_summaries(summaries.values())
+        self.sort_cache()
+        if fingerprint is not None:
+            self._write_snapshot(fingerprint, scanned)
+
+    def clear_cache(self):
+        """
+        Remove all issues from the cache, to load them again
+        in batches with read_summaries and add_summaries.
+        Releases are loaded from project configuration.
         """
-        # (re)create the cache
         self.item_cache.clear()
-        identifiers = self.issuemodel.list_issue_identifiers()
-        for issue_id in identifiers:
-            dit_item = self.get_issue_content(issue_id, False)
-            self.item_cache.add_issue(dit_item)
+        self._close_snapshot()
+        self._load_releases()
+
+    def read_summaries(self, batch_size=None):
+        """
+        Read summaries of all issues in batches.
+
+        Issue directory is scanned and the summaries are read
+        from the issue index, like in reload_cache. The cache
+        itself is not modified, so this can be run in another thread
+        while the cache is used. The issue index and the change
+        tracker must not be used by other threads until
+        the iteration has been finished or stopped.
+
+        Parameters:
+        - batch_size: (optional) maximum number of summaries in a batch
+
+        Yields:
+        - (summaries, loaded, total) tuples, where
+          summaries is a list of IssueSummary objects,
+          loaded is the number of summaries read so far, and
+          total is the number of issues
+        """
+        self.changetracker.reset()
+        self.changetracker.detect_changes()
+        file_stats = self.changetracker.file_stats
+        loaded = 0
+        for summaries in self.issueindex.iter_summaries(file_stats, batch_size):
+            loaded += len(summaries)
+            yield list(summaries.values()), loaded, len(file_stats)
+
+    def add_summaries(self, summaries):
+        """
+        Add issues read with read_summaries to the cache.
+        Issues are named after all batches have been added
+        by calling sort_cache.
+
+        Parameters:
+        - summaries: IssueSummary objects
+        """
+        for summary in summaries:
+            self.item_cache.add_issue(summary.to_dit_issue(self.issuemodel.read_issue))
+
+    def sort_cache(self):
+        """
+        Sort the cached issues and name them in order of creation.
+        """
         self.item_cache.sort_issues(rename=True)
 
+    def refresh_cache(self):
+        """
+        Update the cache with changes made to issue files
+        and the project file since the cache was last updated.
+
+        Only added and modified issue files are read.
+        Rest of the cache is kept as it is.
+
+        Returns:
+        - a ChangeSet describing the detected changes
+        """
+        fingerprint = None
+        if self.snapshot_file is not None:
+            fingerprint = self.issuemodel.get_directory_fingerprint()
+        scanned = time.time_ns()
+        changes = self.changetracker.detect_changes()
+        if changes.project_changed:
+            self.config.projectconfig.read_config_file()
+        if changes.has_issue_changes():
+            summaries = self.issueindex.update_summaries(changes.changed_issues(),
+                                                         changes.removed)
+            for identifier in changes.removed:
+                self.item_cache.remove_issue(identifier)
+            for summary in summaries.values():
+                self.item_cache.add_issue(summary.to_dit_issue(self.issuemodel.read_issue))
+            self.item_cache.sort_issues(rename=True)
+            if fingerprint is not None:
+                self._write_snapshot(fingerprint, scanned)
+        self._load_releases()
+        return changes
+
+    def _load_snapshot(self, fingerprint):
+        """
+        Load the cache from the snapshot file, if it is current.
+        Issue files are tracked as they were when the snapshot was
+        written, so refresh_cache reads the issues changed since.
+
+        Parameters:
+        - fingerprint: current fingerprint of the issue directory
+
+        Returns:
+        - True if the snapshot was loaded
+        """
+        self.wait_for_snapshot()
+        snapshot = IssueSnapshot.open(self.snapshot_file, fingerprint)
+        if snapshot is None:
+            return False
+        self.snapshot = snapshot
+        self.item_cache.load_snapshot(snapshot, self.issuemodel.read_issue)
+        self.changetracker.track(snapshot.get_file_stats())
+        self.changetracker.detect_project_change()
+        return True
+
+    def _close_snapshot(self):
+        """
+        Close the loaded snapshot, if any.
+        """
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def _write_snapshot(self, fingerprint, scanned):
+        """
+        Write the cached issues to the snapshot file in a background thread.
+
+        Parameters:
+        - fingerprint: fingerprint of the issue directory taken before scanning it
+        - scanned: time the issue directory was scanned, in nanoseconds since epoch
+        """
+        if fingerprint[0] > scanned - self.SNAPSHOT_SETTLE_TIME_NS:
+            # the directory could still change without changing the fingerprint
+            return
+        summaries = [IssueSummary(issue.identifier, issue.title, issue.status, issue.release,
+                                  issue.component, issue.created)
+                     for issue in self.item_cache.issues]
+        file_stats = self.changetracker.file_stats
+        name_max_len = self.item_cache.get_issue_name_max_len()
+
+        def write():
+            try:
+                IssueSnapshot.write(self.snapshot_file, fingerprint, summaries,
+                                    file_stats, name_max_len)
+            except (OSError, ValueError, KeyError):
+                # the snapshot is only a cache, issues are loaded without it
+                pass
+
+        self.wait_for_snapshot()
+        # not a daemon thread, so the snapshot is finished before exiting
+        self._snapshot_writer = threading.Thread(target=write, name='dit-snapshot')
+        self._snapshot_writer.start()
+
+    def wait_for_snapshot(self):
+        """
+        Wait until a snapshot being written in the background is finished.
+        """
+        if self._snapshot_writer is not None:
+            self._snapshot_writer.join()
+            self._snapshot_writer = None
+
+    def _load_releases(self):
+        """
+        (Re)load unreleased releases from project configuration to cache.
+        """
+        for release in list(self.item_cache.releases):
+            self.item_cache.remove_release(release.title)
         releases = self.config.get_releases(constants.release_states.UNRELEASED)
         if releases:
             for release in releases:
                 self.item_cache.add_release(release)
             self.item_cache.sort_releases()
 
-    def get_items(self):
+    def reindex(self):
+        """
+        Rebuild the issue index from scratch and reload the cache.
+        The issue snapshot is written again.
+        """
+        self.issueindex.rebuild()
+        if self.snapshot_file is not None:
+            self.clear_cache()
+            self.wait_for_snapshot()
+            try:
+                os.remove(self.snapshot_file)
+            except OSError:
+                pass
+        self.reload_cache()
+
+    def pack_issues(self, min_age=None):
+        """
+        Move closed issues from their own files to the issue pack.
+
+        Packed issues are read like the others, but don't need
+        to be listed from the issue directory, so loading the issues
+        depends mostly on the number of open issues.
+
+        Parameters:
+        - min_age: (optional) pack only issues not changed
+                   in this many days, all closed issues by default
+
+        Returns:
+        - number of issues moved to the pack
+
+        Raises:
+        - ApplicationError if packing fails
+        """
+        self.refresh_cache()
+        limit = None
+        if min_age is not None:
+            limit = (datetime.datetime.now(datetime.timezone.utc)
+                     - datetime.timedelta(days=min_age))
+        identifiers = []
+        for issue in self.item_cache.issues:
+            if issue.status != constants.issue_states.CLOSED:
+                continue
+            if limit is not None:
+                # only the end of the log is read, the cached issue is not loaded
+                changed = (self.issuemodel.read_last_change_time(issue.identifier)
+                           or issue.created)
+                if changed.tzinfo is None:
+                    changed = changed.replace(tzinfo=datetime.timezone.utc)
+                if changed > limit:
+                    continue
+            identifiers.append(issue.identifier)
+        count = self.issuemodel.pack_issues(identifiers)
+        self.refresh_cache()
+        return count
+
+    def unpack_issues(self, identifiers):
+        """
+        Move packed issues back to their own files.
+
+        Parameters:
+        - identifiers: hash identifiers of the issues,
+                       issues not in the pack are ignored
+
+        Raises:
+        - ApplicationError if unpacking fails
+        """
+        self.issuemodel.unpack_issues(identifiers)
+
+    def get_items(self, refresh=True):
         """
         Get a list of all releases and issues stored in Dit.
         Returned list is sorted by releases.
 
+        Parameters:
+        - refresh: (optional) update the cache with changed issue files first,
+                   False to list only the cached issues, like while
+                   the cache is being loaded
+
         Returns:
         - A list of DitItems
         """
         items = []
-        self.reload_cache()
+        if refresh:
+            self.refresh_cache()
 
         for release in self.item_cache.releases:
             items.append(release)
@@ -130,7 +424,9 @@ class DitControl(object):
         Returns:
         - issue identifier
         """
-        issue = self._get_issue_by_id(issue_name)
+        issue = self.get_issue_from_cache(issue_name)
+        if not issue:
+            issue = self._get_issue_by_id(issue_name)
         if issue:
             return issue.identifier
         return None
@@ -152,18 +448,52 @@ class DitControl(object):
             return None
         if len(identifier) != 40:
             # issue name given instead?
-            issue = self._get_issue_by_id(identifier)
+            issue = self.get_issue_from_cache(identifier)
             if issue:
                 identifier = issue.identifier
             if identifier and len(identifier) != 40:
                 return None
-        yaml_issue = self.issuemodel.read_issue_yaml(identifier)
-        dit_item = yaml_issue.to_dit_issue()
+        dit_item = self.issuemodel.read_issue(identifier)
+        cached_issue = self.get_issue_from_cache(identifier)
+        if cached_issue:
+            dit_item.name = cached_issue.name
         if update_cache:
             self.item_cache.add_issue(dit_item)
             #self.item_cache.sort_issues(rename = True)
         return dit_item
 
+    def get_issue_html(self, identifier):
+        """
+        Get content of an issue as HTML.
+
+        Rendered issues are cached. An issue is read and rendered
+        again only if its file or name has changed.
+
+        Parameters:
+        - identifier: Dit hash or name identifier of an issue
+
+        Returns:
+        - issue as HTML
+        - None if identifier is invalid
+        """
+        if identifier in (None, ""):
+            return None
+        issue = self.get_issue_from_cache(identifier)
+        if issue is not None:
+            identifier = issue.identifier
+        if len(identifier) != 40:
+            return None
+        version = self.issuemodel.get_issue_version(identifier)
+        if version is not None:
+            version += (issue.name if issue is not None else None,)
+            html = self.render_cache.get_html(identifier, version)
+            if html is not None:
+                return html
+        dit_item = self.get_issue_content(identifier, False)
+        if version is None:
+            return dit_item.toHtml()
+        return self.render_cache.render_html(identifier, version, dit_item)
+
     def get_issue_name_max_len(self):
         """
         Get length of the longest issue name found in cache
@@ -195,6 +525,9 @@ class DitControl(object):
         Parameters:
         - issue: a DitIssue filled with data to save
         - comment: (optional) comment to add to the issue's event log
+
+        Returns:
+        - identifier of the new issue
         """
         if issue.identifier not in (None, ""):
             raise DitError("Issue has an identifier, not a new issue?")
@@ -207,8 +540,10 @@ class DitControl(object):
         issue.identifier = self.issuemodel.generate_new_identifier()
         self._add_issue_log_entry(issue, 'created', comment)
 
-        yaml_issue = IssueYamlObject.from_dit_issue(issue)
-        self.issuemodel.write_issue_yaml(yaml_issue)
+        self._write_issue(issue)
+        # usable by name right away, without reloading the cache
+        self.item_cache.add_new_issue(issue)
+        return issue.identifier
 
     def edit_issue(self, issue, comment=''):
         """
@@ -222,15 +557,25 @@ class DitControl(object):
         if issue.identifier in (None, ""):
             raise DitError("Issue has no identifier")
 
-        self._add_issue_log_entry(issue, 'edited', comment)
+        # applied also to the current content, if the issue file has been changed
+        edited = {field: getattr(issue, field) for field in self.EDITABLE_FIELDS}
+        references = list(issue.references)
+
+        def change(dit_issue):
+            for field, value in edited.items():
+                setattr(dit_issue, field, value)
+            dit_issue.references = list(references)
+            self._add_issue_log_entry(dit_issue, 'edited', comment)
 
-        yaml_issue = IssueYamlObject.from_dit_issue(issue)
-        self.issuemodel.write_issue_yaml(yaml_issue)
+        self._change_issue(issue, change)
 
     def add_comment(self, dit_id, comment):
         """
         Write a new comment to a Dit item
 
+        With separate logs, the comment is appended to the log file
+        of the issue without reading or writing the issue file.
+
         Parameters:
         - dit_id: Dit hash or name identifier of an issue to close
         - comment: (optional) comment text, no formatting, to add to the closed issue
@@ -240,11 +585,17 @@ class DitControl(object):
         if comment in (None, ""):
             raise DitError("Missing comment")
 
-        dit_issue = self._get_issue_by_id(dit_id)
-        self._add_issue_log_entry(dit_issue, 'commented', comment)
+        if self.issuemodel.separate_logs:
+            identifier = self._resolve_identifier(dit_id)
+            entry = LogEntry(datetime.datetime.now(datetime.timezone.utc),
+                             self.config.get_default_creator(), 'commented', comment)
+            self.issuemodel.append_log_entries(identifier, [entry])
+            self._unload_issue(identifier)
+            return
 
-        yaml_issue = IssueYamlObject.from_dit_issue(dit_issue)
-        self.issuemodel.write_issue_yaml(yaml_issue)
+        dit_issue = self._get_issue_by_id(dit_id)
+        self._change_issue(dit_issue,
+                lambda issue: self._add_issue_log_entry(issue, 'commented', comment))
 
     def add_reference(self, dit_id, reference, comment=""):
         """
@@ -260,12 +611,12 @@ class DitControl(object):
         if reference in (None, ""):
             raise DitError("Invalid reference")
 
-        dit_issue = self._get_issue_by_id(dit_id)
-        dit_issue.references.append(reference)
-        self._add_issue_log_entry(dit_issue, 'added reference', comment)
+        def change(issue):
+            issue.references.append(reference)
+            self._add_issue_log_entry(issue, 'added reference', comment)
 
-        yaml_issue = IssueYamlObject.from_dit_issue(dit_issue)
-        self.issuemodel.write_issue_yaml(yaml_issue)
+        dit_issue = self._get_issue_by_id(dit_id)
+        self._change_issue(dit_issue, change)
 
     def _disposition_to_str(self, disposition):
         """
@@ -297,16 +648,24 @@ class DitControl(object):
 
         issue = self._get_issue_by_id(dit_id)
         if issue:
-            issue.status = 'closed'
             if isinstance(disposition, int):
-                issue.disposition = self._disposition_to_str(disposition)
-            else:
-                issue.disposition = disposition
-            action = "closed with disposition {}".format(issue.disposition)
-            self._add_issue_log_entry(issue, action, comment)
+                disposition = self._disposition_to_str(disposition)
+            self._change_issue(issue,
+                    lambda dit_issue: self._set_closed(dit_issue, disposition, comment))
 
-            yaml_issue = IssueYamlObject.from_dit_issue(issue)
-            self.issuemodel.write_issue_yaml(yaml_issue)
+    def _set_closed(self, issue, disposition, comment=""):
+        """
+        Close an issue in memory.
+
+        Parameters:
+        - issue: DitIssue to close
+        - disposition: disposition as string
+        - comment: (optional) comment text to add to the issue
+        """
+        issue.status = constants.issue_states.CLOSED
+        issue.disposition = disposition
+        action = "closed with disposition {}".format(issue.disposition)
+        self._add_issue_log_entry(issue, action, comment)
 
     def drop_issue(self, identifier):
         """
@@ -332,6 +691,7 @@ class DitControl(object):
         try:
             self.issuemodel.remove_issue_yaml(identifier)
             self.item_cache.remove_issue(identifier)
+            self.render_cache.remove(identifier)
         except DitError as e:
             e.error_message = "Dropping issue failed"
             raise
@@ -349,16 +709,25 @@ class DitControl(object):
         - DitError if running Dit command fails
         """
         dit_issue = self._get_issue_by_id(dit_id)
-        old_release = dit_issue.release
-        dit_issue.release = release
+        self._change_issue(dit_issue,
+                lambda issue: self._set_release(issue, release, comment))
+
+    def _set_release(self, issue, release, comment=''):
+        """
+        Assign an issue to a release in memory.
+
+        Parameters:
+        - issue: DitIssue to assign
+        - release: name of the release to which to assign the issue
+        - comment: (optional) comment text to add to the issue
+        """
+        old_release = issue.release
+        issue.release = release
         if old_release in (None, ""):
             old_release = constants.releases.UNASSIGNED
 
         action = "assigned to release {} from {}".format(release, old_release)
-        self._add_issue_log_entry(dit_issue, action, comment)
-
-        yaml_issue = IssueYamlObject.from_dit_issue(dit_issue)
-        self.issuemodel.write_issue_yaml(yaml_issue)
+        self._add_issue_log_entry(issue, action, comment)
 
     def start_work(self, dit_id, comment=''):
         """
@@ -401,18 +770,192 @@ class DitControl(object):
             return
 
         dit_issue = self._get_issue_by_id(dit_id)
-        old_status = dit_issue.status
-        dit_issue.status = status
-        dit_issue.disposition = None
+        self._change_issue(dit_issue,
+                lambda issue: self._set_status(issue, status, comment))
+
+    def _set_status(self, issue, status, comment=''):
+        """
+        Change status of an issue in memory.
+
+        Parameters:
+        - issue: DitIssue to change
+        - status: new status to set for the issue
+        - comment: (optional) comment text to add to the issue
+        """
+        old_status = issue.status
+        issue.status = status
+        issue.disposition = None
         action = "status changed from {} to {}".format(old_status, status)
-        self._add_issue_log_entry(dit_issue, action, comment)
+        self._add_issue_log_entry(issue, action, comment)
+
+    def add_comment_to_issues(self, selection, comment):
+        """
+        Write the same comment to many issues.
+
+        Parameters:
+        - selection: list of Dit hash or name identifiers of the issues,
+                     or a function returning True for the cached issues to select
+        - comment: comment text, no formatting, to add to the issues
+
+        Returns:
+        - outcomes like in update_issues
+        """
+        if comment in (None, ""):
+            raise DitError("Missing comment")
+        return self.update_issues(selection,
+                lambda issue: self._add_issue_log_entry(issue, 'commented', comment))
+
+    def close_issues(self, selection, disposition, comment=""):
+        """
+        Close many issues with the same disposition.
+
+        Parameters:
+        - selection: list of Dit hash or name identifiers of the issues,
+                     or a function returning True for the cached issues to select
+        - disposition: index of disposition or disposition as string
+        - comment: (optional) comment text, no formatting, to add to the issues
+
+        Returns:
+        - outcomes like in update_issues
+        """
+        if isinstance(disposition, int):
+            disposition = self._disposition_to_str(disposition)
+        return self.update_issues(selection,
+                lambda issue: self._set_closed(issue, disposition, comment))
+
+    def assign_issues(self, selection, release, comment=''):
+        """
+        Assign many issues to a release.
+
+        Parameters:
+        - selection: list of Dit hash or name identifiers of the issues,
+                     or a function returning True for the cached issues to select
+        - release: name of the release to which to assign the issues
+        - comment: (optional) comment text, no formatting, to add to the issues
+
+        Returns:
+        - outcomes like in update_issues
+        """
+        return self.update_issues(selection,
+                lambda issue: self._set_release(issue, release, comment))
+
+    def change_issues_status(self, selection, status, comment=''):
+        """
+        Change status of many issues.
+
+        Parameters:
+        - selection: list of Dit hash or name identifiers of the issues,
+                     or a function returning True for the cached issues to select
+        - status: new status to set for the issues
+        - comment: (optional) comment text, no formatting, to add to the issues
+
+        Returns:
+        - outcomes like in update_issues
+        """
+        if status in (None, ""):
+            raise DitError("Invalid issue status")
+        return self.update_issues(selection,
+                lambda issue: self._set_status(issue, status, comment))
+
+    def update_issues(self, selection, update):
+        """
+        Apply a change to many issues and write them all at once.
+
+        The selected issues are read and changed in memory,
+        and then written in parallel. An issue failing doesn't
+        stop the others from being changed.
+
+        Parameters:
+        - selection: list of Dit hash or name identifiers of the issues,
+                     or a function returning True for the cached issues to select
+        - update: function changing a given DitIssue,
+                  may raise ApplicationError to fail that issue
+
+        Returns:
+        - a dictionary of identifiers of the issues, or the given
+          names of issues not found, mapped to None for issues that
+          were changed and to an error message for those that failed
+        """
+        outcomes = {}
+        issues = []
+        for dit_id in self._select_issues(selection):
+            if dit_id in outcomes:
+                continue
+            try:
+                identifier = self._resolve_identifier(dit_id)
+                if identifier in outcomes:
+                    continue
+                issue = self.issuemodel.read_issue(identifier)
+                update(issue)
+            except ApplicationError as e:
+                outcomes[dit_id] = e.error_message
+                continue
+            outcomes[identifier] = None
+            issues.append(issue)
+
+        yaml_issues = [IssueYamlObject.from_dit_issue(issue) for issue in issues]
+        results = self.issuemodel.write_issues_bulk(yaml_issues,
+                                                    [issue.version for issue in issues])
+        for issue, (version, error_message) in zip(issues, results):
+            if error_message == self.issuemodel.STALE_ERROR:
+                # changed by someone else meanwhile, apply the change again
+                try:
+                    issue = self.issuemodel.write_issue(issue, update)
+                except ApplicationError as e:
+                    outcomes[issue.identifier] = e.error_message
+                    continue
+            elif error_message is not None:
+                outcomes[issue.identifier] = error_message
+                continue
+            else:
+                issue.version = version
+            self.item_cache.add_issue(issue)
+            self.render_cache.remove(issue.identifier)
+        return outcomes
+
+    def _select_issues(self, selection):
+        """
+        Get identifiers of issues selected for a bulk change.
+
+        Parameters:
+        - selection: list of identifiers or a function selecting cached issues
 
-        yaml_issue = IssueYamlObject.from_dit_issue(dit_issue)
-        self.issuemodel.write_issue_yaml(yaml_issue)
+        Returns:
+        - list of Dit hash or name identifiers
+        """
+        if callable(selection):
+            return [issue.identifier for issue in self.item_cache.issues if selection(issue)]
+        return list(selection)
+
+    def _resolve_identifier(self, dit_id):
+        """
+        Get hash identifier of an existing issue without reloading the cache.
+
+        Parameters:
+        - dit_id: Dit hash or name identifier of an issue
+
+        Returns:
+        - issue hash identifier
+
+        Raises:
+        - ApplicationError if the issue is not found
+        """
+        if dit_id in (None, ""):
+            raise ApplicationError("Invalid dit item identifier")
+        issue = self.get_issue_from_cache(dit_id)
+        if issue is not None:
+            return issue.identifier
+        if len(dit_id) == 40 and self.issuemodel.get_issue_version(dit_id) is not None:
+            return dit_id
+        raise ApplicationError('Unable to find issue: {}'.format(dit_id))
 
     def _get_issue_by_id(self, dit_id):
         """
-        Get DitIssue from cache or file.
+        Get DitIssue with all its content from file.
+
+        The cache contains only summaries of the issues,
+        so the issue is always read from its file.
+        The cache is updated with the read issue.
 
         Parameters:
         - dit_id: issue hash identifier or name
@@ -421,19 +964,70 @@ class DitControl(object):
             raise ApplicationError("Invalid dit item identifier")
 
         dit_issue = self.get_issue_from_cache(dit_id)
-        if not dit_issue and len(dit_id) == 40:
-            # try to load issue in case it exists, but is not cached
-            dit_issue = self.get_issue_content(dit_id)
-            if not dit_issue:
-                raise ApplicationError('Unable to find issue: {}'.format(dit_id))
-            self.reload_cache()
+        if dit_issue:
+            return self.get_issue_content(dit_issue.identifier)
+        if len(dit_id) != 40:
+            return None
 
-            # use the cached issue to keep cache up to date
-            dit_issue = self.get_issue_from_cache(dit_id)
-            if not dit_issue:
-                raise ApplicationError('Unable to find issue even after reload: {}'.format(dit_id))
+        # try to load issue in case it exists, but is not cached
+        dit_issue = self.get_issue_content(dit_id, False)
+        if not dit_issue:
+            raise ApplicationError('Unable to find issue: {}'.format(dit_id))
+        self.reload_cache()
+
+        if not self.get_issue_from_cache(dit_id):
+            raise ApplicationError('Unable to find issue even after reload: {}'.format(dit_id))
+
+        # use the cached issue to keep cache up to date
+        return self.get_issue_content(dit_id)
 
-        return dit_issue
+    def _unload_issue(self, identifier):
+        """
+        Replace a cached issue with one that reads its content again
+        when it is needed, after the issue file has been changed.
+
+        Parameters:
+        - identifier: issue hash identifier
+        """
+        issue = self.get_issue_from_cache(identifier)
+        if issue is not None:
+            summary = IssueSummary(issue.identifier, issue.title, issue.status,
+                                   issue.release, issue.component, issue.created)
+            self.item_cache.add_issue(summary.to_dit_issue(self.issuemodel.read_issue))
+        self.render_cache.remove(identifier)
+
+    def _change_issue(self, issue, change):
+        """
+        Apply a change to an issue and write it.
+
+        Parameters:
+        - issue: a DitIssue to change
+        - change: function applying the change to a given DitIssue
+        """
+        change(issue)
+        self._write_issue(issue, change)
+
+    def _write_issue(self, issue, change=None):
+        """
+        Write an issue to its file and update the cache indexes
+        in case the issue is a cached one.
+
+        If the issue file has been changed by someone else since
+        the issue was read, the change is applied again to
+        the current content of the file, which is then cached.
+
+        Parameters:
+        - issue: a DitIssue to write
+        - change: (optional) function applying the change made to
+                  the issue to a given DitIssue
+        """
+        written = self.issuemodel.write_issue(issue, change)
+        if written is issue:
+            self.item_cache.update_issue(issue)
+        elif self.get_issue_from_cache(written.identifier) is not None:
+            self.item_cache.add_issue(written)
+        # file version may not change if written within the same clock tick
+        self.render_cache.remove(issue.identifier)
 
     def _add_issue_log_entry(self, issue, action, comment=None):
         """
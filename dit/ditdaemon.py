@@ -0,0 +1,368 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit daemon
+
+Keeps a loaded DitControl in memory and serves it to Dit command
+line clients over a Unix domain socket, so the configuration and
+the issue cache don't need to be loaded again for every command.
+"""
+
+import os
+import pickle
+import socket
+import struct
+import threading
+import socketserver
+
+from common.errors import DitError, ApplicationError
+from common.utils import fileutils
+
+
+SOCKET_NAME = 'daemon.sock'
+
+# exceptions passed from the daemon to the clients,
+# other exceptions are passed as ApplicationErrors
+EXCEPTION_TYPES = {
+    'ApplicationError': ApplicationError,
+    'DitError': DitError,
+    'NameError': NameError,
+    'ValueError': ValueError,
+    'TypeError': TypeError,
+}
+
+# length of a message before the pickled message
+_HEADER = struct.Struct('!I')
+
+
+def get_socket_path(project_root):
+    """
+    Get path to the socket of the daemon serving a project.
+
+    Parameters:
+    - project_root: root directory of the Dit project
+
+    Returns:
+    - path to the socket
+
+    Raises:
+    - OSError if the cache directory can't be created
+    """
+    return os.path.join(fileutils.get_cache_directory(project_root), SOCKET_NAME)
+
+
+def _send_message(sock, message):
+    """
+    Send a pickled message to a socket.
+    """
+    data = pickle.dumps(message, pickle.HIGHEST_PROTOCOL)
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def _receive_exactly(sock, size):
+    """
+    Receive given amount of bytes from a socket.
+
+    Returns:
+    - received bytes
+    - None if the connection was closed
+    """
+    data = bytearray()
+    while len(data) < size:
+        chunk = sock.recv(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _receive_message(sock):
+    """
+    Receive a pickled message from a socket.
+
+    Returns:
+    - the message
+    - None if the connection was closed
+    """
+    header = _receive_exactly(sock, _HEADER.size)
+    if header is None:
+        return None
+    data = _receive_exactly(sock, _HEADER.unpack(header)[0])
+    if data is None:
+        return None
+    return pickle.loads(data)
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    """
+    Serves the requests of one client connection.
+    """
+    def handle(self):
+        first = True
+        while True:
+            try:
+                request = _receive_message(self.request)
+            except (OSError, EOFError, pickle.UnpicklingError):
+                return
+            if request is None:
+                return
+            response = self.server.daemon.handle_request(request, refresh=first)
+            first = False
+            try:
+                _send_message(self.request, response)
+            except OSError:
+                return
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                # return value can't be passed to the client
+                _send_message(self.request, ('error', 'ApplicationError',
+                        "Invalid return value from dit daemon: {}".format(e)))
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A Unix domain socket server handling each client in its own thread.
+    """
+    daemon_threads = True
+
+
+class DitDaemon(object):
+    """
+    Serves method calls of a DitControl to clients.
+
+    Clients call the public methods of the DitControl, and objects
+    reachable through its public attributes, like dit.config.get_releases.
+    Calls are handled one at a time. The cache is refreshed with
+    changed issue files when a client connects, so each command sees
+    the current issues while reading only the changed files.
+
+    Arguments and return values are pickled, so the methods get
+    copies of the objects passed by the clients. Changes made to
+    the arguments, like the identifier set to an issue given to
+    DitControl.add_issue, are not seen by the client. Clients must
+    use the return values instead.
+
+    The socket is accessible only by the user running the daemon,
+    as the messages are pickled Python objects.
+    """
+    def __init__(self, dit, socket_path):
+        """
+        Initialize DitDaemon.
+
+        Parameters:
+        - dit: DitControl to serve
+        - socket_path: path of the Unix domain socket to listen to
+        """
+        self.dit = dit
+        self.socket_path = socket_path
+        self.lock = threading.Lock()
+        self.server = None
+
+    def start(self):
+        """
+        Start listening to the socket.
+
+        Raises:
+        - ApplicationError if another daemon is already running
+        """
+        if os.path.exists(self.socket_path):
+            client = DaemonClient.connect(self.socket_path)
+            if client is not None:
+                client.close()
+                raise ApplicationError("Dit daemon is already running")
+            # left behind by a daemon that didn't exit cleanly
+            os.remove(self.socket_path)
+        old_umask = os.umask(0o077)
+        try:
+            self.server = _UnixServer(self.socket_path, _RequestHandler)
+        finally:
+            os.umask(old_umask)
+        self.server.daemon = self
+
+    def serve_forever(self):
+        """
+        Serve clients until shutdown is called.
+        """
+        try:
+            self.server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """
+        Stop serving clients. Can be called from another thread.
+        """
+        self.server.shutdown()
+
+    def close(self):
+        """
+        Close the socket and remove the socket file.
+        """
+        if self.server is None:
+            return
+        self.server.server_close()
+        self.server = None
+        try:
+            os.remove(self.socket_path)
+        except OSError:
+            pass
+
+    def handle_request(self, request, refresh=False):
+        """
+        Handle a request from a client.
+
+        Parameters:
+        - request: (path, args, kwargs) tuple, where path is a tuple
+                   of attribute names leading to the method to call
+        - refresh: refresh the cache before the call
+
+        Returns:
+        - ('ok', return value) or ('error', exception type name, message)
+        """
+        with self.lock:
+            try:
+                path, args, kwargs = request
+                if refresh:
+                    self.dit.refresh_cache()
+                target = self.dit
+                for name in path:
+                    if not isinstance(name, str) or name.startswith('_'):
+                        raise ApplicationError("Invalid daemon request")
+                    target = getattr(target, name)
+                return ('ok', target(*args, **kwargs))
+            except Exception as e:                    # pylint: disable=W0703
+                if isinstance(e, ApplicationError):
+                    message = e.error_message
+                else:
+                    message = str(e)
+                return ('error', type(e).__name__, message)
+
+
+class RemoteObject(object):
+    """
+    A proxy for an object served by a Dit daemon.
+
+    Attributes of a RemoteObject are RemoteObjects too, and calling
+    one calls the corresponding method in the daemon. Only methods
+    can be used this way, other attributes can't be read. The method
+    is called with copies of the arguments, so it can't change the
+    objects given to it, see DitDaemon.
+    """
+    def __init__(self, client, path=()):
+        """
+        Initialize RemoteObject.
+
+        Parameters:
+        - client: DaemonClient connected to the daemon
+        - path: (optional) attribute names leading to the object
+        """
+        self._client = client
+        self._path = path
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return RemoteObject(self._client, self._path + (name,))
+
+    def __call__(self, *args, **kwargs):
+        return self._client.call(self._path, args, kwargs)
+
+
+class DaemonClient(object):
+    """
+    A connection to a Dit daemon.
+    """
+    # seconds to wait for the daemon to accept a connection
+    CONNECT_TIMEOUT = 1.0
+
+    def __init__(self, sock):
+        """
+        Initialize DaemonClient. Use connect to create one.
+
+        Parameters:
+        - sock: socket connected to the daemon
+        """
+        self.sock = sock
+
+    @classmethod
+    def connect(cls, socket_path):
+        """
+        Connect to a daemon.
+
+        Parameters:
+        - socket_path: path to the socket of the daemon
+
+        Returns:
+        - a DaemonClient
+        - None if no daemon is listening to the socket
+        """
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(cls.CONNECT_TIMEOUT)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            sock.close()
+            return None
+        sock.settimeout(None)
+        return cls(sock)
+
+    @classmethod
+    def connect_to_project(cls, path="."):
+        """
+        Connect to the daemon serving the project of a directory.
+
+        Parameters:
+        - path: (optional) a directory in the project,
+                by default the current directory
+
+        Returns:
+        - RemoteObject for the DitControl served by the daemon
+        - None if no daemon is running for the project
+        """
+        try:
+            # same as DitConfigModel.find_config_file, without loading the configs
+            project_root = fileutils.find_file_along_path('.dit-config', path)
+            socket_path = get_socket_path(project_root)
+        except Exception:                           # pylint: disable=W0703
+            return None
+        if not os.path.exists(socket_path):
+            return None
+        client = cls.connect(socket_path)
+        if client is None:
+            return None
+        return RemoteObject(client)
+
+    def call(self, path, args, kwargs):
+        """
+        Call a method in the daemon.
+
+        Parameters:
+        - path: attribute names leading to the method
+        - args: positional arguments
+        - kwargs: keyword arguments
+
+        Returns:
+        - return value of the method, a copy of the object returned
+          in the daemon
+
+        Raises:
+        - the exception raised by the method
+        - ApplicationError if the connection to the daemon fails
+        """
+        try:
+            _send_message(self.sock, (tuple(path), tuple(args), dict(kwargs)))
+            response = _receive_message(self.sock)
+        except (OSError, EOFError, pickle.UnpicklingError) as e:
+            raise ApplicationError("Connection to dit daemon failed: {}".format(e))
+        if response is None:
+            raise ApplicationError("Connection to dit daemon closed")
+        if response[0] == 'ok':
+            return response[1]
+        _, error_type, message = response
+        raise EXCEPTION_TYPES.get(error_type, ApplicationError)(message)
+
+    def close(self):
+        """
+        Close the connection.
+        """
+        self.sock.close()
@@ -0,0 +1,88 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import os
+
+from PyQt5.QtCore import QObject, QFileSystemWatcher, QTimer, pyqtSignal
+
+from common.utils.debounce import Debouncer
+
+
+class FileWatcher(QObject):
+    """
+    Watches files and directories for changes.
+
+    Bursts of changes, like a version control system updating
+    many issue files, are coalesced and reported with one signal
+    after the burst has ended.
+    """
+    # number of file system notifications coalesced
+    changed = pyqtSignal(int)
+
+    # seconds to wait for more changes
+    DELAY = 0.3
+    # maximum seconds to wait while changes keep coming
+    MAX_DELAY = 2.0
+
+    def __init__(self, paths, parent=None):
+        """
+        Initialize FileWatcher.
+
+        Parameters:
+        - paths: files and directories to watch
+        - parent: (optional) parent QObject
+        """
+        super(FileWatcher, self).__init__(parent)
+        self.paths = [path for path in paths if path]
+        self.debouncer = Debouncer(self.DELAY, self.MAX_DELAY)
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.timeout.connect(self._timeout)
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self._path_changed)
+        self.watcher.fileChanged.connect(self._path_changed)
+        self._watch_paths()
+
+    def _watch_paths(self):
+        """
+        Watch the existing paths not watched yet.
+        """
+        watched = set(self.watcher.files()) | set(self.watcher.directories())
+        for path in self.paths:
+            if path not in watched and os.path.exists(path):
+                self.watcher.addPath(path)
+
+    def _path_changed(self, path):
+        """
+        A watched file or directory has changed.
+        """
+        # a file replaced with a new one, like when saved by an editor,
+        # is no longer watched
+        if path not in self.watcher.files() and path not in self.watcher.directories():
+            self._watch_paths()
+        self._start_timer(self.debouncer.add_event())
+
+    def _timeout(self):
+        """
+        Report the changes, if no more changes have arrived.
+        """
+        count = self.debouncer.take()
+        if count:
+            self._watch_paths()
+            self.changed.emit(count)
+        else:
+            self._start_timer(self.debouncer.time_until_due())
+
+    def _start_timer(self, seconds):
+        """
+        Start the timer to fire after given time.
+        """
+        if seconds is not None:
+            # round up, so the changes are due when the timer fires
+            self.timer.start(int(seconds * 1000) + 1)
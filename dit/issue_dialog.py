@@ -133,7 +133,7 @@ class IssueDialog(QtWidgets.QDialog):
         """
         Show the dialog filled with data of a given Dit issue
         """
-        self.issue = self.dit.get_issue_from_cache(dit_id)
+        self.issue = self.dit.get_issue_content(dit_id)
         if self.issue is None:
             QtWidgets.QMessageBox.warning(self, "dit-gui error", "No issue selected")
             return
@@ -150,7 +150,7 @@ class IssueDialog(QtWidgets.QDialog):
 
         # two alternative formats allowed for created field (just in case)
         try:
-            time_str = common.utils.time.human_time_diff(self.issue.created.isoformat(' '))
+            time_str = common.utils.time.human_time_diff(self.issue.created)
         except ValueError:
             time_str = self.issue.created
         self.widgetForm.labelCreatedValue.setText(time_str)
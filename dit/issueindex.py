@@ -0,0 +1,405 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import os
+import datetime
+import sqlite3
+
+from common.items import IssueSummary
+from common.errors import ApplicationError
+from common.utils import fileutils
+
+
+class IssueIndex(object):
+    """
+    A persistent index of issue summaries.
+
+    Summary information of every issue is stored in a SQLite database
+    together with the modification time and size of the issue file
+    it was read from, and of the log file of the issue. Only issues
+    whose files have changed since they were indexed need to be
+    parsed again.
+
+    The index is just a cache. It is rebuilt automatically if it is
+    corrupted or created by an incompatible version. If it can't be
+    used for other reasons, like when another process keeps it locked
+    for too long, the issue files are read without it.
+    """
+    SCHEMA_VERSION = 2
+
+    # default number of summaries in a batch returned by iter_summaries
+    BATCH_SIZE = 1000
+
+    # seconds to wait for other processes to finish writing to the index
+    LOCK_TIMEOUT = 10.0
+
+    def __init__(self, issuemodel, index_file=None):
+        """
+        Initialize IssueIndex
+
+        Parameters:
+        - issuemodel: IssueModel used to read changed issue files
+        - index_file: (optional) path to the index database,
+                      by default a file in the user's cache directory
+        """
+        self.issuemodel = issuemodel
+        if index_file is None:
+            try:
+                cache_dir = fileutils.get_cache_directory(issuemodel.issue_dir)
+                index_file = os.path.join(cache_dir, 'index.sqlite')
+            except OSError:
+                # no place to store the index, keep it in memory only
+                index_file = ':memory:'
+        self.index_file = index_file
+        self.connection = None
+        self._open()
+
+    def get_summaries(self, file_stats=None):
+        """
+        Get summaries of all issues in the issue directory.
+        Changed issue files are read again and the index is updated.
+        Issues that no longer exist are removed from the index.
+
+        Parameters:
+        - file_stats: (optional) result of IssueModel.scan_issue_files,
+                      the issue directory is scanned if not given
+
+        Returns:
+        - a dictionary of issue identifiers mapped to IssueSummary objects
+        """
+        if file_stats is None:
+            file_stats = self.issuemodel.scan_issue_files()
+        try:
+            return self._with_recovery(self._update, file_stats, None)
+        except sqlite3.OperationalError:
+            return self._read_summaries(file_stats)
+
+    def iter_summaries(self, file_stats=None, batch_size=None):
+        """
+        Get summaries of all issues in the issue directory in batches.
+
+        Works like get_summaries, but summaries found in the index are
+        returned first, and changed issue files are returned in batches
+        as they are read. The index is updated after each batch,
+        so stopping the iteration early leaves it consistent.
+
+        Parameters:
+        - file_stats: (optional) result of IssueModel.scan_issue_files,
+                      the issue directory is scanned if not given
+        - batch_size: (optional) maximum number of summaries in a batch
+
+        Yields:
+        - dictionaries of issue identifiers mapped to IssueSummary objects
+        """
+        if file_stats is None:
+            file_stats = self.issuemodel.scan_issue_files()
+        if batch_size is None:
+            batch_size = self.BATCH_SIZE
+        returned = set()
+        try:
+            for summaries in self._update_batches(file_stats, None, batch_size):
+                returned.update(summaries)
+                yield summaries
+            return
+        except sqlite3.DatabaseError as e:
+            corrupted = self._is_corrupted(e)
+        # summaries already returned are not returned again
+        remaining = {identifier: stat for identifier, stat in file_stats.items()
+                     if identifier not in returned}
+        if corrupted:
+            self._reset()
+            try:
+                yield from self._update_batches(remaining, None, batch_size)
+                return
+            except sqlite3.OperationalError:
+                pass
+        items = list(remaining.items())
+        for start in range(0, len(items), batch_size):
+            yield self._read_summaries(dict(items[start:start + batch_size]))
+
+    def update_summaries(self, file_stats, removed=None):
+        """
+        Update the index for a set of changed issue files.
+
+        Parameters:
+        - file_stats: issue identifiers mapped to status information,
+                      like in IssueModel.scan_issue_files, of issues
+                      that have been added or modified
+        - removed: (optional) identifiers of issues that have been removed
+
+        Returns:
+        - a dictionary of issue identifiers mapped to IssueSummary objects
+          for the issues in file_stats
+        """
+        if removed is None:
+            removed = []
+        try:
+            return self._with_recovery(self._update, file_stats, removed)
+        except sqlite3.OperationalError:
+            return self._read_summaries(file_stats)
+
+    def rebuild(self):
+        """
+        Remove all indexed data.
+        Every issue file is read again on next update.
+
+        Raises:
+        - ApplicationError if the index can't be written
+        """
+        try:
+            self._with_recovery(self._clear)
+        except sqlite3.OperationalError as e:
+            raise ApplicationError("Unable to write the index: {}".format(e))
+
+    def close(self):
+        """
+        Close the index database.
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _open(self):
+        """
+        Open the index database and create the tables, if needed.
+        A corrupted or an incompatible database is replaced with a new one.
+        If the database can't be opened, an index in memory is used instead.
+        """
+        try:
+            self._connect(self.index_file)
+        except sqlite3.DatabaseError as e:
+            if self._is_corrupted(e):
+                self._reset()
+            else:
+                self._connect(':memory:')
+
+    def _connect(self, path):
+        """
+        Connect to an index database and check its schema version.
+
+        Parameters:
+        - path: path to the database
+
+        Raises:
+        - sqlite3.DatabaseError if the database is not usable
+        """
+        self.close()
+        # the index may be updated in a background thread,
+        # the users of the index take care it is used by one thread at a time
+        self.connection = sqlite3.connect(path, timeout=self.LOCK_TIMEOUT,
+                                          check_same_thread=False)
+        cursor = self.connection.cursor()
+        cursor.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        cursor.execute("SELECT value FROM meta WHERE key = 'schema_version'")
+        row = cursor.fetchone()
+        if row is not None and row[0] != str(self.SCHEMA_VERSION):
+            cursor.execute("DROP TABLE IF EXISTS issues")
+            row = None
+        if row is None:
+            cursor.execute("INSERT OR REPLACE INTO meta VALUES ('schema_version', ?)",
+                    (str(self.SCHEMA_VERSION),))
+        cursor.execute("CREATE TABLE IF NOT EXISTS issues ("
+                "identifier TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, "
+                "log_mtime_ns INTEGER, log_size INTEGER, title TEXT, status TEXT, release TEXT, component TEXT, created TEXT)")
+        self.connection.commit()
+
+    def _reset(self):
+        """
+        Remove the index database and create a new, empty one.
+        An index in memory is used if the new database can't be created.
+        """
+        self.close()
+        if self.index_file != ':memory:':
+            for path in (self.index_file, self.index_file + '-journal'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        try:
+            self._connect(self.index_file)
+        except sqlite3.DatabaseError:
+            self._connect(':memory:')
+
+    @staticmethod
+    def _is_corrupted(error):
+        """
+        Check if a database error means the database is corrupted.
+
+        Operational errors, like a database locked by another process
+        or a failing disk, don't. The database is shared by all processes
+        using the issues, so it is removed only when it is corrupted.
+        """
+        return isinstance(error, sqlite3.DatabaseError) and \
+                not isinstance(error, sqlite3.OperationalError)
+
+    def _with_recovery(self, func, *args):
+        """
+        Run an operation on the index database.
+        If the database turns out to be corrupted, it is
+        recreated and the operation is run again.
+
+        Raises:
+        - sqlite3.OperationalError if the database can't be used
+        """
+        try:
+            return func(*args)
+        except sqlite3.DatabaseError as e:
+            if not self._is_corrupted(e):
+                raise
+            self._reset()
+            return func(*args)
+
+    def _read_summaries(self, file_stats):
+        """
+        Read summaries of given issues from the issue files, without the index.
+
+        Returns:
+        - a dictionary of issue identifiers mapped to IssueSummary objects
+        """
+        identifiers = list(file_stats)
+        return dict(zip(identifiers, self.issuemodel.read_issues_bulk(identifiers)))
+
+    def _write(self, statement, rows):
+        """
+        Write rows to the index database.
+
+        Nothing is written if the database is locked by another process
+        for too long, or can't be written. The issues are then read from
+        their files again on a later update.
+        """
+        try:
+            with self.connection:
+                self.connection.executemany(statement, rows)
+        except sqlite3.OperationalError:
+            pass
+
+    def _clear(self):
+        """
+        Remove all issues from the index.
+        """
+        self.connection.execute("DELETE FROM issues")
+        self.connection.commit()
+
+    def _update(self, file_stats, removed):
+        """
+        Bring the index up to date with given issue files.
+
+        Parameters:
+        - file_stats: issue identifiers mapped to status information,
+                      like in IssueModel.scan_issue_files
+        - removed: identifiers of removed issues, or None to remove
+                   every issue not found in file_stats
+
+        Returns:
+        - a dictionary of issue identifiers mapped to IssueSummary objects
+        """
+        summaries = {}
+        for batch in self._update_batches(file_stats, removed, None):
+            summaries.update(batch)
+        return summaries
+
+    def _update_batches(self, file_stats, removed, batch_size):
+        """
+        Bring the index up to date with given issue files,
+        returning the summaries in batches.
+
+        Summaries found in the index are returned first, then the changed
+        issue files in batches as they are read. Each batch of changed
+        issues is committed to the index before it is returned.
+
+        Parameters:
+        - file_stats: issue identifiers mapped to status information,
+                      like in IssueModel.scan_issue_files
+        - removed: identifiers of removed issues, or None to remove
+                   every issue not found in file_stats
+        - batch_size: maximum number of summaries in a batch,
+                      None to return everything in one batch
+
+        Yields:
+        - dictionaries of issue identifiers mapped to IssueSummary objects
+        """
+        indexed = {}
+        query = ("SELECT identifier, mtime_ns, size, log_mtime_ns, log_size, title, "
+                 "status, release, component, created FROM issues")
+        if removed is None:
+            for row in self.connection.execute(query):
+                indexed[row[0]] = row
+            removed = [identifier for identifier in indexed if identifier not in file_stats]
+        else:
+            # look up only the given issues
+            for identifier in file_stats:
+                row = self.connection.execute(query + " WHERE identifier = ?",
+                                              (identifier,)).fetchone()
+                if row is not None:
+                    indexed[identifier] = row
+        if batch_size is None:
+            batch_size = max(len(file_stats), 1)
+
+        if removed:
+            self._write("DELETE FROM issues WHERE identifier = ?",
+                        [(identifier,) for identifier in removed])
+
+        summaries = {}
+        changed = []
+        for identifier, stat in file_stats.items():
+            row = indexed.get(identifier)
+            if row is not None and row[1:5] == self._stat_columns(stat):
+                summaries[identifier] = self._row_to_summary(row)
+                if len(summaries) >= batch_size:
+                    yield summaries
+                    summaries = {}
+            else:
+                changed.append(identifier)
+        if summaries:
+            yield summaries
+
+        for start in range(0, len(changed), batch_size):
+            batch = changed[start:start + batch_size]
+            summaries = {}
+            rows = []
+            for identifier, summary in zip(batch, self.issuemodel.read_issues_bulk(batch)):
+                summaries[identifier] = summary
+                rows.append(self._summary_to_row(summary, identifier, file_stats[identifier]))
+            self._write("INSERT OR REPLACE INTO issues VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        rows)
+            yield summaries
+
+    @staticmethod
+    def _stat_columns(stat):
+        """
+        Convert status information of an issue to the four columns of
+        a database row. Columns of the log file are None if there is none.
+        """
+        return tuple(stat) + (None,) * (4 - len(stat))
+
+    @classmethod
+    def _summary_to_row(cls, summary, identifier, stat):
+        """
+        Convert an issue summary to a database row.
+        """
+        created = summary.created
+        if isinstance(created, datetime.datetime):
+            created = created.isoformat()
+        elif created is not None:
+            created = str(created)
+        return ((identifier,) + cls._stat_columns(stat) +
+                (summary.title, summary.status, summary.release, summary.component, created))
+
+    @staticmethod
+    def _row_to_summary(row):
+        """
+        Convert a database row to an issue summary.
+        """
+        created = row[9]
+        if created is not None:
+            try:
+                created = datetime.datetime.fromisoformat(created)
+            except ValueError:
+                pass
+        return IssueSummary(row[0], row[5], row[6], row[7], row[8], created)
@@ -0,0 +1,259 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import os
+import json
+import datetime
+
+from common.items import LogEntry                # pylint: disable=F0401
+from common.utils import fileutils              # pylint: disable=F0401
+
+
+class IssueLog(object):
+    """
+    An append-only file containing the event log of an issue.
+
+    Each log entry is a JSON array of timestamp, creator, action
+    and comment on its own line. Adding an entry appends a line,
+    so the cost doesn't depend on the length of the log, and
+    version control diffs contain only the new entries.
+
+    A line not ending in a newline is the remains of an interrupted
+    append. It is ignored when reading and removed before appending.
+    """
+    # bytes read from the end of the file to find the last entry
+    TAIL_SIZE = 4096
+
+    def __init__(self, path):
+        """
+        Initialize IssueLog.
+
+        Parameters:
+        - path: path of the log file
+        """
+        self.path = path
+
+    def exists(self):
+        """
+        Check if the log file exists.
+        """
+        return os.path.exists(self.path)
+
+    def get_size(self):
+        """
+        Get size of the log file.
+
+        Returns:
+        - size in bytes
+        - None if the file doesn't exist
+        """
+        try:
+            return os.stat(self.path).st_size
+        except FileNotFoundError:
+            return None
+
+    def count_entries(self):
+        """
+        Count entries of the log without parsing them.
+
+        Returns:
+        - (number of entries, size of the file in bytes) tuple
+        - (0, None) if the file doesn't exist
+
+        Raises:
+        - OSError if reading the file fails
+        """
+        try:
+            with open(self.path, 'rb') as stream:
+                data = stream.read()
+        except FileNotFoundError:
+            return 0, None
+        # an incomplete last entry has no newline
+        return data.count(b'\n'), len(data)
+
+    def read(self, value_pool=None):
+        """
+        Read entries of the log.
+
+        Parameters:
+        - value_pool: (optional) pool used to intern creators and actions
+
+        Returns:
+        - (list of LogEntry objects, size of the file in bytes) tuple
+        - ([], None) if the file doesn't exist
+
+        Raises:
+        - OSError if reading the file fails
+        - ValueError if an entry is invalid
+        """
+        try:
+            with open(self.path, 'rb') as stream:
+                data = stream.read()
+        except FileNotFoundError:
+            return [], None
+        lines = data.decode('utf-8').split('\n')
+        # the last line is empty, or an incomplete entry
+        entries = [self.parse_entry(line) for line in lines[:-1]]
+        return LogEntry.from_lists(entries, value_pool), len(data)
+
+    def read_last_entry(self):
+        """
+        Read the last entry of the log, without reading the whole file.
+
+        Returns:
+        - the entry as a list
+        - None if the file doesn't exist or has no entries
+
+        Raises:
+        - OSError if reading the file fails
+        - ValueError if the entry is invalid
+        """
+        chunk = self.TAIL_SIZE
+        try:
+            with open(self.path, 'rb') as stream:
+                size = stream.seek(0, os.SEEK_END)
+                while True:
+                    start = max(size - chunk, 0)
+                    stream.seek(start)
+                    # the last line is empty, or an incomplete entry
+                    lines = stream.read(size - start).split(b'\n')[:-1]
+                    # the first line may start before the chunk
+                    if len(lines) > 1 or (lines and start == 0):
+                        return self.parse_entry(lines[-1].decode('utf-8'))
+                    if start == 0:
+                        return None
+                    chunk *= 2
+        except FileNotFoundError:
+            return None
+
+    def append(self, entries, sync=False):
+        """
+        Append entries to the log.
+        The file is created if it doesn't exist.
+        Syncing the directory of a new file is left to the caller.
+
+        Parameters:
+        - entries: list of LogEntry objects or lists
+        - sync: (optional) flush the file to disk
+
+        Returns:
+        - size of the file after the append
+
+        Raises:
+        - OSError if writing fails
+        """
+        data = ''.join(self.format_entry(entry) for entry in entries).encode('utf-8')
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            size = os.lseek(fd, 0, os.SEEK_END)
+            if size > 0:
+                os.lseek(fd, size - 1, os.SEEK_SET)
+                if os.read(fd, 1) != b'\n':
+                    # drop an incomplete entry
+                    os.lseek(fd, 0, os.SEEK_SET)
+                    size = os.read(fd, size).rfind(b'\n') + 1
+                    os.ftruncate(fd, size)
+                os.lseek(fd, size, os.SEEK_SET)
+            written = 0
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            if sync:
+                os.fsync(fd)
+        finally:
+            os.close(fd)
+        return size + len(data)
+
+    def write(self, entries, sync=False):
+        """
+        Replace the log with given entries atomically.
+
+        Parameters:
+        - entries: list of LogEntry objects or lists
+        - sync: (optional) flush the file to disk
+
+        Returns:
+        - size of the written file
+
+        Raises:
+        - OSError if writing fails
+        """
+        text = ''.join(self.format_entry(entry) for entry in entries)
+        fileutils.write_file_atomically(self.path, text, sync)
+        return len(text.encode('utf-8'))
+
+    def remove_start(self, size, sync=False):
+        """
+        Remove entries from the start of the log atomically.
+        The log file is removed if no entries are left.
+
+        Parameters:
+        - size: size of the removed part in bytes, ending at an entry
+        - sync: (optional) flush the file to disk
+
+        Raises:
+        - OSError if reading or writing fails
+        """
+        with open(self.path, 'rb') as stream:
+            data = stream.read()[size:]
+        if data:
+            fileutils.write_file_atomically(self.path, data.decode('utf-8'), sync)
+        else:
+            self.remove()
+
+    def remove(self):
+        """
+        Remove the log file, if it exists.
+
+        Raises:
+        - OSError if removing fails
+        """
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def format_entry(entry):
+        """
+        Format a log entry as a line of the log file.
+
+        Parameters:
+        - entry: a LogEntry or a list
+
+        Returns:
+        - the line, ending in a newline
+        """
+        entry = list(entry)
+        if entry and hasattr(entry[0], 'isoformat'):
+            entry[0] = entry[0].isoformat()
+        return json.dumps(entry, ensure_ascii=False) + '\n'
+
+    @staticmethod
+    def parse_entry(line):
+        """
+        Parse a line of the log file.
+
+        Parameters:
+        - line: a line without the newline
+
+        Returns:
+        - entry as a list
+
+        Raises:
+        - ValueError if the line is not a valid entry
+        """
+        entry = json.loads(line)
+        if not isinstance(entry, list):
+            raise ValueError("Invalid log entry")
+        if entry and isinstance(entry[0], str):
+            try:
+                entry[0] = datetime.datetime.fromisoformat(entry[0])
+            except ValueError:
+                pass
+        return entry
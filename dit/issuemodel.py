@@ -2,42 +2,346 @@
 # -*- coding: utf-8 -*-
 
 import datetime
-import glob
 import os
+import copy
 import hashlib
 import random
 import yaml
 
-from common.items import DitIssue              # pylint: disable=F0401
+from yamlconfig import YamlConfig
+from issueparser import IssueParser, IssueParserError
+from issuelog import IssueLog
+from issuepack import IssuePack
+from common.items import DitIssue, IssueSummary, LogEntry  # pylint: disable=F0401
 from common.errors import ApplicationError      # pylint: disable=F0401
+from common.utils import fileutils              # pylint: disable=F0401
+from common.utils.filelock import FileLock      # pylint: disable=F0401
+from common import constants                    # pylint: disable=F0401
 
 
 class IssueModel(object):
     """
     Class to read and write issue YAML files
+
+    Issue files are replaced atomically, so readers never see
+    a partially written file. How the writes are flushed to disk
+    depends on the durability mode:
+    - none: not flushed, left to the operating system
+    - file: every file and the directory entry pointing to it
+            are flushed as soon as the file has been written
+    - batch: the issue directory is flushed once after a batch
+             of writes, file contents are not flushed separately
+
+    Writers lock the issue with an advisory lock, and check that
+    the issue file still has the version the written issue was read
+    from. The version is a hash of the file content.
+
+    With separate logs, the event log of an issue is kept in an
+    append-only log file next to the issue file, and the issue file
+    holds only the other fields. Logs in the issue file are moved to
+    the log file when the issue is written. Without separate logs,
+    a log file is merged back to the issue file. Issues are read the
+    same way in both modes, with the log file appended to the log
+    in the issue file.
+
+    Issues can be moved from their issue files to a pack file with
+    pack_issues. Packed issues are read and listed like the others,
+    without their own files in the issue directory. Writing a packed
+    issue creates an issue file for it, which is read instead of
+    the packed content until the issues are packed again.
     """
-    def __init__(self, issue_dir):
+    # keys needed for an issue summary
+    SUMMARY_KEYS = ('id', 'title', 'status', 'release', 'component', 'creation_time')
+
+    # error of writing an issue changed since it was read
+    STALE_ERROR = "Issue has been changed since it was read"
+
+    def __init__(self, issue_dir, workers=None, durability=None, separate_logs=False):
         """
         Initialize new IssueModel
+
+        Parameters:
+        - issue_dir: directory containing the issue files
+        - workers: (optional) number of worker processes used to read
+                   many issues at once, by default the number of CPUs
+        - durability: (optional) durability mode of writes,
+                      one of constants.write_durability, none by default
+        - separate_logs: (optional) write event logs to separate log files
         """
         self.issue_dir = issue_dir
         self.issue_prefix = "issue-"
+        self.workers = workers
+        if durability is None:
+            durability = constants.write_durability.NONE
+        modes = constants.write_durability
+        if durability not in [getattr(modes, name) for name in modes]:
+            raise ApplicationError("Invalid write durability: {}".format(durability))
+        self.durability = durability
+        self.separate_logs = separate_logs
+        # less issues than this are always read in the calling process
+        self.parallel_threshold = 500
+        # less issues than this are always written in the calling process
+        self.parallel_write_threshold = 100
+        # times a change is applied to a changed issue before giving up
+        self.write_attempts = 5
+        self.parser = IssueParser()
+        # pool used to intern repeated fields of read issues
+        self.value_pool = None
+        self.pack = IssuePack(issue_dir)
+        self._lock_dir = None
 
-    def read_issue_yaml(self, identifier):
+    def read_issue(self, identifier):
         """
         Read an existing issue from a YAML file.
 
+        The file is parsed with IssueParser. Files it doesn't
+        support are loaded with the generic YAML loader.
+
         Parameters:
         - identifier: SHA hash identifier of the issue
 
         Returns:
-        - issue data as a IssueYamlObject
+        - issue as a DitIssue, with the version of its files
+
+        Raises:
+        - ApplicationError if reading the issue fails
+        """
+        text = self._read_issue_text(identifier)
+        issue = self._parse_issue(text)
+        try:
+            entries, log_size = self.get_issue_log(identifier).read(self.value_pool)
+        except (OSError, ValueError):
+            raise ApplicationError("Error reading issue log file")
+        if log_size is not None:
+            issue.log = (issue.log or []) + entries
+        issue.version = self._get_version(text, log_size)
+        return issue
+
+    def get_issue_log(self, identifier):
+        """
+        Get the separate log file of an issue.
+
+        Parameters:
+        - identifier: issue hash identifier
+
+        Returns:
+        - an IssueLog, the file may not exist
+        """
+        return IssueLog("{}/{}{}.log".format(self.issue_dir, self.issue_prefix, identifier))
+
+    def _read_issue_text(self, identifier):
+        """
+        Read content of an issue file, or of the packed issue
+        if the issue has no file.
+
+        Raises:
+        - ApplicationError if reading the issue fails
+        """
+        try:
+            text = self._read_stored_text(identifier)
+        except Exception:
+            raise ApplicationError("Error reading issue yaml file")
+        if text is None:
+            raise ApplicationError("Error reading issue yaml file")
+        return text
+
+    def _read_stored_text(self, identifier):
+        """
+        Read content of an issue file, or of the packed issue
+        if the issue has no file.
+
+        Returns:
+        - content of the issue
+        - None if the issue doesn't exist
+
+        Raises:
+        - OSError, ValueError if reading fails
         """
         issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier)
         try:
             with open(issue_file, 'r') as stream:
-                issue_data = yaml.load(stream, Loader=yaml.Loader)
-                return issue_data
+                return stream.read()
+        except FileNotFoundError:
+            return self.pack.read_text(identifier)
+
+    def _parse_issue(self, text):
+        """
+        Parse content of an issue file to a DitIssue.
+
+        Raises:
+        - ApplicationError if parsing fails
+        """
+        try:
+            try:
+                issue = IssueYamlObject.dict_to_dit_issue(self.parser.parse(text),
+                                                          self.value_pool)
+            except IssueParserError:
+                issue = YamlConfig.load(text).to_dit_issue(self.value_pool)
+        except Exception:
+            raise ApplicationError("Error reading issue yaml file")
+        return issue
+
+    @staticmethod
+    def _get_version(text, log_size):
+        """
+        Get version of an issue.
+
+        Parameters:
+        - text: content of the issue file
+        - log_size: size of the log file, None if there is no log file
+
+        Returns:
+        - hash of the content, followed by the size of the log file
+        """
+        version = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        if log_size is not None:
+            # the log file is only appended to, its size is enough
+            version += "+{}".format(log_size)
+        return version
+
+    def _read_current_version(self, identifier):
+        """
+        Read current version of an issue.
+
+        Returns:
+        - (content of the issue file, version) tuple
+
+        Raises:
+        - ApplicationError if reading the issue fails
+        """
+        text = self._read_issue_text(identifier)
+        return text, self._get_version(text, self.get_issue_log(identifier).get_size())
+
+    def lock_issue(self, identifier):
+        """
+        Get an advisory lock for modifying an issue.
+
+        The lock files are kept in the .locks directory of the issue
+        directory, so every process writing the issues uses the same
+        locks. Nothing is locked if the directory can't be created.
+
+        Parameters:
+        - identifier: issue hash identifier
+
+        Returns:
+        - a FileLock, to be used as a context manager
+        """
+        return self._get_lock(identifier)
+
+    def _get_lock(self, name):
+        """
+        Get an advisory lock with given name.
+
+        Returns:
+        - a FileLock
+        """
+        if self._lock_dir is None:
+            lock_dir = os.path.join(self.issue_dir, '.locks')
+            try:
+                os.makedirs(lock_dir, exist_ok=True)
+                ignore_file = os.path.join(lock_dir, '.gitignore')
+                if not os.path.exists(ignore_file):
+                    # lock files are not committed with the issues
+                    with open(ignore_file, 'w') as stream:
+                        stream.write('*\n')
+                self._lock_dir = lock_dir
+            except OSError:
+                self._lock_dir = ''
+        if not self._lock_dir:
+            return FileLock(None)
+        return FileLock(os.path.join(self._lock_dir, "{}.lock".format(name)))
+
+    def write_issue(self, issue, change=None):
+        """
+        Write an issue to its file.
+
+        If the issue was read from its file, and the file has been
+        changed since, the file is read again. The change made to the
+        issue is then applied to the current content with the given
+        function and the result is written instead.
+
+        Parameters:
+        - issue: a DitIssue to write
+        - change: (optional) function applying the change made to
+                  the issue to a given DitIssue
+
+        Returns:
+        - the written DitIssue, the given issue or a new one if
+          the change was applied to the current content
+
+        Raises:
+        - ApplicationError if writing fails, or the issue has been changed
+          and no change function is given
+        """
+        try:
+            lock = self.lock_issue(issue.identifier)
+            lock.acquire()
+        except OSError:
+            raise ApplicationError("Error locking issue yaml file")
+        try:
+            for _ in range(self.write_attempts):
+                if issue.version is not None:
+                    _, version = self._read_current_version(issue.identifier)
+                    if version != issue.version:
+                        if change is None:
+                            raise ApplicationError(self.STALE_ERROR)
+                        issue = self.read_issue(issue.identifier)
+                        change(issue)
+                        continue
+                issue.version = self._store_issue(IssueYamlObject.from_dit_issue(issue), False)
+                return issue
+        finally:
+            lock.release()
+        raise ApplicationError(self.STALE_ERROR)
+
+    def append_log_entries(self, identifier, entries):
+        """
+        Add entries to the event log of an issue.
+
+        With separate logs, the entries are appended to the log file
+        of the issue, without reading or writing the issue file.
+        Otherwise the whole issue is read and written.
+
+        Parameters:
+        - identifier: issue hash identifier
+        - entries: list of LogEntry objects
+
+        Raises:
+        - ApplicationError if writing fails or the issue doesn't exist
+        """
+        if not self.separate_logs:
+            issue = self.read_issue(identifier)
+            issue.log = (issue.log or []) + list(entries)
+            self.write_issue(issue, lambda current: setattr(
+                    current, 'log', (current.log or []) + list(entries)))
+            return
+
+        issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier)
+        log = self.get_issue_log(identifier)
+        try:
+            with self.lock_issue(identifier):
+                if not os.path.exists(issue_file) and not self.pack.contains(identifier):
+                    raise ApplicationError("Issue not found: {}".format(identifier))
+                created = not log.exists()
+                log.append(entries, self.durability == constants.write_durability.FILE)
+                if created and self.durability != constants.write_durability.NONE:
+                    fileutils.sync_directory(self.issue_dir)
+        except (OSError, ValueError):
+            raise ApplicationError("Error writing issue log file")
+
+    def read_issue_yaml(self, identifier):
+        """
+        Read an existing issue from a YAML file.
+
+        Parameters:
+        - identifier: SHA hash identifier of the issue
+
+        Returns:
+        - issue data as a IssueYamlObject
+        """
+        text = self._read_issue_text(identifier)
+        try:
+            return YamlConfig.load(text)
         except Exception:
             raise ApplicationError("Error reading issue yaml file")
 
@@ -45,30 +349,527 @@ class IssueModel(object):
         """
         Write issue data to a YAML file.
 
+        The file is overwritten without checking its version.
+
+        Parameters:
+        - issue: issue data as a IssueYamlObject
+        """
+        try:
+            with self.lock_issue(issue.id):
+                self._store_issue(issue, False)
+        except OSError:
+            raise ApplicationError("Error locking issue yaml file")
+
+    def _store_issue(self, issue, in_batch):
+        """
+        Write issue data to its files.
+        The issue must be locked by the caller.
+
+        The issue file is replaced atomically. With separate logs,
+        new log entries are appended to the log file and the issue
+        file is written only if the rest of the issue has changed.
+
         Parameters:
         - issue: issue data as a IssueYamlObject
+        - in_batch: True if the issue directory is synced after
+                    the whole batch in batch durability mode
+
+        Returns:
+        - version of the written issue
         """
         issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, issue.id)
+        log = self.get_issue_log(issue.id)
+        durability = self.durability
+        sync = durability == constants.write_durability.FILE
         try:
-            with open(issue_file, 'w') as stream:
-                yaml_data = yaml.dump(issue, default_flow_style=False, explicit_start=True)
-                stream.write(yaml_data)
+            if not self.separate_logs:
+                # keep the log last, so it can be skipped when reading summaries
+                text = self._dump_issue_yaml(issue)
+                fileutils.write_file_atomically(issue_file, text, sync)
+                # the log is now in the issue file
+                log.remove()
+                log_size = None
+                directory_changed = True
+            else:
+                text, log_size, directory_changed = self._store_separate_log(
+                        issue, issue_file, log, sync)
+            if directory_changed and (sync or (durability == constants.write_durability.BATCH
+                                               and not in_batch)):
+                fileutils.sync_directory(self.issue_dir)
         except Exception:
             raise ApplicationError("Error writing issue yaml file")
+        return self._get_version(text, log_size)
+
+    def _store_separate_log(self, issue, issue_file, log, sync):
+        """
+        Write issue data to an issue file without the log,
+        and the log to a separate log file.
+
+        Returns:
+        - (content of the issue file, size of the log file,
+           True if files were created or replaced) tuple
+        """
+        try:
+            with open(issue_file, 'r') as stream:
+                current_text = stream.read()
+        except FileNotFoundError:
+            current_text = None
+        # the log of a packed issue is in the pack
+        stored_text = current_text
+        if stored_text is None:
+            stored_text = self.pack.read_text(issue.id)
+        inline_log = None
+        if stored_text is not None:
+            inline_log = self._parse_log_events(stored_text)
+        entries = issue.log_events or []
+        stored_count, log_size = log.count_entries()
+
+        directory_changed = False
+        if not inline_log and len(entries) >= stored_count:
+            new_entries = entries[stored_count:]
+            if new_entries:
+                directory_changed = log_size is None
+                log_size = log.append(new_entries, sync)
+        else:
+            # move the whole log to the log file
+            log_size = log.write(entries, sync)
+            directory_changed = True
+
+        issue = copy.copy(issue)
+        issue.log_events = []
+        text = self._dump_issue_yaml(issue)
+        if text != current_text:
+            fileutils.write_file_atomically(issue_file, text, sync)
+            directory_changed = True
+        return text, log_size, directory_changed
+
+    def _parse_log_events(self, text):
+        """
+        Parse the log in the content of an issue file.
+
+        Returns:
+        - list of log events as lists
+        """
+        try:
+            return self.parser.parse(text, ('log_events',)).get('log_events')
+        except IssueParserError:
+            return getattr(YamlConfig.load(text), 'log_events', None)
+
+    def _parse_last_log_event(self, text):
+        """
+        Parse the last event of the log in the content of an issue file.
+        The log is the last item in issue files, so only the end of
+        the text is parsed, unless it is in an unexpected format.
+
+        Returns:
+        - the log event as a list
+        - None if the log is empty
+
+        Raises:
+        - ApplicationError if parsing fails
+        """
+        start = text.find('\nlog_events:')
+        last = text.rfind('\n- ', start)
+        if start >= 0 and last >= 0:
+            tail = '--- {}\nlog_events:{}'.format(IssueParser.ISSUE_TAG, text[last:])
+            try:
+                events = self.parser.parse(tail, ('log_events',)).get('log_events')
+                if events:
+                    return events[-1]
+            except IssueParserError:
+                pass
+        try:
+            events = self._parse_log_events(text)
+        except Exception:
+            raise ApplicationError("Error reading issue yaml file")
+        return events[-1] if events else None
+
+    @staticmethod
+    def _dump_issue_yaml(issue):
+        """
+        Dump issue data as the content of an issue file.
+        """
+        return YamlConfig.dump(issue, default_flow_style=False,
+                               explicit_start=True, sort_keys=False)
+
+    def write_issues_bulk(self, issues, versions=None):
+        """
+        Write data of many issues to their YAML files.
+
+        Issues are serialised and written in parallel using a pool
+        of worker processes. Small amounts of issues are written
+        serially, as starting the worker processes would cost more.
+        Failing to write an issue doesn't stop writing the others.
+        In batch durability mode the issue directory is synced once
+        after all issues have been written.
+
+        Parameters:
+        - issues: list of issue data as IssueYamlObjects
+        - versions: (optional) list of versions of the issue files the issues
+                    were read from, issues whose files have been changed
+                    since fail with STALE_ERROR, None to not check a version
+
+        Returns:
+        - list of (version, error message) tuples in the same order as
+          the issues, with the version of the written file and None for
+          each issue written successfully, and None and an error message
+          for the issues that failed
+        """
+        issues = list(issues)
+        if versions is None:
+            versions = [None] * len(issues)
+        results = self._write_issues_parallel(issues, list(versions))
+        if self.durability == constants.write_durability.BATCH and \
+                any(error is None for _, error in results):
+            try:
+                fileutils.sync_directory(self.issue_dir)
+            except OSError:
+                error_message = "Error syncing issue directory"
+                results = [(None, error or error_message) for _, error in results]
+        return results
+
+    def _write_issues_parallel(self, issues, versions):
+        """
+        Write issues in worker processes, if there are enough of them.
+
+        Returns:
+        - list of (version, error message) tuples, like write_issues_bulk
+        """
+        workers = self._get_worker_count(len(issues), 10)
+        if workers < 2 or len(issues) < self.parallel_write_threshold:
+            return self._write_issues_serially(issues, versions)
+
+        import concurrent.futures
+
+        chunks = [issues[i::workers] for i in range(workers)]
+        version_chunks = [versions[i::workers] for i in range(workers)]
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, mp_context=_get_process_context()) as executor:
+                chunk_results = list(executor.map(_write_issue_yamls,
+                        [self.issue_dir] * workers, [self.durability] * workers,
+                        [self.separate_logs] * workers, chunks, version_chunks))
+        except (OSError, concurrent.futures.process.BrokenProcessPool):
+            # unable to use worker processes
+            return self._write_issues_serially(issues, versions)
+
+        results = [None] * len(issues)
+        for i, chunk_result in enumerate(chunk_results):
+            results[i::workers] = chunk_result
+        return results
+
+    def _write_issues_serially(self, issues, versions):
+        """
+        Write issues one at a time as a batch.
+
+        Returns:
+        - list of (version, error message) tuples, like write_issues_bulk
+        """
+        results = []
+        for issue, version in zip(issues, versions):
+            try:
+                with self.lock_issue(issue.id):
+                    if version is not None and \
+                            self._read_current_version(issue.id)[1] != version:
+                        raise ApplicationError(self.STALE_ERROR)
+                    results.append((self._store_issue(issue, True), None))
+            except ApplicationError as e:
+                results.append((None, e.error_message))
+            except OSError:
+                results.append((None, "Error locking issue yaml file"))
+        return results
 
     def remove_issue_yaml(self, identifier):
         """
-        Remove issue .yaml file
+        Remove issue .yaml file, and the issue from the pack
 
         Parameters:
         - identifier: issue hash identifier
         """
         issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier)
+        sync = self.durability != constants.write_durability.NONE
         try:
-            os.remove(issue_file)
+            with self._get_lock('pack'), self.lock_issue(identifier) as lock:
+                removed = False
+                if os.path.exists(issue_file):
+                    os.remove(issue_file)
+                    removed = True
+                removed = self.pack.remove([identifier], sync) > 0 or removed
+                if removed:
+                    self.get_issue_log(identifier).remove()
+                lock.remove()
+            if not removed:
+                raise FileNotFoundError(issue_file)
+            if sync:
+                fileutils.sync_directory(self.issue_dir)
         except Exception:
             raise ApplicationError("Error removing issue yaml file")
 
+    def pack_issues(self, identifiers):
+        """
+        Move issues from their files to the pack.
+
+        A new pack is written with the given issues, their logs
+        merged to them, and the issues already in the pack. Packed
+        issues that have an issue file, and are not given, are left
+        out of the new pack. The files of the given issues are then
+        removed, unless the issues have been changed meanwhile.
+
+        Parameters:
+        - identifiers: hash identifiers of the issues to pack
+
+        Returns:
+        - number of issues moved to the pack
+
+        Raises:
+        - ApplicationError if packing fails
+        """
+        identifiers = set(identifiers)
+        sync = self.durability != constants.write_durability.NONE
+        # versions of the files of the issues when they were packed
+        file_versions = {}
+
+        def packed_issues(loose):
+            kept = [identifier for identifier in self.pack.get_identifiers()
+                    if identifier not in loose and identifier not in identifiers]
+            yield from self.pack.iter_texts(kept)
+            for identifier in sorted(identifiers):
+                with self.lock_issue(identifier):
+                    version = self._read_file_version(identifier)
+                    if version == (None, None):
+                        # packed already
+                        text = self.pack.read_text(identifier)
+                        if text is None:
+                            raise ApplicationError(
+                                    "Issue not found: {}".format(identifier))
+                    else:
+                        issue = self.read_issue(identifier)
+                        text = self._dump_issue_yaml(IssueYamlObject.from_dit_issue(issue))
+                        file_versions[identifier] = version
+                yield identifier, text
+
+        try:
+            with self._get_lock('pack'):
+                self.pack.write(packed_issues(self._scan_files()), sync)
+                for identifier, version in file_versions.items():
+                    with self.lock_issue(identifier) as lock:
+                        self._remove_packed_files(identifier, version)
+                        lock.remove()
+            if sync and file_versions:
+                fileutils.sync_directory(self.issue_dir)
+        except (OSError, ValueError):
+            raise ApplicationError("Error writing issue pack file")
+        return len(file_versions)
+
+    def _read_file_version(self, identifier):
+        """
+        Get version of the files of an issue, ignoring the pack.
+
+        Returns:
+        - (hash of the issue file, size of the log file) tuple,
+          with None in place of a file that doesn't exist
+        """
+        issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier)
+        try:
+            with open(issue_file, 'rb') as stream:
+                text_hash = hashlib.sha1(stream.read()).hexdigest()
+        except FileNotFoundError:
+            text_hash = None
+        return text_hash, self.get_issue_log(identifier).get_size()
+
+    def _remove_packed_files(self, identifier, version):
+        """
+        Remove the files of an issue written to the pack.
+        The issue must be locked by the caller.
+
+        Parameters:
+        - identifier: issue hash identifier
+        - version: version of the files when the issue was packed
+        """
+        text_hash, log_size = version
+        current_hash, current_log_size = self._read_file_version(identifier)
+        if current_hash != text_hash:
+            # the issue file has been written, and is read instead of the pack
+            return
+        if current_hash is not None:
+            os.remove("{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier))
+        log = self.get_issue_log(identifier)
+        if current_log_size == log_size:
+            log.remove()
+        elif current_log_size is not None:
+            # keep entries appended after packing
+            log.remove_start(log_size or 0)
+
+    def unpack_issues(self, identifiers):
+        """
+        Move issues from the pack back to their own files.
+        Issues not in the pack are ignored.
+
+        Parameters:
+        - identifiers: hash identifiers of the issues
+
+        Raises:
+        - ApplicationError if unpacking fails
+        """
+        sync = self.durability == constants.write_durability.FILE
+        try:
+            with self._get_lock('pack'):
+                packed = [identifier for identifier in identifiers
+                          if self.pack.contains(identifier)]
+                for identifier, text in self.pack.iter_texts(packed):
+                    issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix,
+                                                      identifier)
+                    with self.lock_issue(identifier):
+                        if not os.path.exists(issue_file):
+                            fileutils.write_file_atomically(issue_file, text, sync)
+                if self.durability != constants.write_durability.NONE:
+                    fileutils.sync_directory(self.issue_dir)
+                self.pack.remove(packed, self.durability != constants.write_durability.NONE)
+        except (OSError, ValueError):
+            raise ApplicationError("Error unpacking issues")
+
+    def get_issue_version(self, identifier):
+        """
+        Get version of an issue file.
+        The version changes when the file or its log file is modified.
+
+        Parameters:
+        - identifier: issue hash identifier
+
+        Returns:
+        - (mtime_ns, size) tuple, like in scan_issue_files, followed by
+          mtime_ns and size of the log file if the issue has a log file
+        - None if the issue is not found
+        """
+        issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier)
+        try:
+            stat = os.stat(issue_file)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            try:
+                version = self.pack.get_file_stats().get(identifier)
+            except (OSError, ValueError):
+                version = None
+            if version is None:
+                return None
+        try:
+            log_stat = os.stat(self.get_issue_log(identifier).path)
+        except OSError:
+            return version
+        return version + (log_stat.st_mtime_ns, log_stat.st_size)
+
+    def read_issue_summary(self, identifier):
+        """
+        Read summary information of an existing issue from a YAML file.
+
+        Parameters:
+        - identifier: SHA hash identifier of the issue
+
+        Returns:
+        - issue summary as an IssueSummary
+
+        Raises:
+        - ApplicationError if reading the issue fails
+        """
+        text = self._read_issue_text(identifier)
+        try:
+            try:
+                data = self.parser.parse(text, self.SUMMARY_KEYS)
+                return IssueYamlObject.dict_to_issue_summary(data)
+            except IssueParserError:
+                return YamlConfig.load(text).to_issue_summary()
+        except Exception:
+            raise ApplicationError("Error reading issue yaml file")
+
+    def read_last_change_time(self, identifier):
+        """
+        Read time of the last event in the log of an issue.
+
+        Only the last entry of the log is parsed, so this is much
+        cheaper than reading the whole issue.
+
+        Parameters:
+        - identifier: SHA hash identifier of the issue
+
+        Returns:
+        - timestamp of the last log entry
+        - None if the issue has no log entries
+
+        Raises:
+        - ApplicationError if reading the issue fails
+        """
+        try:
+            entry = self.get_issue_log(identifier).read_last_entry()
+        except (OSError, ValueError):
+            raise ApplicationError("Error reading issue log file")
+        if entry is None:
+            # the log file is appended to the log in the issue file
+            entry = self._parse_last_log_event(self._read_issue_text(identifier))
+        if not entry:
+            return None
+        return entry[0]
+
+    def read_issues_bulk(self, identifiers):
+        """
+        Read summary information of many issues.
+
+        Issue files are parsed in parallel using a pool of worker
+        processes. Small amounts of issues are read serially,
+        as starting the worker processes would cost more.
+
+        Parameters:
+        - identifiers: list of issue identifiers
+
+        Returns:
+        - list of IssueSummary objects in the same order as the identifiers
+
+        Raises:
+        - ApplicationError if reading any of the issues fails
+        """
+        identifiers = list(identifiers)
+        workers = self._get_worker_count(len(identifiers), 50)
+        if workers < 2 or len(identifiers) < self.parallel_threshold:
+            return [self.read_issue_summary(identifier) for identifier in identifiers]
+
+        # imported only when needed, as importing it is slow compared to
+        # the startup time of simple commands
+        import concurrent.futures
+
+        # split into several chunks per worker to balance the load
+        chunk_count = workers * 4
+        chunks = [identifiers[i::chunk_count] for i in range(chunk_count)]
+        try:
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=workers, mp_context=_get_process_context()) as executor:
+                results = list(executor.map(_read_issue_summaries,
+                        [self.issue_dir] * chunk_count, chunks))
+        except (OSError, concurrent.futures.process.BrokenProcessPool):
+            # unable to use worker processes
+            return [self.read_issue_summary(identifier) for identifier in identifiers]
+
+        summaries = {}
+        for chunk, (result, error_message) in zip(chunks, results):
+            if error_message is not None:
+                raise ApplicationError(error_message)
+            summaries.update(zip(chunk, result))
+        return [summaries[identifier] for identifier in identifiers]
+
+    def _get_worker_count(self, count, min_per_worker):
+        """
+        Get number of worker processes to use for handling many issues.
+
+        Parameters:
+        - count: number of issues to handle
+        - min_per_worker: minimum number of issues for each worker
+
+        Returns:
+        - number of workers, less than 2 if workers shouldn't be used
+        """
+        workers = self.workers
+        if workers is None:
+            workers = os.cpu_count() or 1
+        return min(workers, count // min_per_worker + 1)
+
     def list_issue_identifiers(self):
         """
         Return a list of all known issue identifiers.
@@ -76,19 +877,99 @@ class IssueModel(object):
         Returns:
         - a list of valid issue identifiers
         """
-        issue_file_format = '/issue-*.yaml'
-        issue_files = glob.glob(self.issue_dir + issue_file_format)
-        identifiers = []
+        return list(self.scan_issue_files())
+
+    def scan_issue_files(self):
+        """
+        Scan the issue directory for issue files, and the pack
+        for packed issues.
+
+        Only regular files are included. File status information
+        is provided by the directory scan itself on most platforms,
+        so this is cheap compared to reading the files. Packed
+        issues are listed from the pack index, without files
+        of their own in the directory.
+
+        Issues with a separate log file have mtime_ns and size of the log
+        file appended to their status information, like in get_issue_version,
+        so appending to the log changes it too.
+
+        Returns:
+        - a dictionary of issue identifiers mapped to (mtime_ns, size) tuples,
+          or (-1, checksum) tuples for packed issues without an issue file,
+          followed by mtime_ns and size of the log file if the issue has one
+        """
+        log_files = {}
+        issue_files = self._scan_files(log_files)
+        try:
+            for identifier, version in self.pack.get_file_stats().items():
+                issue_files.setdefault(identifier, version)
+        except (OSError, ValueError):
+            pass
+        for identifier, log_stat in log_files.items():
+            stat = issue_files.get(identifier)
+            if stat is not None:
+                issue_files[identifier] = stat + log_stat
+        return issue_files
+
+    def get_directory_fingerprint(self):
+        """
+        Get status information of the issue directory and the pack index.
 
-        # loop all issue files
-        for i, f in enumerate(issue_files):
-            # first remove everything else except regular files
-            if not os.path.isfile(f):
-                issue_files.pop(i)
-                continue
-            identifiers.append(f[-45:-5])
+        The modification time of the directory changes when issue files
+        are added, removed or replaced, like when issues are written.
+        Issue files modified in place, without replacing them, are not
+        noticed.
 
-        return identifiers
+        Returns:
+        - a tuple of integers, starting with mtime_ns of the directory
+        - None if the issue directory can't be read
+        """
+        try:
+            stat = os.stat(self.issue_dir)
+        except OSError:
+            return None
+        fingerprint = (stat.st_mtime_ns, stat.st_ino, stat.st_dev)
+        try:
+            index_stat = os.stat(self.pack.index_path)
+        except OSError:
+            return fingerprint + (0, 0, 0)
+        return fingerprint + (index_stat.st_mtime_ns, index_stat.st_size, index_stat.st_ino)
+
+    def _scan_files(self, log_files=None):
+        """
+        Scan the issue directory for issue files.
+
+        Parameters:
+        - log_files: (optional) a dictionary to add the identifiers
+                     of issues with a log file to, mapped to
+                     (mtime_ns, size) tuples of the log files
+
+        Returns:
+        - a dictionary of issue identifiers mapped to (mtime_ns, size) tuples
+        """
+        issue_files = {}
+        prefix_len = len(self.issue_prefix)
+        try:
+            with os.scandir(self.issue_dir) as entries:
+                for entry in entries:
+                    name = entry.name
+                    if not name.startswith(self.issue_prefix):
+                        continue
+                    if name.endswith('.yaml'):
+                        found = issue_files
+                    elif name.endswith('.log') and log_files is not None:
+                        found = log_files
+                    else:
+                        continue
+                    if not entry.is_file():
+                        continue
+                    stat_result = entry.stat()
+                    found[name[prefix_len:name.rindex('.')]] = (stat_result.st_mtime_ns,
+                                                                stat_result.st_size)
+        except OSError:
+            pass
+        return issue_files
 
     def generate_new_identifier(self):
         """
@@ -97,18 +978,79 @@ class IssueModel(object):
         Returns:
         - new issue identifier string
         """
-        identifiers = self.list_issue_identifiers()
         sha = hashlib.sha1()
         for i in range(10):
             sha.update(datetime.datetime.utcnow().strftime(
-                "%Y%m%d%H%M%S-{}-{}".format(i, random.randint(0, 10000))).encode('utf-8'))
+                "%Y%m%d%H%M%S-{}-{}".format(i, random.getrandbits(64))).encode('utf-8'))
             identifier = sha.hexdigest()
-            if identifier not in identifiers:
-                return identifier
+            # checking just the new identifier is much faster than
+            # listing all issues when there are many of them
+            issue_file = "{}/{}{}.yaml".format(self.issue_dir, self.issue_prefix, identifier)
+            try:
+                if not os.path.exists(issue_file) and not self.pack.contains(identifier):
+                    return identifier
+            except (OSError, ValueError):
+                raise ApplicationError("Error reading issue pack file")
 
         raise ApplicationError("Unable to generate unique issue identifier")
 
 
+def _get_process_context():
+    """
+    Get the multiprocessing context for starting worker processes.
+
+    Workers are not forked from the calling process, as it may have
+    other threads running, like the GUI does. Forking a process with
+    threads can leave locks held in the child, and deadlock it.
+
+    Returns:
+    - a multiprocessing context using forkserver, or spawn
+      where forkserver is not available
+    """
+    import multiprocessing
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('forkserver')
+    return multiprocessing.get_context('spawn')
+
+
+def _read_issue_summaries(issue_dir, identifiers):
+    """
+    Read summaries of given issues. Run in a worker process.
+
+    Parameters:
+    - issue_dir: directory containing the issue files
+    - identifiers: list of issue identifiers
+
+    Returns:
+    - a tuple of list of IssueSummary objects and an error message (None on success)
+    """
+    model = IssueModel(issue_dir)
+    try:
+        return [model.read_issue_summary(identifier) for identifier in identifiers], None
+    except ApplicationError as e:
+        return [], e.error_message
+
+
+def _write_issue_yamls(issue_dir, durability, separate_logs, issues, versions):
+    """
+    Write given issues to their files. Run in a worker process.
+
+    Parameters:
+    - issue_dir: directory containing the issue files
+    - durability: durability mode of the writes
+    - separate_logs: write logs to separate log files
+    - issues: list of IssueYamlObjects
+    - versions: list of expected versions of the issue files
+
+    Returns:
+    - list of (version, error message) tuples, like IssueModel.write_issues_bulk
+    """
+    YamlConfig.add_representers()
+    model = IssueModel(issue_dir, durability=durability, separate_logs=separate_logs)
+    return model._write_issues_serially(issues, versions)
+
+
+@YamlConfig.register_yaml_object
 class IssueYamlObject(yaml.YAMLObject):
     """
     Issue to and from YAML conversion (meta)class
@@ -173,36 +1115,100 @@ class IssueYamlObject(yaml.YAMLObject):
 
         return cls(issue.title, issue.description, issue_type, issue.component, issue.release,
                 issue.creator, status, disposition, issue.created, issue.references,
-                issue.identifier, issue.log)
+                issue.identifier, LogEntry.to_lists(issue.log))
 
-    def to_dit_issue(self):
+    def to_dit_issue(self, value_pool=None):
         """
         Create a new DitIssue containing the information in this class
 
+        Parameters:
+        - value_pool: (optional) pool used to intern repeated fields
+
+        Returns:
+        - new DitIssue
+        """
+        return self.dict_to_dit_issue(self.__dict__, value_pool)
+
+    def to_issue_summary(self):
+        """
+        Create a new IssueSummary containing the information in this class
+
+        Returns:
+        - new IssueSummary
+        """
+        return self.dict_to_issue_summary(self.__dict__)
+
+    @staticmethod
+    def dict_to_issue_summary(data):
+        """
+        Create a new IssueSummary from issue file data
+
+        Parameters:
+        - data: a dictionary of issue file keys mapped to their values,
+                only the keys in IssueModel.SUMMARY_KEYS are needed
+
+        Returns:
+        - new IssueSummary
+        """
+        status = data['status']
+        if status and status[0] == ':':
+            status = status[1:]
+        status = status.replace('_', ' ')
+
+        release = data['release']
+        if release == '':
+            release = None
+
+        return IssueSummary(data['id'], data['title'], status, release, data['component'],
+                data['creation_time'])
+
+    @staticmethod
+    def dict_to_dit_issue(data, value_pool=None):
+        """
+        Create a new DitIssue from issue file data
+
+        Parameters:
+        - data: a dictionary of issue file keys mapped to their values
+        - value_pool: (optional) pool used to intern type, component, status,
+                      disposition, release, reporter and log entry creators
+                      and actions
+
         Returns:
         - new DitIssue
         """
-        issue_type = self.type
+        issue_type = data['type']
         if issue_type and issue_type[0] == ':':
             issue_type = issue_type[1:]
 
-        status = self.status
+        status = data['status']
         if status and status[0] == ':':
             status = status[1:]
         status = status.replace('_', ' ')
 
-        disposition = self.disposition
+        disposition = data['disposition']
         if disposition and disposition[0] == ':':
             disposition = disposition[1:]
 
-        release = self.release
+        release = data['release']
         if release == '':
             release = None
 
+        component = data['component']
+        reporter = data['reporter']
+        if value_pool is not None:
+            intern = value_pool.intern
+            issue_type = intern(issue_type)
+            component = intern(component)
+            status = intern(status)
+            disposition = intern(disposition)
+            release = intern(release)
+            reporter = intern(reporter)
+
         # identifier used also as name (name is generated and can't be known yet)
-        return DitIssue(self.title, self.id, issue_type, self.component, status, disposition,
-                self.desc, self.reporter, self.creation_time, release,
-                self.references, self.id, self.log_events)
+        return DitIssue(data['title'], data['id'], issue_type, component, status,
+                disposition, data['desc'], reporter, data['creation_time'], release,
+                data['references'], data['id'],
+                LogEntry.from_lists(data['log_events'], value_pool))
 
     def __repr__(self):
         return "{} (title={}, desc={}, type={}, component={}, release={}, reporter={}, status={},\
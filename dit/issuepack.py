@@ -0,0 +1,305 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import os
+import random
+import hashlib
+import zlib
+
+from common.utils import fileutils              # pylint: disable=F0401
+
+
+class IssuePack(object):
+    """
+    A pack file holding the content of many issue files,
+    and an index of the issues in the pack.
+
+    The pack file is the issue files concatenated, so it is also
+    a valid YAML stream of the issues. The index file names the
+    pack file and maps each issue identifier to the offset, length
+    and CRC-32 checksum of the issue in the pack. Reading an issue
+    is a seek and a read in the pack file.
+
+    Pack files are named after a hash of their content. A new pack
+    file is written before the index is replaced, so the index
+    always names a complete pack file.
+    """
+    INDEX_NAME = 'issues.idx'
+    INDEX_HEADER = 'dit-pack 1'
+    PACK_PREFIX = 'pack-'
+    PACK_SUFFIX = '.pack'
+
+    def __init__(self, directory):
+        """
+        Initialize IssuePack.
+
+        Parameters:
+        - directory: directory containing the pack and index files
+        """
+        self.directory = directory
+        self.index_path = os.path.join(directory, self.INDEX_NAME)
+        self._index_stat = None
+        self._pack_name = None
+        self._entries = {}
+
+    def _load(self, force=False):
+        """
+        Load the index file, unless it is already loaded and unchanged.
+
+        Parameters:
+        - force: (optional) load the index even if it seems unchanged
+
+        Raises:
+        - OSError if reading the index fails
+        - ValueError if the index is invalid
+        """
+        try:
+            stat = os.stat(self.index_path)
+        except FileNotFoundError:
+            self._index_stat = None
+            self._pack_name = None
+            self._entries = {}
+            return
+        index_stat = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if index_stat == self._index_stat and not force:
+            return
+
+        with open(self.index_path, 'r', encoding='utf-8') as stream:
+            lines = stream.read().split('\n')
+        header = lines[0].rsplit(' ', 1)
+        if len(header) != 2 or header[0] != self.INDEX_HEADER:
+            raise ValueError("Invalid pack index")
+        entries = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            identifier, offset, length, checksum = line.split(' ')
+            entries[identifier] = (int(offset), int(length), int(checksum, 16))
+        self._pack_name = header[1]
+        self._entries = entries
+        self._index_stat = index_stat
+
+    def get_identifiers(self):
+        """
+        Get identifiers of the packed issues.
+
+        Returns:
+        - a list of issue identifiers
+
+        Raises:
+        - OSError, ValueError if reading the index fails
+        """
+        self._load()
+        return list(self._entries)
+
+    def contains(self, identifier):
+        """
+        Check if an issue is in the pack.
+
+        Raises:
+        - OSError, ValueError if reading the index fails
+        """
+        self._load()
+        return identifier in self._entries
+
+    def get_file_stats(self):
+        """
+        Get versions of the packed issues, comparable to the status
+        information of issue files in IssueModel.scan_issue_files.
+
+        The version is -1 in place of the modification time and the
+        checksum of the issue in place of the size, so an issue keeps
+        its version when the pack is rewritten.
+
+        Returns:
+        - a dictionary of issue identifiers mapped to (-1, checksum) tuples
+
+        Raises:
+        - OSError, ValueError if reading the index fails
+        """
+        self._load()
+        return {identifier: (-1, checksum)
+                for identifier, (_, _, checksum) in self._entries.items()}
+
+    def read_text(self, identifier):
+        """
+        Read content of a packed issue.
+
+        Parameters:
+        - identifier: issue hash identifier
+
+        Returns:
+        - content of the issue file
+        - None if the issue is not in the pack
+
+        Raises:
+        - OSError if reading fails
+        - ValueError if the pack is invalid
+        """
+        for _, text in self.iter_texts([identifier]):
+            return text
+        return None
+
+    def iter_texts(self, identifiers):
+        """
+        Read content of many packed issues.
+        The pack file is opened once for all of them.
+
+        Parameters:
+        - identifiers: issue hash identifiers
+
+        Yields:
+        - (identifier, content) tuples of the issues in the pack
+
+        Raises:
+        - OSError if reading fails
+        - ValueError if the pack is invalid
+        """
+        self._load()
+        if not self._entries:
+            return
+        try:
+            stream = open(os.path.join(self.directory, self._pack_name), 'rb')
+        except FileNotFoundError:
+            # replaced after the index was loaded
+            self._load(True)
+            if not self._entries:
+                return
+            stream = open(os.path.join(self.directory, self._pack_name), 'rb')
+        with stream:
+            for identifier in identifiers:
+                entry = self._entries.get(identifier)
+                if entry is None:
+                    continue
+                offset, length, checksum = entry
+                stream.seek(offset)
+                data = stream.read(length)
+                if len(data) != length or zlib.crc32(data) != checksum:
+                    raise ValueError("Invalid pack file")
+                yield identifier, data.decode('utf-8')
+
+    def write(self, texts, sync=False):
+        """
+        Replace the pack with given issues.
+
+        Parameters:
+        - texts: iterable of (identifier, content) tuples of the issues
+        - sync: (optional) flush the files and the directory to disk
+
+        Returns:
+        - number of issues in the pack
+
+        Raises:
+        - OSError if writing fails
+        """
+        self._load()
+        old_pack = self._pack_name
+        temp_path = os.path.join(self.directory, ".{}{}-{}.tmp".format(
+                self.PACK_PREFIX, os.getpid(), random.getrandbits(32)))
+        entries = {}
+        sha = hashlib.sha1()
+        try:
+            with open(temp_path, 'xb') as stream:
+                offset = 0
+                for identifier, text in texts:
+                    data = text.encode('utf-8')
+                    stream.write(data)
+                    sha.update(data)
+                    entries[identifier] = (offset, len(data), zlib.crc32(data))
+                    offset += len(data)
+                if sync:
+                    stream.flush()
+                    os.fsync(stream.fileno())
+            if not entries:
+                os.remove(temp_path)
+            else:
+                pack_name = "{}{}{}".format(self.PACK_PREFIX, sha.hexdigest(), self.PACK_SUFFIX)
+                os.replace(temp_path, os.path.join(self.directory, pack_name))
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+
+        if entries:
+            self._write_index(pack_name, entries, sync)
+        else:
+            self._remove_index(sync)
+        if old_pack is not None and (not entries or old_pack != pack_name):
+            self._remove_pack(old_pack)
+        return len(entries)
+
+    def remove(self, identifiers, sync=False):
+        """
+        Remove issues from the pack.
+
+        Only the index is rewritten, the content of the removed
+        issues is left in the pack file until the pack is written.
+
+        Parameters:
+        - identifiers: issue hash identifiers
+        - sync: (optional) flush the index and the directory to disk
+
+        Returns:
+        - number of issues removed
+
+        Raises:
+        - OSError if writing fails
+        - ValueError if the index is invalid
+        """
+        self._load()
+        entries = dict(self._entries)
+        for identifier in identifiers:
+            entries.pop(identifier, None)
+        removed = len(self._entries) - len(entries)
+        if not removed:
+            return 0
+        if entries:
+            self._write_index(self._pack_name, entries, sync)
+        else:
+            pack_name = self._pack_name
+            self._remove_index(sync)
+            self._remove_pack(pack_name)
+        return removed
+
+    def _write_index(self, pack_name, entries, sync):
+        """
+        Replace the index file atomically.
+        """
+        lines = ["{} {}\n".format(self.INDEX_HEADER, pack_name)]
+        lines.extend("{} {} {} {:08x}\n".format(identifier, offset, length, checksum)
+                     for identifier, (offset, length, checksum) in entries.items())
+        fileutils.write_file_atomically(self.index_path, ''.join(lines), sync)
+        if sync:
+            fileutils.sync_directory(self.directory)
+        self._index_stat = None
+        self._load()
+
+    def _remove_index(self, sync):
+        """
+        Remove the index file, if it exists.
+        """
+        try:
+            os.remove(self.index_path)
+        except FileNotFoundError:
+            pass
+        if sync:
+            fileutils.sync_directory(self.directory)
+        self._load()
+
+    def _remove_pack(self, pack_name):
+        """
+        Remove a pack file no longer in use.
+        Readers holding the file open can still read it.
+        """
+        try:
+            os.remove(os.path.join(self.directory, pack_name))
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,541 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import re
+import datetime
+import yaml
+
+from common.errors import ApplicationError      # pylint: disable=F0401
+
+
+class IssueParserError(ApplicationError):
+    """
+    Raised when an issue file is not in the format supported by IssueParser
+    """
+    def __init__(self, error_message):
+        """
+        Initilize a new exception
+
+        Parameters:
+        - error_message: a description of the error
+        """
+        super(IssueParserError, self).__init__(error_message)
+
+
+class IssueParser(object):
+    """
+    A line oriented parser for issue files.
+
+    Issue files always have the same shape: a single tagged document
+    with a fixed set of top level keys, scalar values and a list of
+    log events. This parser handles only that subset of YAML,
+    which makes it a lot faster than a generic YAML loader.
+
+    Values are resolved and constructed the same way PyYAML does.
+    Anything outside of the supported subset raises IssueParserError,
+    in which case the document should be loaded with PyYAML instead.
+    """
+    ISSUE_TAG = u'!dit.random.org,2008-03-06/issue'
+    FIELDS = frozenset(['title', 'desc', 'type', 'component', 'release', 'reporter',
+                        'status', 'disposition', 'creation_time', 'references', 'id',
+                        'log_events'])
+
+    KEY_REGEXP = re.compile(r'([a-z_]+):(?: |$)')
+    BLOCK_HEADER_REGEXP = re.compile(r'\|([+-]?)([1-9]?)([+-]?) *$')
+    ANCHOR_REGEXP = re.compile(r'[&*]([0-9A-Za-z_-]+)(?: +|$)')
+    DOUBLE_QUOTED_REGEXP = re.compile(r'"((?:[^"\\]|\\.)*)"', re.S)
+    SINGLE_QUOTED_REGEXP = re.compile(r"'((?:[^']|'')*)'(?!')")
+    DOUBLE_PLAIN_REGEXP = re.compile(r'[^\\ \t\n]+')
+    SINGLE_PLAIN_REGEXP = re.compile(r"[^' \t\n]+")
+    HEX_REGEXP = re.compile(r'[0-9A-Fa-f]+\Z')
+    # timestamps written by dit, same result as with PyYAML
+    TIMESTAMP_REGEXP = re.compile(r'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d(?:\.\d{6})?\+00:00\Z')
+    UNSUPPORTED_REGEXP = re.compile(u'[\r\x85\u2028\u2029\ufeff]')
+
+    def __init__(self):
+        """
+        Initialize IssueParser
+        """
+        self.resolvers = yaml.Loader.yaml_implicit_resolvers
+        self.constructor = yaml.constructor.Constructor()
+        self.anchors = {}
+        self.last_break = True
+        # plain scalars known to be strings
+        self.plain_strings = set()
+
+    def parse(self, text, keys=None):
+        """
+        Parse the contents of an issue file.
+
+        If only some of the keys are wanted, parsing stops when all of
+        them have been found and an unwanted description is skipped.
+        The log is the last item in issue files, so it is usually not
+        parsed at all.
+
+        Parameters:
+        - text: contents of an issue file
+        - keys: (optional) keys to read, all keys by default
+
+        Returns:
+        - a dictionary of issue file keys mapped to their values
+
+        Raises:
+        - IssueParserError if the text is not in the supported format
+        """
+        if keys is None:
+            return self._parse_text(text, self.FIELDS, True)
+
+        keys = frozenset(keys)
+        end = text.find('\nlog_events:')
+        if end >= 0 and 'log_events' not in keys:
+            # try without the log first, keys may be in any order
+            try:
+                return self._parse_text(text[:end + 1], keys, False)
+            except IssueParserError:
+                pass
+        return self._parse_text(text, keys, False)
+
+    def _parse_text(self, text, keys, complete):
+        """
+        Parse the contents of an issue file.
+
+        Parameters:
+        - text: contents of an issue file
+        - keys: set of keys to read
+        - complete: True to parse and check the whole document
+
+        Returns:
+        - a dictionary of issue file keys mapped to their values
+        """
+        if (self.UNSUPPORTED_REGEXP.search(text) or
+                yaml.reader.Reader.NON_PRINTABLE.search(text)):
+            raise IssueParserError("Unsupported characters")
+        lines = text.split('\n')
+        # the last line has no line break
+        self.last_break = lines[-1] == ''
+        if self.last_break:
+            lines.pop()
+        if not lines or lines[0].rstrip(' ') != '--- ' + self.ISSUE_TAG:
+            raise IssueParserError("Not an issue document")
+
+        self.anchors = {}
+        fields = {}
+        skipped = set()
+        count = len(lines)
+        i = 1
+        while i < count:
+            line = lines[i]
+            match = self.KEY_REGEXP.match(line)
+            if match is not None:
+                key = match.group(1)
+                if key not in self.FIELDS or key in fields or key in skipped:
+                    raise IssueParserError("Unsupported key {}".format(key))
+                rest = line[match.end():]
+                if key in keys:
+                    fields[key], i = self._parse_node(lines, i, rest, 0)
+                    if not complete and len(fields) == len(keys):
+                        return fields
+                else:
+                    skipped.add(key)
+                    if key == 'desc' and rest.lstrip(' ')[:1] == '|':
+                        i = self._skip_literal(lines, i, rest)
+                    else:
+                        i = self._parse_node(lines, i, rest, 0)[1]
+                continue
+            if line.strip(' ') == '':
+                i += 1
+                continue
+            if line.rstrip(' ') == '...':
+                # document end marker, only empty lines may follow
+                if self._next_line(lines, i + 1) < count:
+                    raise IssueParserError("Unsupported line {}".format(i + 2))
+                break
+            raise IssueParserError("Unsupported line {}".format(i + 1))
+
+        if len(fields) != len(keys):
+            raise IssueParserError("Missing keys")
+        return fields
+
+    def _skip_literal(self, lines, i, header):
+        """
+        Skip a literal block scalar of a top level key.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line with the block scalar header
+        - header: the block scalar header
+
+        Returns:
+        - index of the next line to parse
+        """
+        if self.BLOCK_HEADER_REGEXP.match(header.strip(' ')) is None:
+            raise IssueParserError("Unsupported block scalar on line {}".format(i + 1))
+        i += 1
+        count = len(lines)
+        # all lines of the block are empty or indented
+        while i < count and (lines[i] == '' or lines[i][0] == ' '):
+            i += 1
+        return i
+
+    def _parse_node(self, lines, i, rest, parent_column):
+        """
+        Parse a node starting on given line.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line where the node starts
+        - rest: text of the line after the key or the sequence indicator
+        - parent_column: column of the key or the sequence indicator
+
+        Returns:
+        - a tuple of the value and the index of the next line to parse
+        """
+        rest = rest.strip(' ')
+        if rest == '':
+            j = self._next_line(lines, i + 1)
+            if j < len(lines):
+                line = lines[j]
+                column = len(line) - len(line.lstrip(' '))
+                if line[column] == '-' and line[column + 1:column + 2] in ('', ' '):
+                    if column >= parent_column:
+                        return self._parse_sequence(lines, j, column, column == parent_column)
+                if column > parent_column:
+                    raise IssueParserError("Unsupported node on line {}".format(j + 1))
+            return None, i + 1
+
+        first = rest[0]
+        if first == '&':
+            match = self.ANCHOR_REGEXP.match(rest)
+            if match is None or match.end() == len(rest) or rest[match.end()] in '&*':
+                raise IssueParserError("Unsupported anchor on line {}".format(i + 1))
+            value, i = self._parse_node(lines, i, rest[match.end():], parent_column)
+            self.anchors[match.group(1)] = value
+            return value, i
+        if first == '*':
+            match = self.ANCHOR_REGEXP.match(rest)
+            if match is None or match.end() != len(rest) or match.group(1) not in self.anchors:
+                raise IssueParserError("Unsupported alias on line {}".format(i + 1))
+            return self.anchors[match.group(1)], self._check_end(lines, i + 1, parent_column)
+        if first == '|':
+            return self._parse_literal(lines, i, rest, parent_column)
+        if first == '"' or first == "'":
+            return self._parse_quoted(lines, i, rest, parent_column)
+        if rest == '[]':
+            return [], self._check_end(lines, i + 1, parent_column)
+        if first in '!%@`#,[]{}>\t' or (first in '-?:' and rest[1:2] in ('', ' ')):
+            raise IssueParserError("Unsupported node on line {}".format(i + 1))
+        if ': ' in rest or ' #' in rest or '\t' in rest or rest[-1] == ':':
+            raise IssueParserError("Unsupported plain scalar on line {}".format(i + 1))
+        return self._resolve_plain(rest), self._check_end(lines, i + 1, parent_column)
+
+    def _parse_sequence(self, lines, i, column, indentless):
+        """
+        Parse a block sequence.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line of the first item
+        - column: column of the sequence indicators
+        - indentless: True if the sequence is at the same column as its key
+
+        Returns:
+        - a tuple of the list and the index of the next line to parse
+        """
+        items = []
+        count = len(lines)
+        while i < count:
+            line = lines[i]
+            stripped = line.lstrip(' ')
+            if stripped == '':
+                i += 1
+                continue
+            line_column = len(line) - len(stripped)
+            if line_column < column:
+                break
+            if line_column > column:
+                raise IssueParserError("Unsupported indentation on line {}".format(i + 1))
+            if stripped[0] != '-' or stripped[1:2] not in ('', ' '):
+                if indentless:
+                    break
+                raise IssueParserError("Unsupported sequence on line {}".format(i + 1))
+            rest = stripped[2:]
+            if rest.lstrip(' ')[:1] == '-' and rest.lstrip(' ')[1:2] in ('', ' '):
+                # a nested sequence starts on the same line
+                lines[i] = ' ' * (column + 2) + rest
+                item_column = column + 2 + len(rest) - len(rest.lstrip(' '))
+                item, i = self._parse_sequence(lines, i, item_column, False)
+            elif rest.strip(' ') == '':
+                raise IssueParserError("Unsupported sequence item on line {}".format(i + 1))
+            else:
+                item, i = self._parse_node(lines, i, rest, column)
+            items.append(item)
+        return items, i
+
+    def _parse_literal(self, lines, i, header, parent_column):
+        """
+        Parse a literal block scalar.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line with the block scalar header
+        - header: the block scalar header
+        - parent_column: column of the key or the sequence indicator
+
+        Returns:
+        - a tuple of the string and the index of the next line to parse
+        """
+        match = self.BLOCK_HEADER_REGEXP.match(header)
+        if match is None or (match.group(1) and match.group(3)):
+            raise IssueParserError("Unsupported block scalar on line {}".format(i + 1))
+        chomping = match.group(1) or match.group(3)
+        min_indent = max(parent_column + 1, 1)
+        count = len(lines)
+        i += 1
+
+        if match.group(2):
+            indent = parent_column + int(match.group(2))
+        else:
+            # detect indentation from the first non-empty line
+            indent = min_indent
+            j = i
+            while j < count and lines[j].strip(' ') == '':
+                indent = max(indent, len(lines[j]))
+                j += 1
+            if j < count:
+                content_indent = len(lines[j]) - len(lines[j].lstrip(' '))
+                if content_indent < indent and j > i and indent > min_indent:
+                    raise IssueParserError("Unsupported indentation on line {}".format(j + 1))
+                indent = max(indent, content_indent)
+
+        prefix = ' ' * indent
+        content = []
+        breaks = 0
+        while i < count:
+            line = lines[i]
+            if len(line) > indent and line.startswith(prefix):
+                if breaks:
+                    content.extend([''] * breaks)
+                    breaks = 0
+                content.append(line[indent:])
+            elif line.strip(' ') == '':
+                breaks += 1
+            else:
+                break
+            i += 1
+
+        if content:
+            value = '\n'.join(content)
+            if chomping != '-' and (i < count or breaks or self.last_break):
+                value += '\n'
+        else:
+            value = ''
+        if chomping == '+':
+            if i == count and breaks and not self.last_break:
+                # the last empty line has no line break
+                breaks -= 1
+            value += '\n' * breaks
+        return value, self._check_end(lines, i, parent_column)
+
+    def _parse_quoted(self, lines, i, rest, parent_column):
+        """
+        Parse a single or double quoted scalar, which may span several lines.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line where the scalar starts
+        - rest: text of the line starting from the opening quote
+        - parent_column: column of the key or the sequence indicator
+
+        Returns:
+        - a tuple of the string and the index of the next line to parse
+        """
+        double = rest[0] == '"'
+        if double:
+            regexp = self.DOUBLE_QUOTED_REGEXP
+        else:
+            regexp = self.SINGLE_QUOTED_REGEXP
+        count = len(lines)
+        text = rest
+        while True:
+            match = regexp.match(text)
+            if match is not None:
+                break
+            i += 1
+            if i >= count:
+                raise IssueParserError("Unterminated quoted scalar")
+            text += '\n' + lines[i]
+        if text[match.end():].strip(' ') != '':
+            raise IssueParserError("Unsupported quoted scalar on line {}".format(i + 1))
+
+        value = match.group(1)
+        if '\n' in value or (double and '\\' in value) or (not double and "'" in value):
+            value = self._unquote(value, double)
+        return value, self._check_end(lines, i + 1, parent_column)
+
+    def _unquote(self, text, double):
+        """
+        Process escapes and line folding of a quoted scalar
+        the same way PyYAML does.
+
+        Parameters:
+        - text: scalar text between the quotes
+        - double: True for a double quoted scalar
+
+        Returns:
+        - the string value
+        """
+        if double:
+            plain_regexp = self.DOUBLE_PLAIN_REGEXP
+        else:
+            plain_regexp = self.SINGLE_PLAIN_REGEXP
+        replacements = yaml.scanner.Scanner.ESCAPE_REPLACEMENTS
+        codes = yaml.scanner.Scanner.ESCAPE_CODES
+        chunks = []
+        length = len(text)
+        pos = 0
+        while pos < length:
+            match = plain_regexp.match(text, pos)
+            if match is not None:
+                chunks.append(match.group())
+                pos = match.end()
+                continue
+            char = text[pos]
+            if char == "'":
+                chunks.append("'")
+                pos += 2
+            elif char == '\\':
+                code = text[pos + 1]
+                if code in replacements:
+                    chunks.append(replacements[code])
+                    pos += 2
+                elif code in codes:
+                    digits = text[pos + 2:pos + 2 + codes[code]]
+                    if len(digits) != codes[code] or not self.HEX_REGEXP.match(digits):
+                        raise IssueParserError("Unsupported escape sequence")
+                    chunks.append(chr(int(digits, 16)))
+                    pos += 2 + codes[code]
+                elif code == '\n':
+                    pos = self._scan_breaks(text, pos + 2, chunks)
+                else:
+                    raise IssueParserError("Unsupported escape sequence")
+            else:
+                end = pos
+                while end < length and text[end] in ' \t':
+                    end += 1
+                if end < length and text[end] == '\n':
+                    breaks = []
+                    pos = self._scan_breaks(text, end + 1, breaks)
+                    if not breaks:
+                        chunks.append(' ')
+                    chunks.extend(breaks)
+                else:
+                    chunks.append(text[pos:end])
+                    pos = end
+        return ''.join(chunks)
+
+    @staticmethod
+    def _scan_breaks(text, pos, chunks):
+        """
+        Skip leading white space and empty lines of folded
+        lines in a quoted scalar.
+
+        Parameters:
+        - text: scalar text
+        - pos: position after a line break
+        - chunks: list where line breaks of empty lines are added
+
+        Returns:
+        - position of the next non-white space character
+        """
+        length = len(text)
+        while True:
+            if (text[pos:pos + 3] in ('---', '...') and
+                    (pos + 3 == length or text[pos + 3] in ' \t\n')):
+                raise IssueParserError("Document separator in quoted scalar")
+            while pos < length and text[pos] in ' \t':
+                pos += 1
+            if pos < length and text[pos] == '\n':
+                chunks.append('\n')
+                pos += 1
+            else:
+                return pos
+
+    def _resolve_plain(self, value):
+        """
+        Resolve the type of a plain scalar and construct its value.
+
+        Parameters:
+        - value: the plain scalar
+
+        Returns:
+        - constructed value
+        """
+        if value in self.plain_strings:
+            return value
+        resolvers = self.resolvers.get(value[0], []) + self.resolvers.get(None, [])
+        for tag, regexp in resolvers:
+            if regexp.match(value):
+                break
+        else:
+            if len(self.plain_strings) > 10000:
+                self.plain_strings.clear()
+            self.plain_strings.add(value)
+            return value
+        if tag == u'tag:yaml.org,2002:null':
+            return None
+        if tag == u'tag:yaml.org,2002:timestamp' and self.TIMESTAMP_REGEXP.match(value):
+            return datetime.datetime.fromisoformat(value)
+        constructor = self.constructor.yaml_constructors.get(tag)
+        if constructor is None:
+            raise IssueParserError("Unsupported plain scalar {}".format(value))
+        try:
+            return constructor(self.constructor, yaml.ScalarNode(tag, value))
+        except ValueError:
+            raise IssueParserError("Invalid value {}".format(value))
+
+    @staticmethod
+    def _next_line(lines, i):
+        """
+        Find the next non-empty line.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line to start from
+
+        Returns:
+        - index of the next non-empty line, or the number of lines
+        """
+        count = len(lines)
+        while i < count and lines[i].strip(' ') == '':
+            i += 1
+        return i
+
+    def _check_end(self, lines, i, parent_column):
+        """
+        Check that a scalar doesn't continue on the following lines.
+
+        Parameters:
+        - lines: lines of the document
+        - i: index of the line after the scalar
+        - parent_column: column of the key or the sequence indicator
+
+        Returns:
+        - i
+        """
+        if i < len(lines):
+            char = lines[i][parent_column:parent_column + 1]
+            if char != ' ' and char != '':
+                # the most common case, not indented more than parent
+                return i
+        j = self._next_line(lines, i)
+        if j < len(lines):
+            line = lines[j]
+            if len(line) - len(line.lstrip(' ')) > parent_column:
+                raise IssueParserError("Unsupported node on line {}".format(j + 1))
+        return i
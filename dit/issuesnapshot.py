@@ -0,0 +1,353 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import sys
+import mmap
+import struct
+import hashlib
+import datetime
+
+from common.items import IssueSummary          # pylint: disable=F0401
+from common.utils import fileutils              # pylint: disable=F0401
+
+
+_EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class IssueSnapshot(object):
+    """
+    A read-only binary snapshot of the summaries of all issues.
+
+    The snapshot file is a header followed by fixed-width records
+    of the issues in cache order, a lookup table of the records sorted
+    by identifier, and string tables of the titles and of the other
+    values (statuses, releases and components). Records refer to
+    the strings by their index in a table.
+
+    The file is memory-mapped, and records and strings are read
+    from the mapping only when they are needed, so opening a snapshot
+    doesn't depend on the number of issues. The snapshot is valid
+    only for the fingerprint of the issue directory it was written
+    with, and for the format version it was written in.
+
+    Integers are stored in little-endian byte order. Snapshots are
+    not used on big-endian platforms.
+    """
+    MAGIC = b'DITSNAP\0'
+    VERSION = 2
+
+    # magic, version, record count, fingerprint hash, longest issue name,
+    # offsets of the lookup table, titles and values, and the file size
+    HEADER = struct.Struct('<8sII20sI4xQQQQ4x')
+    # identifier, indexes of title, status, release and component,
+    # flags, UTC offset of creation time, creation time in microseconds
+    # since epoch, mtime_ns and size of the issue file, and mtime_ns and
+    # size of the log file
+    RECORD = struct.Struct('<20sIIIIIi4xqqqqq')
+    # identifier and position of a record
+    LOOKUP = struct.Struct('<20sI')
+    COUNT = struct.Struct('<I')
+
+    # index of a value that is None
+    NONE = 0xffffffff
+    # a naive creation time, stored as if it was in UTC
+    FLAG_NAIVE = 1
+    # size of a log file that doesn't exist
+    NO_LOG = -1
+
+    # positions of status and release of a record, counted in 32-bit words
+    RECORD_WORDS = RECORD.size // 4
+    STATUS_WORD = 6
+    RELEASE_WORD = 7
+
+    def __init__(self, path, mapping):
+        """
+        Initialize IssueSnapshot, use open to open a snapshot file.
+
+        Parameters:
+        - path: path of the snapshot file
+        - mapping: the file mapped to memory, with a valid header
+        """
+        self.path = path
+        self._map = mapping
+        (_, _, self._count, _, self.name_max_len, self._lookup_offset,
+         titles_offset, values_offset, _) = self.HEADER.unpack_from(mapping, 0)
+        self._titles = _StringTable(mapping, titles_offset)
+        values = _StringTable(mapping, values_offset)
+        self._values = [values.get(i) for i in range(len(values))]
+        self._value_indexes = {value: i for i, value in enumerate(self._values)}
+
+    @classmethod
+    def open(cls, path, fingerprint):
+        """
+        Open a snapshot file.
+
+        Parameters:
+        - path: path of the snapshot file
+        - fingerprint: current fingerprint of the issue directory
+
+        Returns:
+        - an IssueSnapshot
+        - None if the file doesn't exist, is invalid, or was written
+          with another fingerprint or format version
+        """
+        if sys.byteorder != 'little':
+            return None
+        try:
+            with open(path, 'rb') as stream:
+                mapping = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        try:
+            header = cls.HEADER.unpack_from(mapping, 0)
+            if header[0] != cls.MAGIC or header[1] != cls.VERSION or \
+                    header[3] != cls._hash_fingerprint(fingerprint) or \
+                    header[8] != len(mapping):
+                mapping.close()
+                return None
+            return cls(path, mapping)
+        except (struct.error, IndexError, UnicodeDecodeError):
+            mapping.close()
+            return None
+
+    def close(self):
+        """
+        Close the snapshot. Summaries can't be read after closing.
+        """
+        self._map.close()
+
+    def __len__(self):
+        return self._count
+
+    def get_summary(self, position):
+        """
+        Get summary of an issue.
+
+        Parameters:
+        - position: position of the issue in cache order
+
+        Returns:
+        - an IssueSummary
+        """
+        (identifier, title, status, release, component, flags, utc_offset, created,
+         _, _, _, _) = self.RECORD.unpack_from(self._map,
+                                         self.HEADER.size + position * self.RECORD.size)
+        created = _EPOCH + datetime.timedelta(microseconds=created)
+        if flags & self.FLAG_NAIVE:
+            created = created.replace(tzinfo=None)
+        elif utc_offset:
+            created = created.astimezone(
+                    datetime.timezone(datetime.timedelta(seconds=utc_offset)))
+        return IssueSummary(identifier.hex(), self._titles.get(title),
+                            self._get_value(status), self._get_value(release),
+                            self._get_value(component), created)
+
+    def _get_value(self, index):
+        """
+        Get a value by its index in the value table.
+        """
+        if index == self.NONE:
+            return None
+        return self._values[index]
+
+    def find(self, identifier):
+        """
+        Find position of an issue.
+
+        Parameters:
+        - identifier: issue hash identifier
+
+        Returns:
+        - position of the issue in cache order
+        - None if the issue is not in the snapshot
+        """
+        try:
+            key = bytes.fromhex(identifier)
+        except (ValueError, TypeError):
+            return None
+        low = 0
+        high = self._count
+        while low < high:
+            middle = (low + high) // 2
+            offset = self._lookup_offset + middle * self.LOOKUP.size
+            found, position = self.LOOKUP.unpack_from(self._map, offset)
+            if found < key:
+                low = middle + 1
+            elif found > key:
+                high = middle
+            else:
+                return position
+        return None
+
+    def select(self, release, include_closed=True, closed=None):
+        """
+        Find positions of the issues assigned to a release.
+
+        The release and status of each record are compared as indexes
+        in the value table, without reading the rest of the records.
+
+        Parameters:
+        - release: name of the release, None for unassigned issues
+        - include_closed: (optional) False to leave out closed issues
+        - closed: (optional) status of closed issues
+
+        Returns:
+        - list of positions in cache order
+        """
+        if release is None:
+            release_index = self.NONE
+        else:
+            release_index = self._value_indexes.get(release)
+            if release_index is None:
+                return []
+        closed_index = self._value_indexes.get(closed, self.NONE + 1)
+        end = self.HEADER.size + self._count * self.RECORD.size
+        # views of the mapping must be released before it can be closed
+        with memoryview(self._map)[self.HEADER.size:end] as view, \
+                view.cast('I') as words, \
+                words[self.RELEASE_WORD::self.RECORD_WORDS] as releases, \
+                words[self.STATUS_WORD::self.RECORD_WORDS] as statuses:
+            if include_closed:
+                return [i for i, value in enumerate(releases) if value == release_index]
+            return [i for i, (value, status) in enumerate(zip(releases, statuses))
+                    if value == release_index and status != closed_index]
+
+    def get_file_stats(self):
+        """
+        Get status information of the issue files the snapshot was written from.
+
+        Returns:
+        - a dictionary of issue identifiers mapped to status information,
+          like in IssueModel.scan_issue_files
+        """
+        end = self.HEADER.size + self._count * self.RECORD.size
+        with memoryview(self._map)[self.HEADER.size:end] as view:
+            return {record[0].hex(): record[8:10] if record[11] == self.NO_LOG else record[8:]
+                    for record in self.RECORD.iter_unpack(view)}
+
+    @classmethod
+    def write(cls, path, fingerprint, summaries, file_stats, name_max_len):
+        """
+        Write a snapshot file atomically.
+
+        Parameters:
+        - path: path of the snapshot file
+        - fingerprint: fingerprint of the issue directory the summaries
+                       and file status information were read from
+        - summaries: IssueSummary objects in cache order
+        - file_stats: a dictionary of issue identifiers mapped to status
+                      information, like in IssueModel.scan_issue_files
+        - name_max_len: length of the longest issue name
+
+        Raises:
+        - OSError if writing fails
+        - ValueError if an issue can't be stored in a snapshot,
+          like an identifier that isn't a SHA-1 hash
+        """
+        if sys.byteorder != 'little':
+            raise ValueError("Snapshots are not supported on big-endian platforms")
+        values = {}
+        records = []
+        lookup = []
+        titles = []
+
+        def value_index(value):
+            if value is None:
+                return cls.NONE
+            return values.setdefault(value, len(values))
+
+        for position, summary in enumerate(summaries):
+            identifier = bytes.fromhex(summary.identifier)
+            if len(identifier) != 20:
+                raise ValueError("Invalid issue identifier")
+            created = summary.created
+            if not isinstance(created, datetime.datetime):
+                raise ValueError("Invalid creation time")
+            flags = 0
+            utc_offset = 0
+            if created.tzinfo is None:
+                flags |= cls.FLAG_NAIVE
+                created = created.replace(tzinfo=datetime.timezone.utc)
+            else:
+                utc_offset = int(created.utcoffset().total_seconds())
+            stat = file_stats[summary.identifier]
+            if len(stat) == 2:
+                stat += (0, cls.NO_LOG)
+            records.append(cls.RECORD.pack(identifier, len(titles),
+                    value_index(summary.status), value_index(summary.release),
+                    value_index(summary.component), flags, utc_offset,
+                    (created - _EPOCH) // datetime.timedelta(microseconds=1), *stat))
+            titles.append(summary.title)
+            lookup.append((identifier, position))
+        lookup.sort()
+
+        lookup_offset = cls.HEADER.size + len(records) * cls.RECORD.size
+        titles_offset = lookup_offset + len(lookup) * cls.LOOKUP.size
+        titles_data = _StringTable.pack(titles)
+        values_offset = titles_offset + len(titles_data)
+        values_data = _StringTable.pack(list(values))
+        size = values_offset + len(values_data)
+        header = cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(records),
+                                 cls._hash_fingerprint(fingerprint), name_max_len,
+                                 lookup_offset, titles_offset, values_offset, size)
+        data = b''.join([header, b''.join(records),
+                         b''.join(cls.LOOKUP.pack(*entry) for entry in lookup),
+                         titles_data, values_data])
+        fileutils.write_file_atomically(path, data)
+
+    @staticmethod
+    def _hash_fingerprint(fingerprint):
+        """
+        Hash a fingerprint to a fixed size for the header.
+        """
+        return hashlib.sha1(repr(tuple(fingerprint)).encode('utf-8')).digest()
+
+
+class _StringTable(object):
+    """
+    A table of strings in a snapshot.
+
+    The table is the number of strings, their end offsets
+    relative to the start of the string data, and the string data
+    encoded in UTF-8. The table is padded to a multiple of 4 bytes.
+    """
+    def __init__(self, mapping, offset):
+        self._map = mapping
+        self._count = IssueSnapshot.COUNT.unpack_from(mapping, offset)[0]
+        self._ends = offset + IssueSnapshot.COUNT.size
+        self._data = self._ends + self._count * IssueSnapshot.COUNT.size
+
+    def __len__(self):
+        return self._count
+
+    def get(self, index):
+        """
+        Get a string by its index.
+        """
+        unpack_from = IssueSnapshot.COUNT.unpack_from
+        end = unpack_from(self._map, self._ends + index * 4)[0]
+        start = unpack_from(self._map, self._ends + index * 4 - 4)[0] if index else 0
+        return self._map[self._data + start:self._data + end].decode('utf-8')
+
+    @staticmethod
+    def pack(strings):
+        """
+        Pack strings to a table.
+
+        Returns:
+        - the table as bytes
+        """
+        encoded = [string.encode('utf-8') for string in strings]
+        ends = []
+        end = 0
+        for data in encoded:
+            end += len(data)
+            ends.append(end)
+        table = struct.pack('<I{}I'.format(len(ends)), len(ends), *ends) + b''.join(encoded)
+        return table + b'\0' * (-len(table) % 4)
@@ -8,21 +8,119 @@ A GUI frontend for Dit issue tracker
 """
 
 from common.items import DitIssue, DitRelease
+from common import constants
 from datetime import timezone
 
+
+class ValuePool(object):
+    """
+    A pool of shared string values.
+
+    Issues repeat the same few values for fields like status,
+    type, component, release and log entry creator. Interning
+    them through a pool makes all issues share one string object
+    per value, which saves memory and allows comparing pooled
+    values by identity.
+
+    Known constant values are added to the pool first,
+    so pooled values are also identical to the constants.
+    """
+    def __init__(self):
+        """
+        Initialize ValuePool.
+        """
+        self._values = {}
+        self._lookups = 0
+        self._hits = 0
+        for values in (constants.issue_states, constants.issue_types,
+                       constants.release_states):
+            for name in values:
+                value = getattr(values, name)
+                self._values[value] = value
+
+    def intern(self, value):
+        """
+        Get the pooled instance of a value.
+        Values that are not strings are returned as they are.
+
+        Parameters:
+        - value: value to intern
+
+        Returns:
+        - pooled value equal to the given value
+        """
+        if type(value) is not str:
+            return value
+        self._lookups += 1
+        pooled = self._values.get(value)
+        if pooled is None:
+            self._values[value] = value
+            return value
+        self._hits += 1
+        return pooled
+
+    def get_statistics(self):
+        """
+        Get statistics of the pool usage.
+
+        Returns:
+        - dictionary with the number of pooled values, lookups and hits
+        """
+        return {
+            'values': len(self._values),
+            'lookups': self._lookups,
+            'hits': self._hits,
+        }
+
+
 class ItemCache(object):
     """
     This class form a cache of read issues and releases
     to memory for faster and easier access.
 
     A cache is required so issues can be enumerated and named.
+
+    Issues are stored in cache order in a dictionary keyed by
+    identifier. Secondary indexes by name, release and status
+    are maintained when issues are added, removed or renamed,
+    so lookups don't need to scan all issues.
+
+    Status, release and component of cached issues are interned
+    through the value pool of the cache. The pool can also be used
+    when reading issues, so the rest of the repeated fields are shared.
+
+    The cache can be loaded from an IssueSnapshot. Issues are then
+    created from the snapshot only when they are accessed. Lookups by
+    identifier or name and listing issues of a release read just the
+    needed records. Other operations create all of the issues first.
     """
     def __init__(self):
         """
         Initialize ItemCache.
         """
-        self.issues = []
+        self._issues = {}
+        self._issue_list = None
+        self._issues_by_name = {}
+        self._issues_by_release = {}
+        self._issues_by_status = {}
+        self._index_keys = {}
         self.releases = []
+        self._releases_by_title = {}
+        self.value_pool = ValuePool()
+        self._snapshot = None
+        self._snapshot_loader = None
+        self._snapshot_issues = {}
+
+    @property
+    def issues(self):
+        """
+        List of cached issues in cache order.
+        """
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
+        if self._issue_list is None:
+            self._issue_list = list(self._issues.values())
+        return self._issue_list
 
     def add_issue(self, issue):
         """
@@ -33,6 +131,8 @@ class ItemCache(object):
         Parameters:
         - issue: a new issue to add to cache
         """
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
         # check if given issue contains required information
         if not isinstance(issue, DitIssue):
             return False
@@ -45,14 +145,66 @@ class ItemCache(object):
 
         # check if the same issue already exists in cache
         # if it does, remove it, but use the same name for the new issue
-        for cached_issue in self.issues:
-            if cached_issue.identifier == issue.identifier:
-                issue.name = cached_issue.name
-                self.issues.remove(cached_issue)
-                break
+        cached_issue = self._issues.get(issue.identifier)
+        if cached_issue is not None:
+            issue.name = cached_issue.name
+            self._remove_from_indexes(cached_issue.identifier)
+            del self._issues[cached_issue.identifier]
 
         # add the new issue to cache
-        self.issues.append(issue)
+        self._intern_fields(issue)
+        self._issues[issue.identifier] = issue
+        self._add_to_indexes(issue)
+        self._issue_list = None
+        return True
+
+    def add_new_issue(self, issue):
+        """
+        Add a newly created issue to the cache and name it.
+
+        A new issue is normally created after all cached issues,
+        so it is named after them without renaming the other issues.
+        Otherwise the issues are sorted and renamed.
+
+        Parameters:
+        - issue: a new issue to add to cache
+
+        Returns:
+        - True if the issue was added
+        """
+        issues = self.issues
+        newest = not issues or self._created_key(issue) >= self._created_key(issues[-1])
+        issue.name = None
+        if not self.add_issue(issue):
+            return False
+        if newest:
+            issue.name = self._make_name(issue, len(self._issues))
+            self._issues_by_name[issue.name] = issue
+            self._index_keys[issue.identifier] = (issue.name, issue.release, issue.status)
+        else:
+            self.sort_issues(rename=True)
+        return True
+
+    def update_issue(self, issue):
+        """
+        Update cache indexes of a cached issue.
+        Needs to be called when release, status or name of
+        a cached issue is changed.
+
+        Parameters:
+        - issue: a cached issue that has been modified
+
+        Returns:
+        - True if issue was updated
+        - False if issue is not in cache
+        """
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
+        if issue is None or self._issues.get(issue.identifier) is not issue:
+            return False
+        self._intern_fields(issue)
+        self._remove_from_indexes(issue.identifier)
+        self._add_to_indexes(issue)
         return True
 
     def get_issue(self, identifier):
@@ -66,13 +218,12 @@ class ItemCache(object):
         - cached issue
         - None if issue not found with given identifier
         """
-        for issue in self.issues:
-            if issue.identifier == identifier:
-                return issue
-            if issue.name == identifier:
-                return issue
-
-        return None
+        if self._snapshot is not None:
+            return self._get_snapshot_issue_by_id(identifier)
+        issue = self._issues.get(identifier)
+        if issue is None:
+            issue = self._issues_by_name.get(identifier)
+        return issue
 
     def remove_issue(self, identifier):
         """
@@ -85,11 +236,14 @@ class ItemCache(object):
         - True if issue was removed successfully
         - False if issue was not found
         """
-        for issue in self.issues:
-            if issue.identifier == identifier:
-                self.issues.remove(issue)
-                return True
-        return False
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
+        if identifier not in self._issues:
+            return False
+        self._remove_from_indexes(identifier)
+        del self._issues[identifier]
+        self._issue_list = None
+        return True
 
     def sort_issues(self, rename=False):
         """
@@ -99,7 +253,12 @@ class ItemCache(object):
         Parameters:
         - rename: rename issues according to new sorted order
         """
-        self.issues.sort(key=lambda issue: issue.created.replace(tzinfo=timezone.utc))
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
+        issues = sorted(self._issues.values(), key=self._created_key)
+        self._issues = {issue.identifier: issue for issue in issues}
+        self._issue_list = issues
+        self._rebuild_indexes()
         if rename:
             self.rename_issues()
 
@@ -114,13 +273,44 @@ class ItemCache(object):
         Returns:
         - list of issues for that release
         """
-        release_issues = []
-        for issue in self.issues:
-            if issue.release == release_title:
-                if include_closed is not False or issue.status != "closed":
-                    release_issues.append(issue)
+        if self._snapshot is not None:
+            closed = constants.issue_states.CLOSED
+            try:
+                positions = self._snapshot.select(release_title, include_closed, closed)
+            except TypeError:
+                positions = []
+            return [self._get_snapshot_issue(position) for position in positions]
+        try:
+            release_issues = self._issues_by_release.get(release_title)
+        except TypeError:
+            # unhashable release title can't match any issue
+            release_issues = None
+        if not release_issues:
+            return []
+        if include_closed is not False:
+            return list(release_issues.values())
+        # indexed statuses are pooled, so they can be compared by identity
+        closed = self.value_pool.intern(constants.issue_states.CLOSED)
+        index_keys = self._index_keys
+        return [issue for identifier, issue in release_issues.items()
+                if index_keys[identifier][2] is not closed]
+
+    def get_issues_by_status(self, status):
+        """
+        Get all issues with a particular status.
+
+        Parameters:
+        - status: status of the issues
 
-        return release_issues
+        Returns:
+        - list of issues with that status
+        """
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
+        status_issues = self._issues_by_status.get(status)
+        if not status_issues:
+            return []
+        return list(status_issues.values())
 
     def get_issue_status_by_id(self, identifier):
         """
@@ -133,10 +323,10 @@ class ItemCache(object):
         - issue status
         - None if requested issue is not found
         """
-        for item in self.issues:
-            if item.name == identifier:
-                return item.status
-        return None
+        issue = self.get_issue(identifier)
+        if issue is None:
+            return None
+        return issue.status
 
     def add_release(self, release):
         """
@@ -157,6 +347,7 @@ class ItemCache(object):
 
         # add the new release to cache
         self.releases.append(release)
+        self._releases_by_title[release.title] = release
         return True
 
     def remove_release(self, title):
@@ -176,23 +367,23 @@ class ItemCache(object):
         if title in (None, ""):
             return False
 
-        for cached_release in self.releases:
-            if cached_release.title == title:
-                self.releases.remove(cached_release)
-                return True
-        return False
+        cached_release = self._releases_by_title.pop(title, None)
+        if cached_release is None:
+            return False
+        self.releases.remove(cached_release)
+        return True
 
     def get_release(self, release_title):
         """
-        Find a release from cache by name. First match is returned.
+        Find a release from cache by name.
 
         Parameters:
         - release_title: name of the release
         """
-        for release in self.releases:
-            if release.title == release_title:
-                return release
-        return None
+        try:
+            return self._releases_by_title.get(release_title)
+        except TypeError:
+            return None
 
     def sort_releases(self):
         """
@@ -205,8 +396,93 @@ class ItemCache(object):
         """
         Clear all issues and releases from cache.
         """
-        self.issues[:] = []
+        self._issues = {}
+        self._issue_list = None
+        self._issues_by_name = {}
+        self._issues_by_release = {}
+        self._issues_by_status = {}
+        self._index_keys = {}
         self.releases[:] = []
+        self._releases_by_title = {}
+        self._snapshot = None
+        self._snapshot_loader = None
+        self._snapshot_issues = {}
+
+    def load_snapshot(self, snapshot, loader=None):
+        """
+        Replace the cached issues with issues in a snapshot.
+        The issues have the order and names they had when
+        the snapshot was written.
+
+        Parameters:
+        - snapshot: an open IssueSnapshot, kept open while it is used
+        - loader: (optional) a function returning a complete DitIssue
+                  for an identifier, used to load the rest of the fields
+                  of the issues, like in IssueSummary.to_dit_issue
+        """
+        self._issues = {}
+        self._issue_list = None
+        self._issues_by_name = {}
+        self._issues_by_release = {}
+        self._issues_by_status = {}
+        self._index_keys = {}
+        self._snapshot = snapshot
+        self._snapshot_loader = loader
+        self._snapshot_issues = {}
+
+    def is_snapshot_loaded(self):
+        """
+        Check if the issues are still read from a snapshot.
+
+        Returns:
+        - True if issues are created from a snapshot when accessed
+        """
+        return self._snapshot is not None
+
+    def _get_snapshot_issue(self, position):
+        """
+        Get an issue at a position of the snapshot,
+        creating it if it hasn't been accessed before.
+        """
+        issue = self._snapshot_issues.get(position)
+        if issue is None:
+            summary = self._snapshot.get_summary(position)
+            issue = summary.to_dit_issue(self._snapshot_loader)
+            self._intern_fields(issue)
+            issue.name = self._make_name(issue, position + 1)
+            self._snapshot_issues[position] = issue
+        return issue
+
+    def _get_snapshot_issue_by_id(self, identifier):
+        """
+        Find an issue in the snapshot by its identifier or name.
+        """
+        position = self._snapshot.find(identifier)
+        if position is None and isinstance(identifier, str):
+            # names end in the position of the issue
+            number = identifier.rpartition('-')[2]
+            if not number.isdecimal() or not 0 < int(number) <= len(self._snapshot):
+                return None
+            position = int(number) - 1
+            if self._get_snapshot_issue(position).name != identifier:
+                return None
+        if position is None:
+            return None
+        return self._get_snapshot_issue(position)
+
+    def _load_snapshot_issues(self):
+        """
+        Create all issues of the snapshot and stop using it.
+        Issues already accessed are kept.
+        """
+        snapshot = self._snapshot
+        issues = [self._get_snapshot_issue(position) for position in range(len(snapshot))]
+        self._snapshot = None
+        self._snapshot_loader = None
+        self._snapshot_issues = {}
+        self._issues = {issue.identifier: issue for issue in issues}
+        self._issue_list = issues
+        self._rebuild_indexes()
 
     def rename_issues(self):
         """
@@ -214,12 +490,14 @@ class ItemCache(object):
         Old names, if any, are overwritten.
         Naming convention is <component>-<index>.
         """
+        if self._snapshot is not None:
+            self._load_snapshot_issues()
+        self._issues_by_name = {}
         for i, issue in enumerate(self.issues):
-            if issue.component not in (None, ""):
-                prefix = '{}-'.format(issue.component)
-            else:
-                prefix = 'issue-'
-            issue.name = '{}{}'.format(prefix, i+1)
+            issue.name = self._make_name(issue, i + 1)
+            self._issues_by_name[issue.name] = issue
+            release, status = self._index_keys[issue.identifier][1:]
+            self._index_keys[issue.identifier] = (issue.name, release, status)
 
     def get_issue_name_max_len(self):
         """
@@ -228,6 +506,8 @@ class ItemCache(object):
         Returns:
         - length of longest issue name as integer
         """
+        if self._snapshot is not None:
+            return self._snapshot.name_max_len
         max_len = 0
         for issue in self.issues:
             if issue.name and len(issue.name) > max_len:
@@ -241,7 +521,9 @@ class ItemCache(object):
         Returns:
         - amount of cached issues as integer
         """
-        return len(self.issues)
+        if self._snapshot is not None:
+            return len(self._snapshot)
+        return len(self._issues)
 
     def release_count(self):
         """
@@ -251,3 +533,71 @@ class ItemCache(object):
         - amount of cached releases as integer
         """
         return len(self.releases)
+
+    def _intern_fields(self, issue):
+        """
+        Intern the indexed fields of an issue through the value pool.
+        Fields of lazily loaded issues are interned without loading them.
+        """
+        intern = self.value_pool.intern
+        issue.status = intern(issue.status)
+        issue.release = intern(issue.release)
+        issue.component = intern(issue.component)
+
+    @staticmethod
+    def _created_key(issue):
+        """
+        Key to sort issues by creation time.
+        """
+        return issue.created.replace(tzinfo=timezone.utc)
+
+    @staticmethod
+    def _make_name(issue, number):
+        """
+        Make a name for an issue, <component>-<number>.
+        """
+        if issue.component not in (None, ""):
+            prefix = '{}-'.format(issue.component)
+        else:
+            prefix = 'issue-'
+        return '{}{}'.format(prefix, number)
+
+    def _add_to_indexes(self, issue):
+        """
+        Add an issue to the secondary indexes.
+        Keys used are remembered, so the issue can be removed
+        from the indexes even if its fields are changed.
+        """
+        identifier = issue.identifier
+        if issue.name is not None:
+            self._issues_by_name[issue.name] = issue
+        self._issues_by_release.setdefault(issue.release, {})[identifier] = issue
+        self._issues_by_status.setdefault(issue.status, {})[identifier] = issue
+        self._index_keys[identifier] = (issue.name, issue.release, issue.status)
+
+    def _remove_from_indexes(self, identifier):
+        """
+        Remove an issue from the secondary indexes.
+        """
+        name, release, status = self._index_keys.pop(identifier)
+        if name is not None and self._issues_by_name.get(name) is self._issues[identifier]:
+            del self._issues_by_name[name]
+        release_issues = self._issues_by_release[release]
+        del release_issues[identifier]
+        if not release_issues:
+            del self._issues_by_release[release]
+        status_issues = self._issues_by_status[status]
+        del status_issues[identifier]
+        if not status_issues:
+            del self._issues_by_status[status]
+
+    def _rebuild_indexes(self):
+        """
+        Rebuild the secondary indexes in cache order.
+        """
+        self._issues_by_name = {}
+        self._issues_by_release = {}
+        self._issues_by_status = {}
+        self._index_keys = {}
+        for issue in self._issues.values():
+            self._add_to_indexes(issue)
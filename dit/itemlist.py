@@ -0,0 +1,268 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import bisect
+import collections
+
+from common.items import DitRelease
+
+
+# a change to the rows of an ItemList
+# - action: one of the ItemList.REMOVE, INSERT, CHANGE and RESET actions
+# - first, last: range of rows changed, inclusive
+# - rows: new rows as (key, item, state) tuples, for removed rows None
+ItemListChange = collections.namedtuple('ItemListChange', ['action', 'first', 'last', 'rows'])
+
+
+class ItemList(object):
+    """
+    Rows of the main list of releases and issues.
+
+    Each row holds a reference to a release or an issue,
+    or is an empty spacer row before a release.
+    Rows are identified by keys, so a new list of items
+    can be compared to the current rows. Only changed rows need
+    to be updated in the view.
+
+    This class doesn't depend on Qt. ItemListModel is
+    the Qt model using it.
+    """
+    REMOVE = 'remove'
+    INSERT = 'insert'
+    CHANGE = 'change'
+    RESET = 'reset'
+
+    # above this many changes a list is replaced instead of changing the rows
+    MAX_CHANGES = 1000
+
+    def __init__(self):
+        """
+        Initialize ItemList.
+        """
+        self._keys = []
+        self._items = []
+        self._states = []
+        self._rows_by_key = None
+        self.name_width = 0
+
+    def row_count(self):
+        """
+        Get number of rows.
+
+        Returns:
+        - number of rows as integer
+        """
+        return len(self._keys)
+
+    def get_item(self, row):
+        """
+        Get the item of a row.
+
+        Parameters:
+        - row: index of the row
+
+        Returns:
+        - DitRelease or DitIssue
+        - None for spacer rows
+        """
+        return self._items[row]
+
+    def get_text(self, row):
+        """
+        Get the text shown on a row.
+        Issue names are padded so the titles are aligned.
+
+        Parameters:
+        - row: index of the row
+
+        Returns:
+        - text of the row
+        """
+        item = self._items[row]
+        if item is None:
+            return ""
+        if item.name is None:
+            return item.title
+        return "{0:<{1}}{2}".format(item.name, self.name_width + 1, item.title)
+
+    def find_row(self, key):
+        """
+        Find the row of an item.
+
+        Parameters:
+        - key: row key, issue identifier or ('release', title)
+
+        Returns:
+        - index of the row
+        - None if item is not found
+        """
+        if self._rows_by_key is None:
+            self._rows_by_key = {key: row for row, key in enumerate(self._keys)}
+        return self._rows_by_key.get(key)
+
+    def set_name_width(self, name_width):
+        """
+        Set width of the issue name column.
+
+        Parameters:
+        - name_width: length of the longest issue name
+
+        Returns:
+        - True if the width was changed, and so the text of all rows
+        - False if the width is the same
+        """
+        if name_width == self.name_width:
+            return False
+        self.name_width = name_width
+        return True
+
+    def diff(self, items):
+        """
+        Compare a new list of items to the current rows.
+
+        Rows are kept in place as long as they are in the same order in
+        the new list. Rest of the rows are removed and inserted again.
+
+        Changes are listed in the order they must be applied,
+        row indexes of each change are valid after the previous
+        changes have been applied.
+
+        Parameters:
+        - items: list of DitReleases and DitIssues
+
+        Returns:
+        - list of ItemListChanges
+        """
+        rows = self._make_rows(items)
+        old_keys = self._keys
+
+        # rows kept in place, the longest run of rows in the same order
+        new_rows = {row[0]: j for j, row in enumerate(rows)}
+        old_rows = []
+        positions = []
+        for i, key in enumerate(old_keys):
+            j = new_rows.get(key)
+            if j is not None:
+                old_rows.append(i)
+                positions.append(j)
+        kept = [old_rows[k] for k in self._increasing_subsequence(positions)]
+
+        changes = []
+        # remove from the end, so rows before each removed range are not moved yet
+        end = len(old_keys)
+        for i in reversed([-1] + kept):
+            if end > i + 1:
+                changes.append(ItemListChange(self.REMOVE, i + 1, end - 1, None))
+            end = i
+        if len(changes) > self.MAX_CHANGES:
+            return [ItemListChange(self.RESET, 0, len(rows) - 1, rows)]
+
+        # then insert and change in order, kept rows are at their final position
+        kept_rows = {new_rows[old_keys[i]]: i for i in kept}
+        first = 0
+        changed = None
+        for j, row in enumerate(rows + [None]):
+            i = kept_rows.get(j)
+            if i is None and row is not None:
+                # a new row, inserted with the following new rows
+                if changed is not None:
+                    changes.append(ItemListChange(self.CHANGE, changed, j - 1, rows[changed:j]))
+                    changed = None
+                continue
+            if j > first:
+                changes.append(ItemListChange(self.INSERT, first, j - 1, rows[first:j]))
+            first = j + 1
+            if row is None:
+                if changed is not None:
+                    changes.append(ItemListChange(self.CHANGE, changed, j - 1, rows[changed:j]))
+            elif self._states[i] != row[2]:
+                if changed is None:
+                    changed = j
+            else:
+                if changed is not None:
+                    changes.append(ItemListChange(self.CHANGE, changed, j - 1, rows[changed:j]))
+                    changed = None
+                # shown the same way, just refer to the new item
+                self._items[i] = row[1]
+            if len(changes) > self.MAX_CHANGES:
+                return [ItemListChange(self.RESET, 0, len(rows) - 1, rows)]
+        return changes
+
+    def apply(self, change):
+        """
+        Apply a change to the rows.
+
+        Parameters:
+        - change: an ItemListChange returned by diff
+        """
+        self._rows_by_key = None
+        if change.action == self.RESET:
+            self._keys = [row[0] for row in change.rows]
+            self._items = [row[1] for row in change.rows]
+            self._states = [row[2] for row in change.rows]
+            return
+        if change.action == self.REMOVE:
+            rows = []
+        else:
+            rows = change.rows
+        if change.action == self.INSERT:
+            last = change.first
+        else:
+            last = change.last + 1
+        self._keys[change.first:last] = [row[0] for row in rows]
+        self._items[change.first:last] = [row[1] for row in rows]
+        self._states[change.first:last] = [row[2] for row in rows]
+
+    @staticmethod
+    def _increasing_subsequence(values):
+        """
+        Find the longest increasing subsequence of a list of values.
+
+        Returns:
+        - list of indexes of the values in the subsequence
+        """
+        tails = []
+        tail_indexes = []
+        previous = []
+        for k, value in enumerate(values):
+            n = bisect.bisect_left(tails, value)
+            if n == len(tails):
+                tails.append(value)
+                tail_indexes.append(k)
+            else:
+                tails[n] = value
+                tail_indexes[n] = k
+            previous.append(tail_indexes[n - 1] if n > 0 else -1)
+        subsequence = []
+        k = tail_indexes[-1] if tail_indexes else -1
+        while k >= 0:
+            subsequence.append(k)
+            k = previous[k]
+        subsequence.reverse()
+        return subsequence
+
+    @staticmethod
+    def _make_rows(items):
+        """
+        Make rows for a list of items.
+        An empty spacer row is added before each release, except the first one.
+
+        Returns:
+        - list of (key, item, state) tuples
+        """
+        rows = []
+        for item in items:
+            if isinstance(item, DitRelease):
+                key = ('release', item.title)
+                if rows:
+                    rows.append((('spacer', item.title), None, None))
+                rows.append((key, item, (item.name, item.title)))
+            else:
+                rows.append((item.identifier, item, (item.name, item.title, item.status)))
+        return rows
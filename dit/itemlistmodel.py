@@ -0,0 +1,137 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+from PyQt5 import QtGui
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+from common.items import DitIssue
+from common import constants
+from itemlist import ItemList
+
+
+class ItemListModel(QAbstractListModel):
+    """
+    A model of the main list of releases and issues.
+
+    The rows refer to the cached items, text of the rows is
+    formatted only when the view asks for it. When the items are
+    updated, only the changed rows are inserted, removed or updated.
+    """
+    # role to get the DitRelease or DitIssue of a row
+    ItemRole = Qt.UserRole
+
+    def __init__(self, icon_path, parent=None):
+        """
+        Initialize ItemListModel.
+
+        Parameters:
+        - icon_path: directory of the list icons
+        - parent: (optional) parent QObject
+        """
+        super(ItemListModel, self).__init__(parent)
+        self.rows = ItemList()
+        # icons are shared by all rows with the same status
+        self.icons = {
+            constants.issue_states.UNSTARTED: QtGui.QIcon(icon_path + '/new.png'),
+            constants.issue_states.IN_PROGRESS: QtGui.QIcon(icon_path + '/started.png'),
+            constants.issue_states.PAUSED: QtGui.QIcon(icon_path + '/paused.png'),
+        }
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Get number of rows.
+        """
+        if parent.isValid():
+            return 0
+        return self.rows.row_count()
+
+    def data(self, index, role=Qt.DisplayRole):
+        """
+        Get data of a row for the view.
+        """
+        if not index.isValid():
+            return None
+        row = index.row()
+        if role == Qt.DisplayRole:
+            return self.rows.get_text(row)
+        if role == self.ItemRole:
+            return self.rows.get_item(row)
+        if role == Qt.DecorationRole:
+            item = self.rows.get_item(row)
+            if isinstance(item, DitIssue):
+                return self.icons.get(item.status)
+        return None
+
+    def flags(self, index):
+        """
+        Spacer rows can't be selected.
+        """
+        if not index.isValid() or self.rows.get_item(index.row()) is None:
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    def get_item(self, index):
+        """
+        Get the item of a row.
+
+        Parameters:
+        - index: QModelIndex of the row
+
+        Returns:
+        - DitRelease or DitIssue
+        - None if index is invalid or a spacer row
+        """
+        if not index.isValid():
+            return None
+        return self.rows.get_item(index.row())
+
+    def find_issue(self, identifier):
+        """
+        Find the row of an issue.
+
+        Parameters:
+        - identifier: hash identifier of an issue
+
+        Returns:
+        - QModelIndex of the row, invalid if issue is not found
+        """
+        row = self.rows.find_row(identifier)
+        if row is None:
+            return QModelIndex()
+        return self.index(row)
+
+    def set_items(self, items, name_width):
+        """
+        Update the rows to show a new list of items.
+        Only the rows changed are updated to the view.
+
+        Parameters:
+        - items: list of DitReleases and DitIssues
+        - name_width: length of the longest issue name
+        """
+        changes = self.rows.diff(items)
+        for change in changes:
+            if change.action == ItemList.RESET:
+                self.beginResetModel()
+                self.rows.apply(change)
+                self.endResetModel()
+            elif change.action == ItemList.REMOVE:
+                self.beginRemoveRows(QModelIndex(), change.first, change.last)
+                self.rows.apply(change)
+                self.endRemoveRows()
+            elif change.action == ItemList.INSERT:
+                self.beginInsertRows(QModelIndex(), change.first, change.last)
+                self.rows.apply(change)
+                self.endInsertRows()
+            else:
+                self.rows.apply(change)
+                self.dataChanged.emit(self.index(change.first), self.index(change.last))
+        if self.rows.set_name_width(name_width) and self.rows.row_count() > 0:
+            self.dataChanged.emit(self.index(0), self.index(self.rows.row_count() - 1),
+                                  [Qt.DisplayRole])
@@ -0,0 +1,149 @@
+#! /usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Dit GUI
+
+A GUI frontend for Dit issue tracker
+"""
+
+import collections
+
+import common.utils.time
+
+
+class RenderCache(object):
+    """
+    This class forms a cache of items rendered as HTML.
+
+    Rendered items are stored with a version, like the modification time
+    and size of an issue file, and are used only as long as the version
+    stays the same. Least recently used items are removed when the cache
+    is full.
+
+    Relative times, like "2 days 3 hours", are not stored as text.
+    The HTML around them is stored in parts, and the relative times
+    are formatted again every time a cached item is used.
+    """
+    DEFAULT_SIZE = 100
+
+    # separates relative times from rest of the rendered HTML,
+    # items containing it in their content are not cached
+    TIME_MARKER = '\x00'
+
+    def __init__(self, size=None):
+        """
+        Initialize RenderCache.
+
+        Parameters:
+        - size: (optional) maximum number of rendered items to cache
+        """
+        self._items = collections.OrderedDict()
+        self.size = self.DEFAULT_SIZE
+        self.set_size(size)
+
+    def set_size(self, size):
+        """
+        Set maximum number of rendered items to cache.
+        Least recently used items are removed if the cache is too large.
+
+        Parameters:
+        - size: maximum number of items, None for the default size
+        """
+        if size is None:
+            size = self.DEFAULT_SIZE
+        self.size = max(0, int(size))
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def get_html(self, key, version, now=None):
+        """
+        Get a cached item as HTML.
+
+        Parameters:
+        - key: key of the item, like an issue identifier
+        - version: version of the item content
+        - now: (optional) time to count the relative times to
+
+        Returns:
+        - item as HTML
+        - None if the item is not cached, or the cached version is different
+        """
+        cached = self._items.get(key)
+        if cached is None or cached[0] != version:
+            return None
+        self._items.move_to_end(key)
+        return self._join(cached[1], cached[2], now)
+
+    def render_html(self, key, version, item, now=None):
+        """
+        Render an item as HTML and add it to the cache.
+
+        Parameters:
+        - key: key of the item, like an issue identifier
+        - version: version of the item content
+        - item: a DitItem to render
+        - now: (optional) time to count the relative times to
+
+        Returns:
+        - item as HTML
+        """
+        timestamps = []
+
+        def mark_times(times):
+            markers = []
+            for timestamp in times:
+                markers.append('{0}{1}{0}'.format(self.TIME_MARKER, len(timestamps)))
+                timestamps.append(timestamp)
+            return markers
+
+        parts = item.toHtml(mark_times).split(self.TIME_MARKER)
+        if parts[1::2] != [str(i) for i in range(len(timestamps))]:
+            # item content contains the marker, can't be cached
+            self.remove(key)
+            return item.toHtml(lambda times: common.utils.time.human_time_diffs(times, now=now))
+
+        self._items.pop(key, None)
+        if self.size > 0:
+            self._items[key] = (version, parts, timestamps)
+            if len(self._items) > self.size:
+                self._items.popitem(last=False)
+        return self._join(parts, timestamps, now)
+
+    def remove(self, key):
+        """
+        Remove an item from the cache.
+
+        Parameters:
+        - key: key of the item
+
+        Returns:
+        - True if item was removed
+        - False if item was not cached
+        """
+        return self._items.pop(key, None) is not None
+
+    def clear(self):
+        """
+        Remove all items from the cache.
+        """
+        self._items.clear()
+
+    def item_count(self):
+        """
+        Get number of cached items.
+
+        Returns:
+        - amount of cached items as integer
+        """
+        return len(self._items)
+
+    @staticmethod
+    def _join(parts, timestamps, now):
+        """
+        Join parts of a rendered item with formatted relative times.
+        """
+        if timestamps:
+            parts = list(parts)
+            parts[1::2] = common.utils.time.human_time_diffs(timestamps, now=now)
+        return ''.join(parts)
@@ -0,0 +1,87 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A benchmark for changing many issues at once
+
+Closes all issues of a release one at a time with close_issue
+and all at once with close_issues, and reports the time used.
+
+Usage: benchmark_bulkupdate.py [issue count] [comments per issue]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+
+import testlib                                  # pylint: disable=W0611
+from config import ConfigControl                # pylint: disable=F0401
+from ditcontrol import DitControl               # pylint: disable=F0401
+from benchmark_issueparser import create_issues # pylint: disable=F0401
+
+
+def create_project(project_dir, count, comments):
+    """
+    Create a test project with generated issues assigned to release "week 49".
+
+    Returns:
+    - a DitControl for the project
+    """
+    test_dir = os.path.dirname(os.path.realpath(__file__))
+    issue_dir = os.path.join(project_dir, 'data', 'bugs')
+    os.makedirs(issue_dir)
+    shutil.copy(os.path.join(test_dir, 'data', 'bugs', 'project.yaml'), issue_dir)
+    shutil.copy(os.path.join(test_dir, '.dit-config'), project_dir)
+    create_issues(issue_dir, count, comments)
+    os.chdir(project_dir)
+    config = ConfigControl()
+    config.load_configs()
+    dit = DitControl(config)
+    dit.assign_issues(lambda issue: True, 'week 49')
+    return dit
+
+
+def measure(name, func):
+    """
+    Run func in a new project and print the time it took.
+
+    Returns:
+    - elapsed time in seconds
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print("{:<24} {:8.3f} s".format(name, elapsed))
+    return elapsed
+
+
+def main():
+    count = 500
+    comments = 5
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        comments = int(sys.argv[2])
+
+    original_dir = os.getcwd()
+    temp_dir = tempfile.mkdtemp()
+    os.environ['XDG_CACHE_HOME'] = os.path.join(temp_dir, 'cache')
+    try:
+        print("Closing {} issues with {} comments".format(count, comments))
+        dit = create_project(os.path.join(temp_dir, 'serial'), count, comments)
+        names = [issue.name for issue in dit.get_issues_by_release('week 49')]
+        measure("close_issue", lambda: [dit.close_issue(name, 0, "Released")
+                                        for name in names])
+
+        dit = create_project(os.path.join(temp_dir, 'bulk'), count, comments)
+        measure("close_issues", lambda: dit.close_issues(
+                lambda issue: issue.release == 'week 49', 0, "Released"))
+    finally:
+        os.chdir(original_dir)
+        shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A benchmark for memory used by cached issues
+
+Compares the memory allocated for complete DitIssue objects
+to the memory allocated for lazily loaded issues and for
+complete issues with repeated fields interned in a value pool.
+
+Usage: benchmark_issuememory.py [issue count ...]
+"""
+
+import sys
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+import testlib                                  # pylint: disable=W0611
+from itemcache import ItemCache, ValuePool      # pylint: disable=F0401
+from issuemodel import IssueYamlObject          # pylint: disable=F0401
+from common.items import IssueSummary           # pylint: disable=F0401
+
+
+def fresh(value):
+    """
+    Copy a string, like a YAML loader creates a new string for every value.
+    """
+    return (value + '.')[:-1]
+
+
+def issue_data(i, created):
+    """
+    Create the data of an issue file.
+    """
+    reporter = 'Tester <tester@example.com>'
+    log = [[created, fresh(reporter), fresh('created'), '']]
+    for j in range(3):
+        log.append([created + timedelta(days=j + 1), fresh(reporter), fresh('commented'),
+                    'Comment number {} of issue {}.\nWith another line.'.format(j, i)])
+    return {'title': 'Issue number {}'.format(i), 'id': '{:040x}'.format(i),
+            'type': fresh(':bugfix'), 'component': fresh('benchmark'),
+            'status': fresh(':unstarted'), 'disposition': None,
+            'desc': 'Description of issue {}.\n\n'.format(i) + 'Some text. ' * 20,
+            'reporter': fresh(reporter), 'creation_time': created, 'release': None,
+            'references': [], 'log_events': log}
+
+
+def full_issue(i, created):
+    """
+    Create a complete issue, like the ones read from issue files.
+    """
+    return IssueYamlObject.dict_to_dit_issue(issue_data(i, created))
+
+
+POOL = ValuePool()
+
+
+def pooled_issue(i, created):
+    """
+    Create a complete issue with repeated fields interned.
+    """
+    return IssueYamlObject.dict_to_dit_issue(issue_data(i, created), POOL)
+
+
+def load_issue(identifier):
+    """
+    Load a complete issue, like IssueModel.read_issue.
+    """
+    return full_issue(int(identifier, 16), datetime.now(timezone.utc))
+
+
+def lazy_issue(i, created):
+    """
+    Create a lazily loaded issue, like the ones in DitControl's cache.
+    """
+    summary = IssueSummary('{:040x}'.format(i), 'Issue number {}'.format(i), 'unstarted',
+            None, 'benchmark', created)
+    return summary.to_dit_issue(load_issue)
+
+
+def measure(name, factory, count):
+    """
+    Fill an ItemCache with issues and print the allocated memory.
+
+    Returns:
+    - allocated memory in bytes
+    """
+    base = datetime(2015, 6, 2, tzinfo=timezone.utc)
+    tracemalloc.start()
+    cache = ItemCache()
+    for i in range(count):
+        cache.add_issue(factory(i, base + timedelta(seconds=i)))
+    cache.sort_issues(rename=True)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:<18} {:10.1f} MiB {:8.0f} bytes/issue".format(name, size / 2**20, size / count))
+    del cache
+    return size
+
+
+def main():
+    counts = [10000, 100000]
+    if len(sys.argv) > 1:
+        counts = [int(count) for count in sys.argv[1:]]
+
+    for count in counts:
+        print("Caching {} issues".format(count))
+        full = measure("DitIssue", full_issue, count)
+        pooled = measure("DitIssue (pooled)", pooled_issue, count)
+        lazy = measure("LazyDitIssue", lazy_issue, count)
+        print("Pooled issues use {:.0f}% of the memory".format(pooled / full * 100))
+        print("Lazy issues use {:.0f}% of the memory".format(lazy / full * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A benchmark for reading issue files
+
+Compares IssueParser to loading the files with
+the pure Python and the LibYAML based YAML loaders.
+
+Usage: benchmark_issueparser.py [issue count] [comments per issue]
+"""
+
+import sys
+import os
+import time
+import shutil
+import tempfile
+from datetime import datetime, timezone
+import yaml
+
+import testlib                                  # pylint: disable=W0611
+import issuemodel                               # pylint: disable=F0401
+from issueparser import IssueParser             # pylint: disable=F0401
+from yamlconfig import YamlConfig               # pylint: disable=F0401
+from common.items import DitIssue               # pylint: disable=F0401
+
+
+def create_issues(issue_dir, count, comments=1):
+    """
+    Write generated issues to a directory.
+
+    Returns:
+    - list of issue file contents
+    """
+    YamlConfig.add_representers()
+    model = issuemodel.IssueModel(issue_dir)
+    texts = []
+    for i in range(count):
+        created = datetime.now(timezone.utc)
+        log = [[created, 'Tester <tester@example.com>', 'created', '']]
+        for j in range(comments):
+            log.append([datetime.now(timezone.utc), 'Tester <tester@example.com>',
+                        'commented', 'Comment number {}.\nWith a second line.'.format(j)])
+        issue = DitIssue('Issue number {}'.format(i), 'x', 'bugfix', 'benchmark',
+                'unstarted', None, 'Description of issue {}.\n\nWith some more text '
+                'on another line.'.format(i), 'Tester <tester@example.com>', created,
+                None, [], '{:040x}'.format(i), log)
+        model.write_issue_yaml(issuemodel.IssueYamlObject.from_dit_issue(issue))
+    for identifier in model.list_issue_identifiers():
+        with open(os.path.join(issue_dir, 'issue-{}.yaml'.format(identifier))) as stream:
+            texts.append(stream.read())
+    return texts
+
+
+def measure(name, func, texts, baseline=None):
+    """
+    Run func for every text and print the time it took.
+
+    Returns:
+    - elapsed time in seconds
+    """
+    start = time.perf_counter()
+    for text in texts:
+        func(text)
+    elapsed = time.perf_counter() - start
+    line = "{:<24} {:8.3f} s {:8.1f} us/issue".format(name, elapsed,
+                                                      elapsed / len(texts) * 1e6)
+    if baseline:
+        line += " {:6.1f}x".format(baseline / elapsed)
+    print(line)
+    return elapsed
+
+
+def main():
+    count = 2000
+    comments = 1
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        comments = int(sys.argv[2])
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        texts = create_issues(temp_dir, count, comments)
+    finally:
+        shutil.rmtree(temp_dir)
+
+    parser = IssueParser()
+    print("Parsing {} issues with {} comments".format(len(texts), comments))
+    baseline = measure("PyYAML (Python)",
+                       lambda text: yaml.load(text, Loader=yaml.Loader).to_dit_issue(), texts)
+    if YamlConfig.Loader is not yaml.Loader:
+        measure("PyYAML (LibYAML)", lambda text: YamlConfig.load(text).to_dit_issue(),
+                texts, baseline)
+    measure("IssueParser", lambda text: issuemodel.IssueYamlObject.dict_to_dit_issue(
+            parser.parse(text)), texts, baseline)
+    measure("IssueParser (summary)", lambda text: issuemodel.IssueYamlObject.
+            dict_to_issue_summary(parser.parse(text, issuemodel.IssueModel.SUMMARY_KEYS)),
+            texts, baseline)
+
+
+if __name__ == '__main__':
+    main()
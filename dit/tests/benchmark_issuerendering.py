@@ -0,0 +1,71 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A benchmark for rendering issues
+
+Measures serializing an issue with a long event log
+to text and to HTML, and how much of that time is used
+to format the relative timestamps of the log entries.
+
+Usage: benchmark_issuerendering.py [log entries] [rounds]
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+
+import testlib                                  # pylint: disable=W0611
+import common.utils.time                        # pylint: disable=F0401
+from common.items import DitIssue, LogEntry     # pylint: disable=F0401
+
+
+def create_issue(entries):
+    """
+    Create an issue with a given number of log entries.
+    """
+    created = datetime.now(timezone.utc) - timedelta(days=3 * entries)
+    log = [LogEntry(created + timedelta(days=i, minutes=i), 'Tester <tester@example.com>',
+                    'commented', 'Comment number {}.\nWith a second line.'.format(i))
+           for i in range(entries)]
+    return DitIssue('A benchmark issue', 'benchmark-1', 'bugfix', 'benchmark', 'unstarted',
+            None, 'A description.\n\nWith some more text.', 'Tester <tester@example.com>',
+            created, None, [], '{:040x}'.format(1), log)
+
+
+def measure(name, func, rounds):
+    """
+    Run func a number of times and print the time it took.
+
+    Returns:
+    - elapsed time in seconds per round
+    """
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / rounds
+    print("{:<24} {:8.2f} ms".format(name, elapsed * 1e3))
+    return elapsed
+
+
+def main():
+    entries = 500
+    rounds = 20
+    if len(sys.argv) > 1:
+        entries = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        rounds = int(sys.argv[2])
+
+    issue = create_issue(entries)
+    timestamps = [entry.timestamp for entry in issue.log]
+    print("Rendering an issue with {} log entries".format(entries))
+    text = measure("str()", lambda: str(issue), rounds)
+    html = measure("toHtml()", issue.toHtml, rounds)
+    formatting = measure("timestamps", lambda: common.utils.time.human_time_diffs(timestamps),
+                         rounds)
+    print("Timestamps take {:.0f}% of str() and {:.0f}% of toHtml()".format(
+        formatting / text * 100, formatting / html * 100))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A benchmark for writing issue files
+
+Writes issues one at a time and as a bulk write in every
+durability mode, and reports the time used.
+
+Usage: benchmark_issuewrites.py [issue count] [directory]
+
+The directory defaults to a temporary directory. Give a directory
+on the disk of interest, as temporary directories are often in memory.
+"""
+
+import sys
+import time
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import testlib                                  # pylint: disable=W0611
+import issuemodel                               # pylint: disable=F0401
+from yamlconfig import YamlConfig               # pylint: disable=F0401
+from common.items import DitIssue               # pylint: disable=F0401
+from common import constants                    # pylint: disable=F0401
+
+
+def create_issues(count):
+    """
+    Create generated issues.
+
+    Returns:
+    - list of IssueYamlObjects
+    """
+    issues = []
+    for i in range(count):
+        created = datetime.now(timezone.utc)
+        log = [[created, 'Tester <tester@example.com>', 'created', '']]
+        issue = DitIssue('Issue number {}'.format(i), 'x', 'bugfix', 'benchmark',
+                'unstarted', None, 'Description of issue {}.'.format(i),
+                'Tester <tester@example.com>', created, None, [], '{:040x}'.format(i), log)
+        issues.append(issuemodel.IssueYamlObject.from_dit_issue(issue))
+    return issues
+
+
+def measure(name, func, count):
+    """
+    Run func and print the time it took.
+    """
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print("{:<24} {:8.3f} s {:8.1f} us/issue".format(name, elapsed, elapsed / count * 1e6))
+
+
+def main():
+    count = 1000
+    base_dir = None
+    if len(sys.argv) > 1:
+        count = int(sys.argv[1])
+    if len(sys.argv) > 2:
+        base_dir = sys.argv[2]
+
+    YamlConfig.add_representers()
+    issues = create_issues(count)
+    print("Writing {} issues".format(count))
+    for durability in constants.write_durability:
+        durability = getattr(constants.write_durability, durability)
+        temp_dir = tempfile.mkdtemp(dir=base_dir)
+        try:
+            model = issuemodel.IssueModel(temp_dir, durability=durability)
+            measure("{} (single)".format(durability),
+                    lambda: [model.write_issue_yaml(issue) for issue in issues], count)
+            measure("{} (bulk)".format(durability),
+                    lambda: model.write_issues_bulk(issues), count)
+        finally:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A benchmark for the startup time of dit-cli
+
+Runs non-interactive dit commands with "python -X importtime"
+and reports the time used to import modules and the whole
+run time of each command. Exits with status 1 if a command
+imports more than its budget allows, or imports modules needed
+only by interactive prompts.
+
+The commands are run in the test project of this directory,
+without a dit daemon and with an empty cache directory.
+
+Usage: benchmark_startup.py [rounds]
+"""
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import subprocess
+
+import testlib                                  # pylint: disable=W0611
+
+
+DIT_CLI = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'dit-cli.py')
+
+# commands and their import time budgets in milliseconds
+COMMANDS = [
+    (['--help'], 30),
+    (['list-components'], 70),
+    (['list-ids'], 90),
+    (['list'], 90),
+]
+
+# modules only interactive prompts and the GUI need
+INTERACTIVE_MODULES = ['pick', 'readline', 'curses', 'PyQt5', 'dateutil']
+
+
+def run_command(args, env):
+    """
+    Run a dit command with import times reported.
+
+    Returns:
+    - (wall time in seconds, import times in seconds by module name)
+    """
+    start = time.perf_counter()
+    process = subprocess.run([sys.executable, '-X', 'importtime', DIT_CLI] + args,
+                             stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+                             env=env, check=False, universal_newlines=True)
+    elapsed = time.perf_counter() - start
+    imports = {}
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        imports[name.strip()] = int(self_time) / 1e6
+    return elapsed, imports
+
+
+def main():
+    rounds = 5
+    if len(sys.argv) > 1:
+        rounds = int(sys.argv[1])
+
+    cache_dir = tempfile.mkdtemp()
+    env = dict(os.environ, DIT_NO_DAEMON='1', XDG_CACHE_HOME=cache_dir)
+    failed = False
+    try:
+        print("{:<18} {:>10} {:>10} {:>8}".format("command", "run", "imports", "budget"))
+        for args, budget in COMMANDS:
+            # first run builds the issue index
+            run_command(args, env)
+            results = [run_command(args, env) for _ in range(rounds)]
+            elapsed = min(result[0] for result in results)
+            import_time = min(sum(result[1].values()) for result in results)
+            print("{:<18} {:8.1f}ms {:8.1f}ms {:6d}ms".format(
+                ' '.join(args), elapsed * 1e3, import_time * 1e3, budget))
+            if import_time * 1e3 > budget:
+                print("  imports take longer than the budget")
+                failed = True
+            interactive = [name for name in INTERACTIVE_MODULES if name in results[0][1]]
+            if interactive:
+                print("  imports interactive modules: {}".format(', '.join(interactive)))
+                failed = True
+    finally:
+        shutil.rmtree(cache_dir)
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for batchcontrol.py
+"""
+
+import unittest
+import os
+import io
+import json
+import shutil
+import tempfile
+import threading
+
+import testlib
+from batchcontrol import BatchControl           # pylint: disable=F0401
+from config import ConfigControl                # pylint: disable=F0401
+from ditcontrol import DitControl               # pylint: disable=F0401
+from ditdaemon import DitDaemon, DaemonClient, RemoteObject  # pylint: disable=F0401
+
+
+class BatchControlTests(unittest.TestCase):
+    """
+    Unit tests for BatchControl.
+
+    A copy of the test project is used, so the issues can be modified.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_dir = os.getcwd()
+        self.original_cache = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.temp_dir, 'cache')
+        project_dir = os.path.join(self.temp_dir, 'project')
+        shutil.copytree('data/bugs', os.path.join(project_dir, 'data', 'bugs'))
+        shutil.copy('.dit-config', project_dir)
+        os.chdir(project_dir)
+        config = ConfigControl()
+        config.load_configs()
+        self.dit = DitControl(config)
+        self.batch = BatchControl(self.dit)
+
+    def tearDown(self):
+        os.chdir(self.original_dir)
+        if self.original_cache is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.original_cache
+        shutil.rmtree(self.temp_dir)
+
+    def run_batch(self, *operations):
+        """Run operations, return the results."""
+        lines = [operation if isinstance(operation, str) else json.dumps(operation)
+                 for operation in operations]
+        output = io.StringIO()
+        self.batch.run(io.StringIO('\n'.join(lines) + '\n'), output)
+        return [json.loads(line) for line in output.getvalue().splitlines()]
+
+    def test_adding_and_changing_issue(self):
+        """New issue can be used by name in following operations"""
+        results = self.run_batch(
+            {'op': 'add', 'id': 'new', 'title': 'A batch issue', 'type': 'task',
+             'release': 'week 49', 'comment': 'Added'},
+            {'op': 'comment', 'issue': 'testing_project-3', 'comment': 'A comment'},
+            {'op': 'start', 'issue': 'testing_project-3'},
+            {'op': 'assign', 'issue': 'testing_project-3', 'release': None},
+            {'op': 'show', 'issue': 'testing_project-3'})
+        self.assertTrue(all(result['ok'] for result in results), results)
+        self.assertEqual(results[0]['id'], 'new')
+        self.assertEqual(results[0]['name'], 'testing_project-3')
+        shown = results[4]
+        self.assertEqual(shown['issue'], results[0]['issue'])
+        self.assertEqual(shown['title'], 'A batch issue')
+        self.assertEqual(shown['status'], 'in progress')
+        self.assertIsNone(shown['release'])
+        self.assertEqual([entry[2] for entry in shown['log']][:2], ['created', 'commented'])
+        self.assertEqual(self.dit.issuemodel.read_issue(shown['issue']).status, 'in progress')
+
+    def test_closing_and_removing(self):
+        """Issues can be closed and removed"""
+        results = self.run_batch(
+            {'op': 'close', 'issue': 'testing_project-1', 'disposition': 1},
+            {'op': 'remove', 'issue': 'testing_project-2'},
+            {'op': 'list'})
+        self.assertTrue(all(result['ok'] for result in results), results)
+        closed = self.dit.issuemodel.read_issue('e50d0e38b19c1ff0e9b696ffe919435d26477975')
+        self.assertEqual(closed.status, 'closed')
+        self.assertEqual(closed.disposition, "won't fix")
+        self.assertEqual(results[2]['issues'], [])
+
+    def test_errors(self):
+        """Failed operations are reported and the rest are applied"""
+        results = self.run_batch(
+            'not json',
+            '[1, 2]',
+            {'op': 'unknown'},
+            {'op': 'add', 'title': 'Bad type', 'type': 'bogus'},
+            {'op': 'add'},
+            {'op': 'close', 'issue': 'testing_project-9'},
+            {'op': 'close', 'issue': 'testing_project-1', 'disposition': 'maybe'},
+            {'op': 'comment', 'issue': 'testing_project-1', 'comment': 'Still fine'})
+        self.assertEqual([result['ok'] for result in results], [False] * 7 + [True])
+        self.assertEqual([result['line'] for result in results], list(range(1, 9)))
+        self.assertEqual(results[5]['error'], 'Unknown issue: testing_project-9')
+        self.assertEqual(self.dit.get_issue_from_cache('testing_project-1').status, 'unstarted')
+
+    def test_adding_through_daemon(self):
+        """Identifier and name of a new issue are returned also through a dit daemon"""
+        daemon = DitDaemon(self.dit, os.path.join(self.temp_dir, 'daemon.sock'))
+        daemon.start()
+        thread = threading.Thread(target=daemon.serve_forever)
+        thread.start()
+        client = DaemonClient.connect(daemon.socket_path)
+        try:
+            self.batch = BatchControl(RemoteObject(client))
+            results = self.run_batch(
+                {'op': 'add', 'title': 'A daemon issue', 'comment': 'Added'},
+                {'op': 'comment', 'issue': 'testing_project-3', 'comment': 'A comment'})
+        finally:
+            client.close()
+            daemon.shutdown()
+            thread.join()
+        self.assertTrue(all(result['ok'] for result in results), results)
+        self.assertEqual(len(results[0]['issue']), 40)
+        self.assertEqual(results[0]['name'], 'testing_project-3')
+        issue = self.dit.get_issue_content('testing_project-3')
+        self.assertEqual(issue.identifier, results[0]['issue'])
+        self.assertEqual(issue.log[-1].comment, 'A comment')
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(BatchControlTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -0,0 +1,122 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for changetracker.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+
+import testlib
+import changetracker                            # pylint: disable=F0401
+from issuemodel import IssueModel               # pylint: disable=F0401
+
+
+class ChangeTrackerTests(unittest.TestCase):
+    """
+    Unit tests for ChangeTracker.
+
+    A copy of the issues in data/bugs is used,
+    so the issue files can be modified.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.issue_dir = os.path.join(self.temp_dir, 'bugs')
+        shutil.copytree('data/bugs', self.issue_dir)
+        self.project_file = os.path.join(self.issue_dir, 'project.yaml')
+        self.model = IssueModel(self.issue_dir)
+        self.tracker = changetracker.ChangeTracker(self.model, self.project_file)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _issue_file(self, identifier):
+        return '{}/issue-{}.yaml'.format(self.issue_dir, identifier)
+
+    def test_first_scan(self):
+        """All files are reported as added on first scan"""
+        changes = self.tracker.detect_changes()
+        self.assertEqual(len(changes.added), 2)
+        self.assertEqual(changes.modified, {})
+        self.assertEqual(changes.removed, [])
+        self.assertTrue(changes.project_changed)
+        self.assertEqual(self.tracker.generation, 1)
+
+    def test_no_changes(self):
+        """Nothing is reported when files have not changed"""
+        self.tracker.detect_changes()
+        changes = self.tracker.detect_changes()
+        self.assertTrue(changes.is_empty())
+        self.assertEqual(self.tracker.generation, 1)
+
+    def test_modified_and_removed_files(self):
+        """Modified and removed files are detected"""
+        modified = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        removed = '2f87f94bd56e5a7fdb1338c63e8f5848de1418f6'
+        self.tracker.detect_changes()
+        os.utime(self._issue_file(modified), ns=(1, 1))
+        os.remove(self._issue_file(removed))
+        changes = self.tracker.detect_changes()
+        self.assertEqual(list(changes.modified), [modified])
+        self.assertEqual(changes.removed, [removed])
+        self.assertEqual(changes.added, {})
+        self.assertFalse(changes.project_changed)
+        self.assertEqual(self.tracker.get_file_generation(modified), 2)
+        self.assertIsNone(self.tracker.get_file_generation(removed))
+
+    def test_appended_log_file(self):
+        """Issues are modified when their log file is appended to"""
+        modified = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        self.model.separate_logs = True
+        self.tracker.detect_changes()
+        issue = self.model.read_issue(modified)
+        self.model.append_log_entries(modified, issue.log[:1])
+        changes = self.tracker.detect_changes()
+        self.assertEqual(list(changes.modified), [modified])
+        self.assertEqual(changes.modified[modified], self.model.get_issue_version(modified))
+        self.model.append_log_entries(modified, issue.log[:1])
+        self.assertEqual(list(self.tracker.detect_changes().modified), [modified])
+
+    def test_project_file_change(self):
+        """Changes in project file are detected"""
+        self.tracker.detect_changes()
+        with open(self.project_file, 'a') as stream:
+            stream.write('\n')
+        changes = self.tracker.detect_changes()
+        self.assertTrue(changes.project_changed)
+        self.assertFalse(changes.has_issue_changes())
+        self.assertEqual(self.tracker.project_generation, 2)
+
+    def test_reset(self):
+        """After reset all files are reported as added again"""
+        self.tracker.detect_changes()
+        self.tracker.reset()
+        changes = self.tracker.detect_changes()
+        self.assertEqual(len(changes.added), 2)
+
+    def test_tracking_without_scanning(self):
+        """Tracked files are compared on the next scan"""
+        stats = self.model.scan_issue_files()
+        modified = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        self.tracker.track(stats)
+        self.assertEqual(self.tracker.get_file_generation(modified), 1)
+        self.assertTrue(self.tracker.detect_project_change().project_changed)
+        self.assertTrue(self.tracker.detect_project_change().is_empty())
+        os.utime(self._issue_file(modified), ns=(1, 1))
+        changes = self.tracker.detect_changes()
+        self.assertEqual(list(changes.modified), [modified])
+        self.assertEqual(changes.added, {})
+        self.assertFalse(changes.project_changed)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(ChangeTrackerTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -0,0 +1,129 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for issue classes in common/items.py
+"""
+
+import unittest
+import pickle
+from datetime import datetime, timezone
+
+import testlib
+from common.items import DitIssue, LazyDitIssue, IssueSummary  # pylint: disable=F0401
+from common.errors import ApplicationError      # pylint: disable=F0401
+
+
+class LazyDitIssueTests(unittest.TestCase):
+    """Unit tests for LazyDitIssue."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.created = datetime(2015, 6, 2, 17, 15, 34, tzinfo=timezone.utc)
+        self.full_issue = DitIssue('A test issue', 'abcd1234', 'bugfix', 'unittest',
+                'unstarted', None, 'A description', 'A tester <mail@address.com>',
+                self.created, None, ['a reference'], 'abcd1234',
+                [[self.created, 'A tester <mail@address.com>', 'created', '']])
+        self.loaded = []
+        summary = IssueSummary('abcd1234', 'A test issue', 'unstarted', None, 'unittest',
+                self.created)
+        self.issue = summary.to_dit_issue(self._load)
+        self.issue.name = 'test-1'
+
+    def _load(self, identifier):
+        self.loaded.append(identifier)
+        return self.full_issue
+
+    def test_summary_fields_without_loading(self):
+        """Summary fields are available without loading the issue"""
+        self.assertIsInstance(self.issue, LazyDitIssue)
+        self.assertEqual(self.issue.title, 'A test issue')
+        self.assertEqual(self.issue.status, 'unstarted')
+        self.assertEqual(self.issue.component, 'unittest')
+        self.assertEqual(self.issue.identifier, 'abcd1234')
+        self.assertIsNone(self.issue.release)
+        self.assertFalse(self.issue.is_loaded())
+        self.assertEqual(self.loaded, [])
+
+    def test_loading_on_first_access(self):
+        """Rest of the fields are loaded once on first access"""
+        self.assertEqual(self.issue.description, 'A description')
+        self.assertEqual(self.issue.references, ['a reference'])
+        self.assertEqual(len(self.issue.log), 1)
+        self.assertEqual(self.issue.creator, 'A tester <mail@address.com>')
+        self.assertEqual(self.issue.issue_type, 'bugfix')
+        self.assertTrue(self.issue.is_loaded())
+        self.assertEqual(self.loaded, ['abcd1234'])
+
+    def test_fields_set_before_loading(self):
+        """Fields set before loading are not overwritten"""
+        self.issue.description = 'A new description'
+        self.assertEqual(self.issue.log[0][2], 'created')
+        self.assertEqual(self.issue.description, 'A new description')
+
+    def test_adding_log_entry(self):
+        """Log entries are added to the loaded log"""
+        self.issue.add_log_entry(action='commented', creator='A tester')
+        self.assertEqual(len(self.issue.log), 2)
+
+    def test_string_representation(self):
+        """Lazy issue is serialized like a full issue"""
+        self.full_issue.name = 'test-1'
+        self.assertEqual(str(self.issue), str(self.full_issue))
+
+    def test_html_representation(self):
+        """Lazy issue is represented as HTML like a full issue"""
+        self.full_issue.name = 'test-1'
+        self.assertEqual(self.issue.toHtml(), self.full_issue.toHtml())
+
+    def test_loading_error(self):
+        """Loading is tried again after an error"""
+        def failing_loader(identifier):
+            raise ApplicationError("Error reading issue yaml file")
+        self.issue._loader = failing_loader
+        self.assertRaises(ApplicationError, getattr, self.issue, 'description')
+        self.issue._loader = self._load
+        self.assertEqual(self.issue.description, 'A description')
+
+    def test_unknown_attribute(self):
+        """Unknown attributes don't load the issue"""
+        self.assertRaises(AttributeError, getattr, self.issue, 'unknown')
+        self.assertEqual(self.loaded, [])
+
+    def test_pickling_without_loader(self):
+        """Loader and the data it refers to are not pickled with the issue"""
+        small = pickle.dumps(self.issue)
+        self.full_issue.description = 'A long description' * 10000
+        large = pickle.dumps(self.issue)
+        self.assertEqual(len(small), len(large))
+        self.assertEqual(self.loaded, [])
+
+        copy = pickle.loads(large)
+        self.assertEqual(copy.name, 'test-1')
+        self.assertEqual(copy.title, 'A test issue')
+        self.assertEqual(copy.created, self.created)
+        self.assertFalse(copy.is_loaded())
+        self.assertRaises(ApplicationError, getattr, copy, 'description')
+
+    def test_pickling_loaded_issue(self):
+        """Loaded issue is pickled with all its fields"""
+        self.assertEqual(self.issue.description, 'A description')
+        copy = pickle.loads(pickle.dumps(self.issue))
+        self.assertTrue(copy.is_loaded())
+        self.assertEqual(str(copy), str(self.issue))
+
+    def test_summary_without_loader(self):
+        """Without a loader a normal DitIssue is created"""
+        summary = IssueSummary('abcd1234', 'A test issue', 'unstarted', None, 'unittest',
+                self.created)
+        issue = summary.to_dit_issue()
+        self.assertNotIsInstance(issue, LazyDitIssue)
+        self.assertIsNone(issue.description)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(LazyDitIssueTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
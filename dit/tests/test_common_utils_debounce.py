@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for common/utils/debounce.py
+"""
+
+import unittest
+
+import testlib
+from common.utils.debounce import Debouncer     # pylint: disable=F0401
+
+
+class DebouncerTests(unittest.TestCase):
+    """Unit tests for Debouncer."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.debouncer = Debouncer(0.5, 2.0)
+
+    def test_no_events(self):
+        """Nothing is due without events"""
+        self.assertIsNone(self.debouncer.time_until_due(0))
+        self.assertEqual(self.debouncer.take(100), 0)
+
+    def test_burst_is_coalesced(self):
+        """A burst of events is taken once, after the burst"""
+        for i in range(2000):
+            self.assertEqual(self.debouncer.add_event(10 + i * 0.0001), 0.5)
+        self.assertEqual(self.debouncer.take(10.5), 0)
+        self.assertEqual(self.debouncer.take(10.7), 2000)
+        self.assertEqual(self.debouncer.take(10.8), 0)
+        self.assertIsNone(self.debouncer.time_until_due(10.8))
+
+    def test_maximum_delay(self):
+        """Continuous events are taken at latest after the maximum delay"""
+        now = 0
+        while self.debouncer.take(now) == 0:
+            self.debouncer.add_event(now)
+            now += 0.25
+        self.assertEqual(now, 2.0)
+        self.assertAlmostEqual(self.debouncer.add_event(now), 0.5)
+
+    def test_no_maximum_delay(self):
+        """Without a maximum delay, events are due only after a pause"""
+        debouncer = Debouncer(0.5)
+        for i in range(100):
+            debouncer.add_event(i * 0.25)
+        self.assertEqual(debouncer.take(25), 0)
+        self.assertEqual(debouncer.take(25.25), 100)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(DebouncerTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -0,0 +1,86 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for common/utils/filelock.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+
+import testlib
+from common.utils import filelock               # pylint: disable=F0401
+
+
+class FileLockTests(unittest.TestCase):
+    """Unit tests for FileLock."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'issue.lock')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_locks_exclude_each_other(self):
+        """A lock is not taken while another lock of the same file is held"""
+        if filelock.fcntl is None:
+            self.skipTest("File locking is not supported")
+        events = []
+        lock = filelock.FileLock(self.path)
+        lock.acquire()
+
+        def take_lock():
+            with filelock.FileLock(self.path):
+                events.append('taken')
+
+        thread = threading.Thread(target=take_lock)
+        thread.start()
+        thread.join(0.2)
+        events.append('released')
+        lock.release()
+        thread.join()
+        self.assertEqual(events, ['released', 'taken'])
+        self.assertTrue(os.path.exists(self.path))
+
+    def test_removing_lock_file(self):
+        """A lock waiting for a removed file is taken on a new file"""
+        if filelock.fcntl is None:
+            self.skipTest("File locking is not supported")
+        events = []
+        lock = filelock.FileLock(self.path)
+        lock.acquire()
+
+        def take_lock():
+            with filelock.FileLock(self.path) as taken:
+                locked = os.fstat(taken._fd).st_ino     # pylint: disable=W0212
+                events.append(locked == os.stat(self.path).st_ino)
+                taken.remove()
+
+        thread = threading.Thread(target=take_lock)
+        thread.start()
+        thread.join(0.2)
+        events.append('removed')
+        lock.remove()
+        thread.join()
+        self.assertEqual(events, ['removed', True])
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_lock_without_file(self):
+        """Nothing is locked without a lock file"""
+        with filelock.FileLock(None):
+            with filelock.FileLock(None):
+                pass
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(FileLockTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
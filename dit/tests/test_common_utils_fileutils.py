@@ -0,0 +1,58 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for common/utils/fileutils.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import mock
+
+import testlib
+from common.utils import fileutils              # pylint: disable=F0401
+
+
+class AtomicWriteTests(unittest.TestCase):
+    """Unit tests for writing files atomically."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'issue-1.yaml')
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_writing_new_and_existing_file(self):
+        """Content is replaced and no temporary files are left"""
+        fileutils.write_file_atomically(self.path, "first\n")
+        fileutils.write_file_atomically(self.path, "second\n", sync=True)
+        with open(self.path) as stream:
+            self.assertEqual(stream.read(), "second\n")
+        self.assertEqual(os.listdir(self.temp_dir), ['issue-1.yaml'])
+
+    def test_failing_write_keeps_old_content(self):
+        """The old content stays, if writing the new content fails"""
+        fileutils.write_file_atomically(self.path, "old\n")
+        with mock.patch('os.replace', side_effect=OSError("disk full")):
+            self.assertRaises(OSError, fileutils.write_file_atomically, self.path, "new\n")
+        with open(self.path) as stream:
+            self.assertEqual(stream.read(), "old\n")
+        self.assertEqual(os.listdir(self.temp_dir), ['issue-1.yaml'])
+
+    def test_syncing_directory(self):
+        """Sync a directory, fail for one that doesn't exist"""
+        fileutils.sync_directory(self.temp_dir)
+        self.assertRaises(OSError, fileutils.sync_directory,
+                          os.path.join(self.temp_dir, 'missing'))
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(AtomicWriteTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -0,0 +1,95 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for common/utils/template.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+
+import testlib
+from common.utils.template import HtmlTemplate, TemplateCache  # pylint: disable=F0401
+
+
+class HtmlTemplateTests(unittest.TestCase):
+    """Unit tests for compiled templates."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+
+    def test_rendering(self):
+        """Placeholders are replaced with their values"""
+        template = HtmlTemplate("<b>[TITLE]</b>\n<i>[NAME]</i> [TITLE]\n")
+        self.assertEqual(template.placeholders, frozenset(['TITLE', 'NAME']))
+        self.assertEqual(template.render({'TITLE': 'A title', 'NAME': 'test-1'}),
+                         "<b>A title</b>\n<i>test-1</i> A title\n")
+
+    def test_missing_and_empty_values(self):
+        """Placeholders without values are kept, None values are empty"""
+        template = HtmlTemplate("[TITLE]:[NAME]:[lower]:[]")
+        self.assertEqual(template.render({'NAME': None}), "[TITLE]::[lower]:[]")
+
+    def test_values_are_not_searched(self):
+        """Placeholders inside values are not replaced"""
+        template = HtmlTemplate("[TITLE] [NAME]")
+        self.assertEqual(template.render({'TITLE': '[NAME]', 'NAME': 'x'}), "[NAME] x")
+
+    def test_rendering_to_list(self):
+        """Many items are rendered to the same list"""
+        template = HtmlTemplate("<li>[NAME]</li>")
+        output = ['<ol>']
+        for name in ('a', 'b'):
+            template.render_to(output, {'NAME': name})
+        output.append('</ol>')
+        self.assertEqual(''.join(output), "<ol><li>a</li><li>b</li></ol>")
+
+
+class TemplateCacheTests(unittest.TestCase):
+    """Unit tests for caching compiled templates."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.template_file = os.path.join(self.temp_dir, 'template.html')
+        self.cache = TemplateCache()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, text, mtime):
+        with open(self.template_file, 'w') as stream:
+            stream.write(text)
+        os.utime(self.template_file, (mtime, mtime))
+
+    def test_template_is_compiled_once(self):
+        """Unchanged template file is not read again"""
+        self._write("[TITLE]", 1000000000)
+        template = self.cache.get_template(self.template_file)
+        self.assertIs(self.cache.get_template(self.template_file), template)
+
+    def test_changed_template_is_read(self):
+        """Template file is read again when it is modified"""
+        self._write("[TITLE]", 1000000000)
+        template = self.cache.get_template(self.template_file)
+        self._write("<b>[TITLE]</b>", 1000000000)
+        self.assertEqual(self.cache.get_template(self.template_file).render({'TITLE': 'x'}),
+                         "<b>x</b>")
+        self._write("<i>[TITLE]</i>", 1000000001)
+        self.assertEqual(self.cache.get_template(self.template_file).render({'TITLE': 'x'}),
+                         "<i>x</i>")
+        self.assertIsNot(self.cache.get_template(self.template_file), template)
+
+    def test_missing_template(self):
+        """Reading a missing template file raises OSError"""
+        self.assertRaises(OSError, self.cache.get_template, self.template_file)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(HtmlTemplateTests))
+    testsuite.addTest(unittest.makeSuite(TemplateCacheTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
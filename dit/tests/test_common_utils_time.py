@@ -0,0 +1,98 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for common/utils/time.py
+"""
+
+import unittest
+import random
+from datetime import datetime, timedelta, timezone
+
+import testlib
+from common.utils import time                   # pylint: disable=F0401
+
+
+class HumanTimeDiffTests(unittest.TestCase):
+    """Unit tests for explaining time differences."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.now = datetime(2015, 3, 31, 12, 0, 0, tzinfo=timezone.utc)
+
+    def test_explaining_differences(self):
+        """Differences are explained with the two largest units"""
+        cases = [
+            (timedelta(seconds=1), "1 second"),
+            (timedelta(minutes=2, seconds=5), "2 minutes 5 seconds"),
+            (timedelta(days=1, hours=1, minutes=1), "1 day 1 hour"),
+            (timedelta(days=27, seconds=59), "27 days 59 seconds"),
+            (timedelta(days=365 + 31), "1 year 1 month"),
+            (timedelta(0), ""),
+        ]
+        for delta, expected in cases:
+            self.assertEqual(time.human_time_diff(self.now - delta, now=self.now), expected)
+
+    def test_calendar_months(self):
+        """Months are counted as calendar months"""
+        then = datetime(2015, 1, 31, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(time.human_time_diff(then, now=self.now), "2 months")
+        now = datetime(2015, 2, 28, 12, 0, 0, tzinfo=timezone.utc)
+        self.assertEqual(time.human_time_diff(then, now=now), "1 month")
+        now = datetime(2015, 2, 28, 11, 59, 59, tzinfo=timezone.utc)
+        self.assertEqual(time.human_time_diff(then, 6, now), "27 days 23 hours 59 minutes 59 seconds")
+
+    def test_max_elements(self):
+        """Number of units used can be chosen"""
+        then = datetime(2013, 2, 3, 4, 5, 6, tzinfo=timezone.utc)
+        self.assertEqual(time.human_time_diff(then, 1, self.now), "2 years")
+        self.assertEqual(time.human_time_diff(then, 6, self.now),
+                         "2 years 1 month 28 days 7 hours 54 minutes 54 seconds")
+
+    def test_time_zones(self):
+        """Naive datetimes are in UTC, aware ones are converted"""
+        then = datetime(2015, 3, 31, 13, 0, 0, tzinfo=timezone(timedelta(hours=2)))
+        self.assertEqual(time.human_time_diff(then, now=self.now), "1 hour")
+        self.assertEqual(time.human_time_diff(datetime(2015, 3, 31, 11, 0, 0), now=self.now),
+                         "1 hour")
+        self.assertEqual(time.human_time_diff("2015-03-31 11:00:00+00:00", now=self.now),
+                         "1 hour")
+
+    def test_future_timestamps(self):
+        """Timestamps in the future are not explained"""
+        for delta in (timedelta(seconds=1), timedelta(days=400)):
+            self.assertEqual(time.human_time_diff(self.now + delta, now=self.now), "")
+
+    def test_batch(self):
+        """Many timestamps are explained against the same time"""
+        rnd = random.Random(2015)
+        timestamps = [self.now - timedelta(seconds=rnd.randint(0, 10**8)) for _ in range(100)]
+        self.assertEqual(time.human_time_diffs(timestamps, now=self.now),
+                         [time.human_time_diff(timestamp, now=self.now)
+                          for timestamp in timestamps])
+        self.assertEqual(len(time.human_time_diffs(iter(timestamps))), 100)
+
+    def test_same_as_dateutil(self):
+        """Differences are the same as with dateutil's relativedelta"""
+        try:
+            from dateutil.relativedelta import relativedelta
+        except ImportError:
+            self.skipTest("dateutil not available")
+        rnd = random.Random(2008)
+        for _ in range(2000):
+            now = self.now + timedelta(seconds=rnd.randint(0, 10**8))
+            then = now - timedelta(seconds=rnd.randint(0, 10**rnd.randint(1, 9)))
+            difference = relativedelta(now, then)
+            expected = tuple(getattr(difference, unit) for unit in time.TIME_UNITS)
+            explanation = time.human_time_diff(then, 6, now)
+            self.assertEqual(explanation, time.human_time_diff(
+                    then.isoformat(' '), 6, now.isoformat(' ')))
+            self.assertEqual(time._count_difference(then, now), expected)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(HumanTimeDiffTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -0,0 +1,136 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for dit-cli.py startup
+
+Commands are run in the test project of this directory.
+"""
+
+import unittest
+import os
+import sys
+import glob
+import json
+import time
+import shutil
+import tempfile
+import subprocess
+
+import testlib
+
+
+DIT_CLI = os.path.join(os.path.dirname(os.path.realpath(__file__)), '..', 'dit-cli.py')
+
+
+class DitCliStartupTests(unittest.TestCase):
+    """Unit tests for modules imported by dit-cli commands."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir)
+
+    def run_dit(self, *args):
+        """Run a dit command, return its output and imported modules."""
+        env = dict(os.environ, DIT_NO_DAEMON='1', XDG_CACHE_HOME=self.cache_dir)
+        process = subprocess.run([sys.executable, '-X', 'importtime', DIT_CLI] + list(args),
+                                 stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=env,
+                                 check=False, universal_newlines=True)
+        modules = set(line.rsplit('|', 1)[-1].strip() for line in process.stderr.splitlines()
+                      if line.startswith('import time:'))
+        return process.stdout, modules
+
+    def test_help(self):
+        """Help doesn't load configuration or issues"""
+        output, modules = self.run_dit('--help')
+        self.assertIn('Commands:', output)
+        for module in ['yaml', 'config', 'ditcontrol', 'pick', 'readline']:
+            self.assertNotIn(module, modules)
+
+    def test_scripted_commands(self):
+        """Non-interactive commands don't import interactive modules"""
+        output, modules = self.run_dit('list-ids')
+        self.assertIn('e50d0e38b19c1ff0e9b696ffe919435d26477975', output)
+        self.assertIn('ditcontrol', modules)
+        self.assertNotIn('pick', modules)
+        self.assertNotIn('readline', modules)
+        self.assertNotIn('concurrent.futures', modules)
+
+    def test_component_commands(self):
+        """Component commands don't load the issues"""
+        output, modules = self.run_dit('list-components')
+        self.assertIn('testing_project', output)
+        self.assertIn('config', modules)
+        self.assertNotIn('ditcontrol', modules)
+
+
+class DitCliDaemonTests(unittest.TestCase):
+    """
+    Integration tests for dit commands served by a dit daemon.
+
+    A copy of the test project is used, so the issues can be modified.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.project_dir = os.path.join(self.temp_dir, 'project')
+        shutil.copytree('data/bugs', os.path.join(self.project_dir, 'data', 'bugs'))
+        shutil.copy('.dit-config', self.project_dir)
+        self.env = dict(os.environ, XDG_CACHE_HOME=os.path.join(self.temp_dir, 'cache'))
+        self.env.pop('DIT_NO_DAEMON', None)
+        self.daemon = subprocess.Popen([sys.executable, DIT_CLI, 'daemon'],
+                                       cwd=self.project_dir, env=self.env,
+                                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        socket_pattern = os.path.join(self.temp_dir, 'cache', '**', 'daemon.sock')
+        deadline = time.monotonic() + 10
+        while not glob.glob(socket_pattern, recursive=True):
+            if self.daemon.poll() is not None or time.monotonic() > deadline:
+                self.tearDown()
+                self.fail("Dit daemon didn't start")
+            time.sleep(0.05)
+
+    def tearDown(self):
+        self.daemon.terminate()
+        self.daemon.wait()
+        shutil.rmtree(self.temp_dir)
+
+    def run_dit(self, *args, stdin=''):
+        """Run a dit command in the project, return its output and imported modules."""
+        process = subprocess.run([sys.executable, '-X', 'importtime', DIT_CLI] + list(args),
+                                 input=stdin, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                 cwd=self.project_dir, env=self.env, check=False,
+                                 universal_newlines=True)
+        modules = set(line.rsplit('|', 1)[-1].strip() for line in process.stderr.splitlines()
+                      if line.startswith('import time:'))
+        # commands served by the daemon don't load the issues themselves
+        self.assertNotIn('ditcontrol', modules)
+        return process.stdout
+
+    def test_commands_through_daemon(self):
+        """Issues are added, listed, shown and commented through the daemon"""
+        output = self.run_dit('batch', stdin=json.dumps(
+                {'op': 'add', 'title': 'A daemon issue', 'comment': 'Added'}) + '\n')
+        result = json.loads(output)
+        self.assertTrue(result['ok'], result)
+        self.assertEqual(result['name'], 'testing_project-3')
+        self.assertEqual(len(result['issue']), 40)
+
+        self.assertIn('A daemon issue', self.run_dit('list'))
+        self.assertIn('Commenting issue', self.run_dit('comment', 'testing_project-3',
+                                                       stdin='A comment\n/stop\n'))
+        output = self.run_dit('show', 'testing_project-3')
+        self.assertIn('A daemon issue', output)
+        self.assertIn('A comment', output)
+        self.assertIn(result['issue'], self.run_dit('list-ids'))
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(DitCliStartupTests))
+    testsuite.addTest(unittest.makeSuite(DitCliDaemonTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
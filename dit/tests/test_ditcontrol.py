@@ -4,9 +4,14 @@
 # classes to access Dit command line tool
 
 import unittest
+import os
+import shutil
+import multiprocessing
+import tempfile
 
 import testlib
 import ditcontrol                              # pylint: disable=F0401
+from config import ConfigControl                # pylint: disable=F0401
 from common.errors import ApplicationError      # pylint: disable=F0401
 
 class DitControlTests(unittest.TestCase):
@@ -38,9 +43,239 @@ class DitControlTests(unittest.TestCase):
     #    self.assertTrue(isinstance(item, list))
     #    print("Item: " + str(item))
 
+class ProjectTestCase(unittest.TestCase):
+    """
+    A base for tests modifying issues with DitControl.
+
+    A copy of the test project is used, so the issues can be modified.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_dir = os.getcwd()
+        self.original_cache = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.temp_dir, 'cache')
+        project_dir = os.path.join(self.temp_dir, 'project')
+        shutil.copytree('data/bugs', os.path.join(project_dir, 'data', 'bugs'))
+        shutil.copy('.dit-config', project_dir)
+        os.chdir(project_dir)
+        self.dit = self.create_dit()
+
+    def tearDown(self):
+        os.chdir(self.original_dir)
+        if self.original_cache is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.original_cache
+        shutil.rmtree(self.temp_dir)
+
+    @staticmethod
+    def create_dit(separate_logs=False, issue_snapshot=False):
+        """Create a new DitControl for the test project."""
+        config = ConfigControl()
+        config.load_configs()
+        config.get_app_configs().separate_logs = separate_logs
+        config.get_app_configs().issue_snapshot = issue_snapshot
+        return ditcontrol.DitControl(config)
+
+
+class DitControlBulkTests(ProjectTestCase):
+    """Unit tests for changing many issues at once with DitControl."""
+    def test_closing_issues(self):
+        """Close issues selected by names"""
+        outcomes = self.dit.close_issues(['testing_project-1', 'testing_project-2'], 1, "Done")
+        self.assertEqual(len(outcomes), 2)
+        self.assertEqual(set(outcomes.values()), {None})
+        for identifier in outcomes:
+            issue = self.dit.issuemodel.read_issue(identifier)
+            self.assertEqual(issue.status, 'closed')
+            self.assertEqual(issue.disposition, "won't fix")
+            self.assertEqual(issue.log[-1].comment, "Done")
+            self.assertEqual(self.dit.get_issue_from_cache(identifier).status, 'closed')
+        self.assertEqual(self.dit.get_issues_by_release(None), [])
+
+    def test_assigning_issues_by_predicate(self):
+        """Assign issues selected by a predicate"""
+        outcomes = self.dit.assign_issues(lambda issue: issue.issue_type == 'feature',
+                                          'week 49')
+        self.assertEqual(list(outcomes), ['2f87f94bd56e5a7fdb1338c63e8f5848de1418f6'])
+        issues = self.dit.get_issues_by_release('week 49')
+        self.assertEqual([issue.identifier for issue in issues], list(outcomes))
+        self.assertEqual(issues[0].name, 'testing_project-2')
+
+    def test_changing_issues_with_errors(self):
+        """Failing issues are reported and the rest are changed"""
+        outcomes = self.dit.change_issues_status(['testing_project-1', 'testing_project-9'],
+                                                 'in progress')
+        self.assertIsNone(outcomes['e50d0e38b19c1ff0e9b696ffe919435d26477975'])
+        self.assertEqual(outcomes['testing_project-9'],
+                         'Unable to find issue: testing_project-9')
+        self.assertEqual(self.dit.get_issue_status_by_dit_id('testing_project-1'),
+                         'in progress')
+
+        outcomes = self.dit.add_comment_to_issues(['testing_project-2'], "A comment")
+        self.assertEqual(list(outcomes.values()), [None])
+
+    def test_packing_closed_issues(self):
+        """Closed issues are packed and still listed and changed"""
+        self.dit.close_issue('testing_project-1', 0, "Done")
+        identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        dit = self.create_dit()
+        self.assertEqual(dit.pack_issues(365), 0)
+        # the age is checked without loading the issues
+        self.assertFalse(dit.get_issue_from_cache(identifier).is_loaded())
+        self.assertEqual(self.dit.pack_issues(), 1)
+        self.assertFalse(os.path.exists('data/bugs/issue-{}.yaml'.format(identifier)))
+        issues = self.create_dit().get_issues_by_release(None, True)
+        self.assertIn(identifier, [issue.identifier for issue in issues])
+
+        self.dit.add_comment('testing_project-1', "After packing")
+        self.assertEqual(self.dit.get_issue_content('testing_project-1').log[-1].comment,
+                         "After packing")
+        self.assertEqual(self.dit.pack_issues(), 1)
+        self.dit.drop_issue('testing_project-1')
+        self.assertIsNone(self.create_dit().get_issue_from_cache(identifier))
+
+    def test_loading_issue_snapshot(self):
+        """Issues are loaded from a snapshot until issue files change"""
+        # snapshots are not written right after the issue directory changes
+        os.utime('data/bugs', ns=(10**9, 10**9))
+        dit = self.create_dit(issue_snapshot=True)
+        dit.wait_for_snapshot()
+        self.assertTrue(os.path.exists(dit.snapshot_file))
+        names = [issue.name for issue in dit.get_issues_by_release(None)]
+
+        other = self.create_dit(issue_snapshot=True)
+        self.assertTrue(other.item_cache.is_snapshot_loaded())
+        self.assertEqual([issue.name for issue in other.get_issues_by_release(None)], names)
+        self.assertEqual(other.get_issue_from_cache('testing_project-2').identifier,
+                         '2f87f94bd56e5a7fdb1338c63e8f5848de1418f6')
+        self.assertTrue(other.refresh_cache().is_empty())
+
+        dit.start_work('testing_project-1', "Started")
+        os.utime('data/bugs', ns=(2 * 10**9, 2 * 10**9))
+        changes = other.refresh_cache()
+        self.assertEqual(list(changes.modified), ['e50d0e38b19c1ff0e9b696ffe919435d26477975'])
+        self.assertEqual(other.get_issue_status_by_dit_id('testing_project-1'), 'in progress')
+        other.wait_for_snapshot()
+        self.assertEqual(self.create_dit(issue_snapshot=True)
+                         .get_issue_status_by_dit_id('testing_project-1'), 'in progress')
+
+    def test_issue_snapshot_with_files_edited_in_place(self):
+        """Issue files edited in place are read again, also when a snapshot is loaded"""
+        os.utime('data/bugs', ns=(10**9, 10**9))
+        self.create_dit(issue_snapshot=True).wait_for_snapshot()
+        issue_file = 'data/bugs/issue-e50d0e38b19c1ff0e9b696ffe919435d26477975.yaml'
+
+        def edit_title(title):
+            with open(issue_file) as stream:
+                text = stream.read()
+            with open(issue_file, 'w') as stream:
+                stream.write(text.replace(text.splitlines()[1], 'title: ' + title))
+            # the fingerprint of the issue directory doesn't change
+            os.utime('data/bugs', ns=(10**9, 10**9))
+
+        edit_title("An edited issue")
+        dit = self.create_dit(issue_snapshot=True)
+        self.assertIsNotNone(dit.snapshot)
+        self.assertIn("An edited issue", [item.title for item in dit.get_items()])
+        self.assertEqual(dit.get_issue_from_cache('testing_project-2').identifier,
+                         '2f87f94bd56e5a7fdb1338c63e8f5848de1418f6')
+
+        edit_title("Edited again")
+        titles = [item.title for item in dit.get_items()]
+        self.assertIn("Edited again", titles)
+        self.assertNotIn("An edited issue", titles)
+        dit.wait_for_snapshot()
+
+
+def add_comments(writer, count, issue_name, separate_logs):
+    """Add comments to an issue, and change its status. Run in a writer process."""
+    dit = ProjectTestCase.create_dit(separate_logs)
+    for i in range(count):
+        dit.add_comment(issue_name, "Writer {} comment {}".format(writer, i))
+        if i % 5 == 0:
+            dit.start_work(issue_name, "Writer {} status {}".format(writer, i))
+
+
+class DitControlConcurrencyTests(ProjectTestCase):
+    """Unit tests for several writers changing the same issue."""
+    def test_changing_stale_issue(self):
+        """Changes made by others are kept, when an issue read earlier is written"""
+        issue = self.dit.get_issue_content('testing_project-1')
+        self.create_dit().add_comment('testing_project-1', "Meanwhile")
+        issue.title = "Edited title"
+        self.dit.edit_issue(issue, "Edited")
+
+        written = self.dit.issuemodel.read_issue(issue.identifier)
+        self.assertEqual(written.title, "Edited title")
+        self.assertEqual([entry.comment for entry in written.log[1:]], ["Meanwhile", "Edited"])
+        self.assertEqual(self.dit.get_issue_from_cache('testing_project-1').version,
+                         written.version)
+
+        self.create_dit().add_comment('testing_project-1', "Again")
+        self.dit.close_issues([issue.identifier], 0)
+        written = self.dit.issuemodel.read_issue(issue.identifier)
+        self.assertEqual(written.status, 'closed')
+        self.assertEqual(written.log[-2].comment, "Again")
+
+    def test_concurrent_writers(self):
+        """No comments are lost, when many processes comment the same issue"""
+        self.run_concurrent_writers(False)
+
+    def test_concurrent_writers_with_separate_logs(self):
+        """No comments are lost, when many processes append to the same log file"""
+        self.run_concurrent_writers(True)
+
+    def test_separate_log_comment(self):
+        """A comment is appended to the log file without writing the issue file"""
+        self.dit = self.create_dit(True)
+        self.dit.start_work('testing_project-1')
+        issue_file = 'data/bugs/issue-e50d0e38b19c1ff0e9b696ffe919435d26477975.yaml'
+        stat = os.stat(issue_file)
+        self.dit.add_comment('testing_project-1', "Appended")
+        self.assertEqual(os.stat(issue_file).st_mtime_ns, stat.st_mtime_ns)
+        issue = self.dit.get_issue_content('testing_project-1')
+        self.assertEqual(issue.log[-1].comment, "Appended")
+        self.assertEqual(issue.status, 'in progress')
+        self.assertRaises(ApplicationError, self.dit.add_comment, 'testing_project-9', "Lost")
+
+    def test_log_appended_by_others(self):
+        """Comments appended to a log file by others are noticed"""
+        self.dit = self.create_dit(True)
+        self.assertEqual(len(self.dit.get_issue_from_cache('testing_project-1').log), 1)
+        self.create_dit(True).add_comment('testing_project-1', "Meanwhile")
+        changes = self.dit.refresh_cache()
+        self.assertEqual(list(changes.modified), ['e50d0e38b19c1ff0e9b696ffe919435d26477975'])
+        self.assertEqual(self.dit.get_issue_from_cache('testing_project-1').log[-1].comment,
+                         "Meanwhile")
+
+    def run_concurrent_writers(self, separate_logs):
+        """Comment an issue in many processes, check all comments are kept."""
+        writers = 8
+        count = 15
+        context = multiprocessing.get_context('spawn' if os.name == 'nt' else 'fork')
+        processes = [context.Process(target=add_comments,
+                                     args=(writer, count, 'testing_project-1', separate_logs))
+                     for writer in range(writers)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+            self.assertEqual(process.exitcode, 0)
+
+        issue = self.dit.issuemodel.read_issue('e50d0e38b19c1ff0e9b696ffe919435d26477975')
+        comments = [entry.comment for entry in issue.log[1:] if entry.action == 'commented']
+        self.assertEqual(len(comments), writers * count)
+        self.assertEqual(set(comments), {"Writer {} comment {}".format(writer, i)
+                                         for writer in range(writers) for i in range(count)})
+        self.assertEqual(len(issue.log), 1 + writers * (count + count // 5))
+
+
 def suite():
     testsuite = unittest.TestSuite()
     testsuite.addTest(unittest.makeSuite(DitControlTests))
+    testsuite.addTest(unittest.makeSuite(DitControlBulkTests))
+    testsuite.addTest(unittest.makeSuite(DitControlConcurrencyTests))
     return testsuite
 
 if __name__ == '__main__':
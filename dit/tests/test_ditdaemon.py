@@ -0,0 +1,142 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for ditdaemon.py
+"""
+
+import unittest
+import os
+import socket
+import shutil
+import tempfile
+import threading
+
+import testlib
+from ditdaemon import DitDaemon, DaemonClient, RemoteObject  # pylint: disable=F0401
+from common.errors import DitError, ApplicationError        # pylint: disable=F0401
+from common.items import DitIssue, IssueSummary             # pylint: disable=F0401
+
+
+class FakeConfig(object):
+    """A configuration object reachable through FakeControl."""
+    def get_project_name(self):
+        return 'testing_project'
+
+
+class FakeControl(object):
+    """An object served instead of a DitControl."""
+    def __init__(self):
+        self.config = FakeConfig()
+        self.refreshes = 0
+        self.issues = []
+
+    def refresh_cache(self):
+        self.refreshes += 1
+
+    def add_issue(self, issue, comment):
+        self.issues.append((issue, comment))
+        return len(self.issues)
+
+    def get_items(self):
+        summary = IssueSummary('a' * 40, 'A lazy issue', 'unstarted', None, None, None)
+        return [summary.to_dit_issue(self.read_issue)]
+
+    def read_issue(self, identifier):
+        return DitIssue('A lazy issue', identifier=identifier, description='A description')
+
+    def fail(self, message):
+        raise DitError(message)
+
+    def generator(self):
+        yield 1
+
+    def _private(self):
+        return 'private'
+
+
+class DitDaemonTests(unittest.TestCase):
+    """Unit tests for DitDaemon and its clients."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.temp_dir, 'daemon.sock')
+        self.dit = FakeControl()
+        self.daemon = DitDaemon(self.dit, self.socket_path)
+        self.daemon.start()
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.daemon.shutdown()
+        self.thread.join()
+        shutil.rmtree(self.temp_dir)
+
+    def connect(self):
+        """Connect a client to the daemon."""
+        client = DaemonClient.connect(self.socket_path)
+        self.assertIsNotNone(client)
+        self.clients.append(client)
+        return RemoteObject(client)
+
+    def test_calling_methods(self):
+        """Methods of the served object and its attributes can be called"""
+        dit = self.connect()
+        issue = DitIssue('A title', status='unstarted')
+        self.assertEqual(dit.add_issue(issue, comment='A comment'), 1)
+        self.assertEqual(dit.config.get_project_name(), 'testing_project')
+        self.assertEqual(self.dit.issues[0][0].title, 'A title')
+        self.assertEqual(self.dit.issues[0][1], 'A comment')
+
+    def test_returning_lazy_issues(self):
+        """Lazy issues are returned without their loader and the served object"""
+        issue = self.connect().get_items()[0]
+        self.assertEqual(issue.title, 'A lazy issue')
+        self.assertFalse(issue.is_loaded())
+        self.assertRaises(ApplicationError, getattr, issue, 'description')
+
+    def test_refreshing_on_connect(self):
+        """Cache is refreshed once for each connected client"""
+        dit = self.connect()
+        dit.config.get_project_name()
+        dit.config.get_project_name()
+        self.assertEqual(self.dit.refreshes, 1)
+        self.connect().config.get_project_name()
+        self.assertEqual(self.dit.refreshes, 2)
+
+    def test_errors(self):
+        """Errors are raised in the client"""
+        dit = self.connect()
+        with self.assertRaises(DitError) as context:
+            dit.fail('A failure')
+        self.assertEqual(context.exception.error_message, 'A failure')
+        self.assertRaises(AttributeError, getattr, dit, '_private')
+        self.assertRaises(ApplicationError, self.clients[0].call, ('_private',), (), {})
+        self.assertRaises(ApplicationError, dit.unknown)
+        self.assertRaises(ApplicationError, dit.generator)
+        self.assertEqual(dit.config.get_project_name(), 'testing_project')
+
+    def test_one_daemon_per_socket(self):
+        """Second daemon can't use the same socket, a stale socket is replaced"""
+        self.assertRaises(ApplicationError, DitDaemon(self.dit, self.socket_path).start)
+        stale_path = os.path.join(self.temp_dir, 'stale.sock')
+        stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        stale.bind(stale_path)
+        stale.close()
+        self.assertIsNone(DaemonClient.connect(stale_path))
+        daemon = DitDaemon(self.dit, stale_path)
+        daemon.start()
+        daemon.close()
+        self.assertFalse(os.path.exists(stale_path))
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(DitDaemonTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
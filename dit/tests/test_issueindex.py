@@ -0,0 +1,236 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for issueindex.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import threading
+import sqlite3
+
+import testlib
+import issueindex                               # pylint: disable=F0401
+from issuemodel import IssueModel               # pylint: disable=F0401
+from common.items import IssueSummary           # pylint: disable=F0401
+from common.errors import ApplicationError      # pylint: disable=F0401
+
+
+class IssueIndexTests(unittest.TestCase):
+    """
+    Unit tests for IssueIndex.
+
+    A copy of the issues in data/bugs is used,
+    so the issue files can be modified.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.temp_dir, 'cache')
+        self.issue_dir = os.path.join(self.temp_dir, 'bugs')
+        shutil.copytree('data/bugs', self.issue_dir)
+        self.index_file = os.path.join(self.temp_dir, 'index.sqlite')
+        self.model = IssueModel(self.issue_dir)
+        self.index = issueindex.IssueIndex(self.model, self.index_file)
+
+    def tearDown(self):
+        self.index.close()
+        if self.original_cache is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.original_cache
+        shutil.rmtree(self.temp_dir)
+
+    def _issue_file(self, identifier):
+        return '{}/issue-{}.yaml'.format(self.issue_dir, identifier)
+
+    def test_getting_summaries(self):
+        """Get summaries of all issues"""
+        summaries = self.index.get_summaries()
+        self.assertEqual(len(summaries), 2)
+        summary = summaries['e50d0e38b19c1ff0e9b696ffe919435d26477975']
+        self.assertIsInstance(summary, IssueSummary)
+        self.assertEqual(summary.title, 'A test issue')
+        self.assertEqual(summary.status, 'unstarted')
+        self.assertEqual(summary.component, 'testing_project')
+        self.assertIsNone(summary.release)
+        self.assertEqual(summary.created.year, 2015)
+
+    def test_summaries_from_index(self):
+        """Summaries are read from the index when files have not changed"""
+        first = self.index.get_summaries()
+        self.index.close()
+        self.model.read_issue_summary = None    # reading files would fail now
+        self.index = issueindex.IssueIndex(self.model, self.index_file)
+        second = self.index.get_summaries()
+        self.assertEqual(first, second)
+
+    def test_changed_issue_is_read_again(self):
+        """Modified issue file is parsed again"""
+        identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        self.index.get_summaries()
+        issue = self.model.read_issue_yaml(identifier)
+        issue.title = 'A changed title'
+        self.model.write_issue_yaml(issue)
+        os.utime(self._issue_file(identifier), ns=(1, 1))
+        summaries = self.index.get_summaries()
+        self.assertEqual(summaries[identifier].title, 'A changed title')
+
+    def test_changed_log_is_read_again(self):
+        """Issue is parsed again when its log file changes"""
+        identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        read = []
+        read_issues_bulk = self.model.read_issues_bulk
+        self.model.read_issues_bulk = lambda identifiers: (read.extend(identifiers) or
+                                                           read_issues_bulk(identifiers))
+        self.model.separate_logs = True
+        issue = self.model.read_issue(identifier)
+        self.model.append_log_entries(identifier, issue.log[:1])
+        self.index.get_summaries()
+        self.assertEqual(len(read), 2)
+        self.model.append_log_entries(identifier, issue.log[:1])
+        self.index.get_summaries()
+        self.assertEqual(read[2:], [identifier])
+        self.index.get_summaries()
+        self.assertEqual(len(read), 3)
+
+    def test_removed_issue_is_removed(self):
+        """Removed issue file is removed from index"""
+        identifier = '2f87f94bd56e5a7fdb1338c63e8f5848de1418f6'
+        self.index.get_summaries()
+        os.remove(self._issue_file(identifier))
+        summaries = self.index.get_summaries()
+        self.assertEqual(len(summaries), 1)
+        self.assertNotIn(identifier, summaries)
+
+    def test_corrupted_index_is_rebuilt(self):
+        """Corrupted index file is replaced with a new one"""
+        self.index.get_summaries()
+        self.index.close()
+        with open(self.index_file, 'wb') as stream:
+            stream.write(b'this is not a database' * 100)
+        self.index = issueindex.IssueIndex(self.model, self.index_file)
+        summaries = self.index.get_summaries()
+        self.assertEqual(len(summaries), 2)
+
+    def test_locked_index_is_kept(self):
+        """Index locked by another process is used after the lock is released"""
+        changed = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        self.index.get_summaries()
+        self.index.connection.execute("PRAGMA busy_timeout = 100")
+        inode = os.stat(self.index_file).st_ino
+        other = sqlite3.connect(self.index_file)
+        other.execute("BEGIN EXCLUSIVE")
+        try:
+            issue = self.model.read_issue_yaml(changed)
+            issue.title = 'A changed title'
+            self.model.write_issue_yaml(issue)
+            os.utime(self._issue_file(changed), ns=(1, 1))
+            summaries = self.index.get_summaries()
+            self.assertEqual(summaries[changed].title, 'A changed title')
+            batches = list(self.index.iter_summaries(batch_size=1))
+            self.assertEqual(sorted(identifier for batch in batches for identifier in batch),
+                             sorted(summaries))
+            self.assertRaises(ApplicationError, self.index.rebuild)
+        finally:
+            other.rollback()
+            other.close()
+        self.assertEqual(os.stat(self.index_file).st_ino, inode)
+        self.assertEqual(len(self.index.get_summaries()), 2)
+
+        # the index is updated after waiting for the lock
+        self.index.connection.execute("PRAGMA busy_timeout = 10000")
+        os.utime(self._issue_file(changed), ns=(2, 2))
+        other = sqlite3.connect(self.index_file, check_same_thread=False)
+        other.execute("BEGIN EXCLUSIVE")
+        timer = threading.Timer(0.2, other.rollback)
+        timer.start()
+        self.index.get_summaries()
+        timer.join()
+        other.close()
+        self.index.close()
+        self.model.read_issue_summary = None    # reading files would fail now
+        self.index = issueindex.IssueIndex(self.model, self.index_file)
+        self.assertEqual(self.index.get_summaries()[changed].title, 'A changed title')
+
+    def test_corrupted_index_while_iterating(self):
+        """Summaries are returned once, also when the index is rebuilt while iterating"""
+        write = self.index._write                           # pylint: disable=W0212
+        failures = []
+
+        def fail_once(statement, rows):
+            if not failures:
+                failures.append(statement)
+                raise sqlite3.DatabaseError("database disk image is malformed")
+            write(statement, rows)
+
+        self.index._write = fail_once                       # pylint: disable=W0212
+        batches = list(self.index.iter_summaries(batch_size=1))
+        self.assertEqual(len(failures), 1)
+        identifiers = [identifier for batch in batches for identifier in batch]
+        self.assertEqual(sorted(identifiers), sorted(set(identifiers)))
+        self.assertEqual(len(identifiers), 2)
+
+    def test_incompatible_index_is_rebuilt(self):
+        """Index created with a different schema version is replaced"""
+        self.index.get_summaries()
+        self.index.close()
+        old_version = issueindex.IssueIndex.SCHEMA_VERSION
+        issueindex.IssueIndex.SCHEMA_VERSION = old_version + 1
+        try:
+            self.index = issueindex.IssueIndex(self.model, self.index_file)
+            summaries = self.index.get_summaries()
+        finally:
+            issueindex.IssueIndex.SCHEMA_VERSION = old_version
+        self.assertEqual(len(summaries), 2)
+
+    def test_rebuilding_index(self):
+        """Rebuilding index reads all files again"""
+        self.index.get_summaries()
+        self.index.rebuild()
+        summaries = self.index.get_summaries()
+        self.assertEqual(len(summaries), 2)
+
+    def test_summaries_in_batches(self):
+        """Indexed summaries are returned first, then changed issues in batches"""
+        changed = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+        self.index.get_summaries()
+        os.utime(self._issue_file(changed), ns=(1, 1))
+        batches = list(self.index.iter_summaries(batch_size=1))
+        self.assertEqual(len(batches), 2)
+        self.assertNotIn(changed, batches[0])
+        self.assertEqual(list(batches[1]), [changed])
+
+    def test_stopping_batches_early(self):
+        """Batches already read are kept in the index if iteration is stopped"""
+        read = []
+        read_issues_bulk = self.model.read_issues_bulk
+        self.model.read_issues_bulk = lambda identifiers: (read.extend(identifiers) or
+                                                           read_issues_bulk(identifiers))
+        for _ in self.index.iter_summaries(batch_size=1):
+            break
+        self.assertEqual(len(read), 1)
+        self.assertEqual(len(self.index.get_summaries()), 2)
+        self.assertEqual(len(read), 2)
+
+    def test_summaries_in_another_thread(self):
+        """Index can be updated in another thread"""
+        batches = []
+        thread = threading.Thread(target=lambda: batches.extend(self.index.iter_summaries()))
+        thread.start()
+        thread.join()
+        self.assertEqual(sum(len(batch) for batch in batches), 2)
+        self.assertEqual(len(self.index.get_summaries()), 2)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(IssueIndexTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
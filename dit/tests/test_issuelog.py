@@ -0,0 +1,103 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for issuelog.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import testlib
+from issuelog import IssueLog                   # pylint: disable=F0401
+from common.items import LogEntry               # pylint: disable=F0401
+
+
+class IssueLogTests(unittest.TestCase):
+    """Unit tests for IssueLog."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.log = IssueLog(os.path.join(self.temp_dir, 'issue-1.log'))
+        self.entries = [
+            LogEntry(datetime(2015, 6, 2, 17, 15, 42, 355226, tzinfo=timezone.utc),
+                     "Beyonce Bugger <bb@lightningmail.com>", 'created', ''),
+            LogEntry(datetime(2015, 6, 3, 8, 0, tzinfo=timezone.utc),
+                     "Tester", 'commented', "Two lines,\n\"quoted\" and ünicode"),
+        ]
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_missing_log(self):
+        """A missing log has no entries"""
+        self.assertFalse(self.log.exists())
+        self.assertEqual(self.log.read(), ([], None))
+        self.assertEqual(self.log.count_entries(), (0, None))
+        self.assertIsNone(self.log.get_size())
+        self.log.remove()
+
+    def test_appending_entries(self):
+        """Appended entries are read back in order, one line each"""
+        size = self.log.append(self.entries[:1])
+        self.assertEqual(self.log.append(self.entries[1:]), self.log.get_size())
+        self.assertLess(size, self.log.get_size())
+        entries, size = self.log.read()
+        self.assertEqual(entries, self.entries)
+        self.assertIsInstance(entries[1], LogEntry)
+        self.assertEqual(size, self.log.get_size())
+        self.assertEqual(self.log.count_entries(), (2, size))
+        with open(self.log.path) as stream:
+            self.assertEqual(len(stream.readlines()), 2)
+
+    def test_incomplete_entry(self):
+        """An interrupted append is ignored and overwritten by the next one"""
+        self.log.write(self.entries[:1])
+        with open(self.log.path, 'a') as stream:
+            stream.write('["2015-06-03T08:00:00+00:00", "Tes')
+        self.assertEqual(self.log.read()[0], self.entries[:1])
+        self.assertEqual(self.log.count_entries()[0], 1)
+        self.log.append(self.entries[1:], sync=True)
+        self.assertEqual(self.log.read()[0], self.entries)
+
+    def test_reading_last_entry(self):
+        """Last complete entry is read from the end of the file"""
+        self.assertIsNone(self.log.read_last_entry())
+        self.log.append(self.entries)
+        with open(self.log.path, 'a') as stream:
+            stream.write('["2015-06-03T08:00:00+00:00", "Tes')
+        self.log.TAIL_SIZE = 8
+        self.assertEqual(self.log.read_last_entry(), list(self.entries[1]))
+        self.log.write(self.entries[:1])
+        self.assertEqual(self.log.read_last_entry(), list(self.entries[0]))
+        self.log.write([])
+        self.assertIsNone(self.log.read_last_entry())
+
+    def test_replacing_entries(self):
+        """Write replaces the whole log"""
+        self.log.append(self.entries)
+        self.log.write(self.entries[1:])
+        self.assertEqual(self.log.read()[0], self.entries[1:])
+        self.log.remove()
+        self.assertFalse(self.log.exists())
+
+    def test_removing_start_of_log(self):
+        """Entries after the removed part are kept"""
+        size = self.log.append(self.entries[:1])
+        self.log.append(self.entries[1:])
+        self.log.remove_start(size)
+        self.assertEqual(self.log.read()[0], self.entries[1:])
+        self.log.remove_start(self.log.get_size())
+        self.assertFalse(self.log.exists())
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(IssueLogTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -9,11 +9,14 @@ import unittest
 import re
 from datetime import datetime
 import os
+import shutil
+import tempfile
+import threading
 
 import testlib
 import issuemodel                               # pylint: disable=F0401
 from common.errors import ApplicationError      # pylint: disable=F0401
-from common.items import DitIssue               # pylint: disable=F0401
+from common.items import DitIssue, IssueSummary # pylint: disable=F0401
 
 
 class IssueYamlObjectTests(unittest.TestCase):
@@ -109,10 +112,27 @@ class IssueYamlObjectTests(unittest.TestCase):
 
 
 class IssueModelTests(unittest.TestCase):
-    """Unit tests for IssueModel."""
+    """
+    Unit tests for IssueModel.
+
+    A copy of the issues in data/bugs is used,
+    so the issue files can be modified.
+    """
     def setUp(self):
         self.out = testlib.NullWriter()
-        self.model = issuemodel.IssueModel("data/bugs/")
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.temp_dir, 'cache')
+        self.issue_dir = os.path.join(self.temp_dir, 'bugs')
+        shutil.copytree('data/bugs', self.issue_dir)
+        self.model = issuemodel.IssueModel(self.issue_dir)
+
+    def tearDown(self):
+        if self.original_cache is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.original_cache
+        shutil.rmtree(self.temp_dir)
 
     def test_listening_issue_identifiers(self):
         """List identifiers of issues found"""
@@ -125,6 +145,49 @@ class IssueModelTests(unittest.TestCase):
         self.assertIsNotNone(re.match(r'[a-f0-9]{40}', identifiers[0]))
         self.assertNotEqual(identifiers[0], identifiers[1])
 
+    def test_reading_issues_bulk(self):
+        """Read summaries of many issues serially and in parallel"""
+        identifiers = self.model.list_issue_identifiers() * 30
+        serial = self.model.read_issues_bulk(identifiers)
+        self.assertEqual(len(serial), len(identifiers))
+        for identifier, summary in zip(identifiers, serial):
+            self.assertIsInstance(summary, IssueSummary)
+            self.assertEqual(summary.identifier, identifier)
+
+        self.model.workers = 2
+        self.model.parallel_threshold = 0
+        parallel = self.model.read_issues_bulk(identifiers)
+        self.assertEqual(parallel, serial)
+
+    def test_reading_issues_bulk_in_thread(self):
+        """Read many issues in parallel from a thread, without forking it"""
+        identifiers = self.model.list_issue_identifiers() * 50
+        serial = [self.model.read_issue_summary(identifier) for identifier in identifiers]
+        self.model.workers = 2
+        self.model.parallel_threshold = 0
+        context = issuemodel._get_process_context()         # pylint: disable=W0212
+        self.assertNotEqual(context.get_start_method(), 'fork')
+
+        def read_serially(identifier):
+            raise AssertionError("Issues were not read by worker processes")
+
+        # workers have their own models, reading in this process fails
+        self.model.read_issue_summary = read_serially
+        results = []
+        thread = threading.Thread(
+                target=lambda: results.append(self.model.read_issues_bulk(identifiers)))
+        thread.start()
+        thread.join()
+        self.assertEqual(results, [serial])
+
+    def test_reading_nonexistent_issues_bulk(self):
+        """Try to read many issues when one of them doesn't exist"""
+        identifiers = self.model.list_issue_identifiers() * 50
+        identifiers.append(self.model.generate_new_identifier())
+        self.model.workers = 2
+        self.model.parallel_threshold = 0
+        self.assertRaises(ApplicationError, self.model.read_issues_bulk, identifiers)
+
     def test_generating_identifiers(self):
         """Generate issue identifiers"""
         identifiers = []
@@ -180,6 +243,211 @@ class IssueModelTests(unittest.TestCase):
         except Exception:
             self.fail("Removing issue file failed")
 
+    def test_writing_issues_bulk(self):
+        """Write many issues serially and in parallel"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            model = issuemodel.IssueModel(temp_dir)
+            created = datetime.strptime("2015-06-03 16:06:19.950025", "%Y-%m-%d %H:%M:%S.%f")
+            issues = [issuemodel.IssueYamlObject.from_dit_issue(issuemodel.DitIssue(
+                    "Issue {}".format(i), None, 'task', 'unittest', 'unstarted', None,
+                    "Description", "A tester <mail@address.com>", created, None, None,
+                    '{:040x}'.format(i), None)) for i in range(20)]
+            results = model.write_issues_bulk(issues[:10])
+            self.assertEqual([error for _, error in results], [None] * 10)
+            self.assertEqual(results[0][0], model.read_issue(issues[0].id).version)
+
+            model.workers = 2
+            model.parallel_write_threshold = 0
+            results = model.write_issues_bulk(issues[10:])
+            self.assertEqual([error for _, error in results], [None] * 10)
+            self.assertEqual(sorted(model.list_issue_identifiers()),
+                             [issue.id for issue in issues])
+            self.assertEqual(model.read_issue(issues[15].id).title, "Issue 15")
+
+            # a failing issue doesn't stop the others
+            issues[3].id = "missing/{:040x}".format(3)
+            errors = [error for _, error in model.write_issues_bulk(issues)]
+            self.assertIsNotNone(errors[3])
+            self.assertEqual(errors[:3] + errors[4:], [None] * 19)
+
+            # issues changed since the given versions are not written
+            versions = [version for version, _ in model.write_issues_bulk(issues[:2])]
+            versions[1] = "0" * 40
+            errors = [error for _, error in model.write_issues_bulk(issues[:2], versions)]
+            self.assertEqual(errors, [None, model.STALE_ERROR])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_writing_with_durability_modes(self):
+        """Write issues in every durability mode, without leaving temporary files"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            created = datetime.strptime("2015-06-03 16:06:19.950025", "%Y-%m-%d %H:%M:%S.%f")
+            for i, durability in enumerate(['none', 'file', 'batch']):
+                model = issuemodel.IssueModel(temp_dir, durability=durability)
+                issues = [issuemodel.IssueYamlObject.from_dit_issue(issuemodel.DitIssue(
+                        "Issue {}".format(j), None, 'task', 'unittest', 'unstarted', None,
+                        "Description", "A tester <mail@address.com>", created, None, None,
+                        '{:040x}'.format(j), None)) for j in range(i * 3, i * 3 + 3)]
+                model.write_issue_yaml(issues[0])
+                self.assertEqual([error for _, error in model.write_issues_bulk(issues[1:])],
+                                 [None, None])
+            self.assertEqual(len(model.list_issue_identifiers()), 9)
+            self.assertEqual(len(set(os.listdir(temp_dir)) - {'.locks'}), 9)
+        finally:
+            shutil.rmtree(temp_dir)
+        self.assertRaises(ApplicationError, issuemodel.IssueModel, "data/bugs/",
+                          durability='sometimes')
+
+    def test_writing_changed_issue(self):
+        """Apply a change again, if the issue file has been changed since it was read"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            shutil.copy("data/bugs/issue-e50d0e38b19c1ff0e9b696ffe919435d26477975.yaml",
+                        temp_dir)
+            model = issuemodel.IssueModel(temp_dir)
+            identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+            first = model.read_issue(identifier)
+            second = model.read_issue(identifier)
+            self.assertEqual(first.version, second.version)
+
+            change = lambda issue: issue.add_log_entry(None, 'commented', 'tester', 'first')
+            change(first)
+            self.assertIs(model.write_issue(first, change), first)
+            self.assertNotEqual(first.version, second.version)
+
+            second.title = "Changed title"
+            self.assertRaises(ApplicationError, model.write_issue, second)
+            second.add_log_entry(None, 'commented', 'tester', 'second')
+            written = model.write_issue(second, lambda issue: issue.add_log_entry(
+                    None, 'commented', 'tester', 'second'))
+            self.assertIsNot(written, second)
+            issue = model.read_issue(identifier)
+            self.assertEqual(issue.version, written.version)
+            self.assertEqual([entry.comment for entry in issue.log[1:]], ['first', 'second'])
+            self.assertEqual(issue.title, "A test issue")
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_separate_logs(self):
+        """Write logs to separate log files and back to issue files"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+            shutil.copy("data/bugs/issue-{}.yaml".format(identifier), temp_dir)
+            issue_file = os.path.join(temp_dir, "issue-{}.yaml".format(identifier))
+            model = issuemodel.IssueModel(temp_dir, separate_logs=True)
+            log = model.get_issue_log(identifier)
+
+            # the log is moved to the log file
+            issue = model.read_issue(identifier)
+            issue.add_log_entry(None, 'commented', 'tester', 'first')
+            model.write_issue(issue)
+            self.assertEqual(model.read_issue_yaml(identifier).log_events, [])
+            self.assertEqual(log.count_entries()[0], 2)
+            self.assertEqual(model.read_issue(identifier).version, issue.version)
+
+            # only new entries are appended, unchanged issue file is not written
+            stat = os.stat(issue_file)
+            issue.add_log_entry(None, 'commented', 'tester', 'second')
+            model.write_issue(issue)
+            model.append_log_entries(identifier, issue.log[-1:])
+            self.assertEqual(os.stat(issue_file).st_mtime_ns, stat.st_mtime_ns)
+            issue = model.read_issue(identifier)
+            self.assertEqual([entry.comment for entry in issue.log[1:]],
+                             ['first', 'second', 'second'])
+            self.assertEqual(len(model.get_issue_version(identifier)), 4)
+            self.assertEqual(model.list_issue_identifiers(), [identifier])
+
+            # the log is merged back to the issue file
+            model.separate_logs = False
+            model.write_issue(issue)
+            self.assertFalse(log.exists())
+            self.assertEqual(len(model.read_issue_yaml(identifier).log_events), 4)
+            self.assertEqual(model.read_issue(identifier).log, issue.log)
+
+            self.assertRaises(ApplicationError, issuemodel.IssueModel(
+                    temp_dir, separate_logs=True).append_log_entries,
+                    model.generate_new_identifier(), issue.log[-1:])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_reading_last_change_time(self):
+        """Time of the last log event is read from the issue file, log file or pack"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+            shutil.copy("data/bugs/issue-{}.yaml".format(identifier), temp_dir)
+            model = issuemodel.IssueModel(temp_dir, separate_logs=True)
+            self.assertEqual(model.read_last_change_time(identifier),
+                             model.read_issue(identifier).log[-1].timestamp)
+
+            issue = model.read_issue(identifier)
+            issue.add_log_entry(None, 'commented', 'tester', "A comment\n- - with a dash")
+            model.write_issue(issue)
+            self.assertEqual(model.read_last_change_time(identifier), issue.log[-1].timestamp)
+
+            model.separate_logs = False
+            issue.add_log_entry(None, 'commented', 'tester', "Another\n- - comment")
+            model.write_issue(issue)
+            model.pack_issues([identifier])
+            self.assertEqual(model.read_last_change_time(identifier), issue.log[-1].timestamp)
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_packing_issues(self):
+        """Packed issues are read and listed like issue files"""
+        temp_dir = tempfile.mkdtemp()
+        try:
+            identifier = 'e50d0e38b19c1ff0e9b696ffe919435d26477975'
+            shutil.copy("data/bugs/issue-{}.yaml".format(identifier), temp_dir)
+            issue_file = os.path.join(temp_dir, "issue-{}.yaml".format(identifier))
+            model = issuemodel.IssueModel(temp_dir, separate_logs=True)
+            issue = model.read_issue(identifier)
+            model.append_log_entries(identifier, issue.log[:1])
+            issue = model.read_issue(identifier)
+
+            self.assertEqual(model.pack_issues([identifier]), 1)
+            self.assertFalse(os.path.exists(issue_file))
+            self.assertFalse(model.get_issue_log(identifier).exists())
+            self.assertEqual(model.list_issue_identifiers(), [identifier])
+            self.assertEqual(model.get_issue_version(identifier)[0], -1)
+            self.assertEqual(model.read_issue(identifier).log, issue.log)
+            self.assertEqual(model.read_issue_summary(identifier).title, issue.title)
+            self.assertEqual(model.read_issue_yaml(identifier).id, identifier)
+            self.assertEqual(model.pack_issues([identifier]), 0)
+
+            # appending to a packed issue and packing it again
+            model.append_log_entries(identifier, issue.log[:1])
+            self.assertEqual(len(model.read_issue(identifier).log), len(issue.log) + 1)
+            self.assertEqual(model.pack_issues([identifier]), 1)
+            self.assertFalse(model.get_issue_log(identifier).exists())
+            issue = model.read_issue(identifier)
+
+            # a written issue file is read instead of the pack
+            issue.title = "Changed"
+            model.write_issue(issue)
+            self.assertTrue(os.path.exists(issue_file))
+            self.assertEqual(model.read_issue(identifier).title, "Changed")
+            self.assertEqual(model.read_issue(identifier).log, issue.log)
+            self.assertEqual(model.list_issue_identifiers(), [identifier])
+
+            # the issue is left out of the pack if it is not packed again
+            model.pack_issues([])
+            self.assertFalse(model.pack.contains(identifier))
+            model.pack_issues([identifier])
+            model.unpack_issues([identifier])
+            self.assertFalse(model.pack.contains(identifier))
+            self.assertEqual(model.read_issue(identifier).title, "Changed")
+
+            model.pack_issues([identifier])
+            model.remove_issue_yaml(identifier)
+            self.assertEqual(model.list_issue_identifiers(), [])
+            self.assertRaises(ApplicationError, model.read_issue, identifier)
+        finally:
+            shutil.rmtree(temp_dir)
+
     def test_removing_issue_yaml(self):
         """Try to remove a issue .yaml file"""
         identifier = "TEMPORARY_TO_BE_REMOVED"
@@ -201,11 +469,16 @@ class IssueModelTests(unittest.TestCase):
             self.fail("Unknown exception raised")
 
         self.assertFalse(os.path.exists(issue_file))
+        # lock files of removed issues are removed too
+        self.assertNotIn('{}.lock'.format(identifier),
+                         os.listdir(os.path.join(self.issue_dir, '.locks')))
 
     def test_removing_unexistent_issue_yaml(self):
         """Try to remove a issue .yaml file that does not exist"""
         identifier = self.model.generate_new_identifier()
         self.assertRaises(ApplicationError, self.model.remove_issue_yaml, identifier)
+        self.assertNotIn('{}.lock'.format(identifier),
+                         os.listdir(os.path.join(self.issue_dir, '.locks')))
 
 
 def suite():
@@ -0,0 +1,82 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for issuepack.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+
+import testlib
+from issuepack import IssuePack                 # pylint: disable=F0401
+
+
+class IssuePackTests(unittest.TestCase):
+    """Unit tests for IssuePack."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.pack = IssuePack(self.temp_dir)
+        self.texts = {'a' * 40: "--- first\n", 'b' * 40: "--- ünicode\n", 'c' * 40: "--- third\n"}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def pack_files(self):
+        """Get names of the pack files in the directory."""
+        return [name for name in os.listdir(self.temp_dir) if name.endswith('.pack')]
+
+    def test_missing_pack(self):
+        """A directory without a pack has no packed issues"""
+        self.assertEqual(self.pack.get_identifiers(), [])
+        self.assertFalse(self.pack.contains('a' * 40))
+        self.assertIsNone(self.pack.read_text('a' * 40))
+        self.assertEqual(self.pack.remove(['a' * 40]), 0)
+
+    def test_writing_and_reading(self):
+        """Packed issues are read back, also by another reader"""
+        self.assertEqual(self.pack.write(self.texts.items()), 3)
+        other = IssuePack(self.temp_dir)
+        self.assertEqual(sorted(other.get_identifiers()), sorted(self.texts))
+        for identifier, text in self.texts.items():
+            self.assertEqual(other.read_text(identifier), text)
+        self.assertEqual(dict(other.iter_texts(['c' * 40, 'd' * 40])), {'c' * 40: "--- third\n"})
+        self.assertEqual(len(self.pack_files()), 1)
+
+        # versions are kept when the pack is rewritten
+        stats = other.get_file_stats()
+        del self.texts['a' * 40]
+        self.pack.write(self.texts.items())
+        self.assertEqual(other.get_file_stats(), {identifier: stats[identifier]
+                                                  for identifier in self.texts})
+        self.assertIsNone(other.read_text('a' * 40))
+        self.assertEqual(len(self.pack_files()), 1)
+
+    def test_removing_issues(self):
+        """Removed issues are left out of the index"""
+        self.pack.write(self.texts.items())
+        self.assertEqual(self.pack.remove(['a' * 40, 'd' * 40]), 1)
+        self.assertFalse(IssuePack(self.temp_dir).contains('a' * 40))
+        self.assertEqual(self.pack.read_text('b' * 40), "--- ünicode\n")
+        self.assertEqual(self.pack.remove(['b' * 40, 'c' * 40]), 2)
+        self.assertEqual(os.listdir(self.temp_dir), [])
+
+    def test_corrupted_pack(self):
+        """Changed content of a pack is detected"""
+        self.pack.write(self.texts.items())
+        with open(os.path.join(self.temp_dir, self.pack_files()[0]), 'r+b') as stream:
+            stream.write(b'!')
+        self.assertRaises(ValueError, self.pack.read_text, 'a' * 40)
+
+
+def suite():
+    """Test suite"""
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(IssuePackTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
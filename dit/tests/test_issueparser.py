@@ -0,0 +1,251 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for issueparser.py
+"""
+
+import unittest
+import os
+import random
+import shutil
+import tempfile
+from datetime import datetime, timezone
+import yaml
+
+import testlib
+import issuemodel                               # pylint: disable=F0401
+from issueparser import IssueParser, IssueParserError  # pylint: disable=F0401
+from yamlconfig import YamlConfig               # pylint: disable=F0401
+from common.items import DitIssue               # pylint: disable=F0401
+
+
+HEADER = "--- !dit.random.org,2008-03-06/issue\n"
+
+FIELDS = """title: A title
+desc: a description
+type: :bugfix
+component: testing_project
+release:
+reporter: A tester <mail@address.com>
+status: :unstarted
+disposition:
+creation_time: 2015-06-02 17:15:34.123211 Z
+references: []
+id: abcd1234
+"""
+
+
+class IssueParserTests(unittest.TestCase):
+    """
+    Unit tests for IssueParser.
+
+    Everything is parsed also with PyYAML, the results must be identical.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.parser = IssueParser()
+        YamlConfig.add_representers()
+
+    def _assert_same_as_yaml(self, text):
+        expected = yaml.load(text, Loader=yaml.Loader)
+        self.assertIsInstance(expected, issuemodel.IssueYamlObject)
+        self.assertEqual(self.parser.parse(text), vars(expected))
+
+    def _random_text(self, rnd):
+        parts = ['word', ' ', '  ', '\n', '\n\n', ': ', ' #', '- ', '"', "'", '\\', '\t',
+                 'ü', '€', '1', '1.0', 'true', 'null', '&x', '*x', '|', '>', '[]', '{}',
+                 '---', '...', '2015-01-01', 'x' * 40]
+        return ''.join(rnd.choice(parts) for _ in range(rnd.randint(0, 12)))
+
+    def test_parsing_test_data(self):
+        """Parse all issue files in test data"""
+        model = issuemodel.IssueModel('data/bugs')
+        for identifier in model.list_issue_identifiers():
+            with open('data/bugs/issue-{}.yaml'.format(identifier), 'r') as stream:
+                self._assert_same_as_yaml(stream.read())
+
+    def test_parsing_written_issues(self):
+        """Parse generated issues written with both YAML dumpers"""
+        rnd = random.Random(2008)
+        for _ in range(200):
+            created = datetime.now(timezone.utc)
+            log = [[rnd.choice([created, datetime(2015, 6, 2, tzinfo=timezone.utc)]),
+                    self._random_text(rnd), 'commented', self._random_text(rnd)]
+                   for _ in range(rnd.randint(0, 3))]
+            issue = DitIssue(self._random_text(rnd), 'x', 'task', self._random_text(rnd),
+                    'in progress', rnd.choice([None, 'fixed']), self._random_text(rnd),
+                    self._random_text(rnd), created, rnd.choice([None, '1.0', 'v2']),
+                    [self._random_text(rnd)], 'abcd1234', log)
+            data = issuemodel.IssueYamlObject.from_dit_issue(issue)
+            for dumper in YamlConfig.get_dumpers():
+                self._assert_same_as_yaml(YamlConfig.dump(data, dumper,
+                        default_flow_style=False, explicit_start=True))
+
+    def test_block_scalars(self):
+        """Parse literal block scalars with different chomping and indentation"""
+        for header in ('|', '|-', '|+', '|2', '|2-', '|-2', '|+2'):
+            for body in ('  a\n  b\n', '  a\n\n   b\n\n\n', '\n  a\n', '   a\n  \n', ''):
+                text = HEADER + FIELDS + "log_events: []\ndesc2: x\n"
+                text = text.replace("desc: a description\n", "desc: {}\n{}".format(header, body))
+                text = text.replace("desc2: x\n", "")
+                self._assert_same_as_yaml(text)
+
+    def test_quoted_scalars(self):
+        """Parse quoted scalars spanning several lines"""
+        for value in ('"a\n  b\n\n  c"', '"a \\\n  b"', '"\\xFC\\u20AC\\t\\""',
+                      "'it''s\n  folded'", "''"):
+            text = HEADER + FIELDS.replace("a description", value) + "log_events: []\n"
+            self._assert_same_as_yaml(text)
+
+    def test_log_events(self):
+        """Parse log events with anchors and aliases"""
+        text = HEADER + FIELDS.replace("creation_time: 2015", "creation_time: &id001 2015")
+        text += ("log_events:\n"
+                 "- - *id001\n"
+                 "  - A tester <mail@address.com>\n"
+                 "  - created\n"
+                 "  - ''\n"
+                 "- - 2015-06-03 10:00:00+00:00\n"
+                 "  - A tester <mail@address.com>\n"
+                 "  - commented\n"
+                 "  - |\n"
+                 "    multi\n"
+                 "    line\n")
+        self._assert_same_as_yaml(text)
+        data = self.parser.parse(text)
+        self.assertIs(data['log_events'][0][0], data['creation_time'])
+
+    def test_parsing_summary_keys(self):
+        """Parse only some of the keys"""
+        keys = issuemodel.IssueModel.SUMMARY_KEYS
+        texts = [HEADER + FIELDS + "log_events: []\n"]
+        for name in os.listdir('data/bugs'):
+            if name.startswith('issue-'):
+                with open(os.path.join('data/bugs', name), 'r') as stream:
+                    texts.append(stream.read())
+        for text in texts:
+            data = self.parser.parse(text)
+            self.assertEqual(self.parser.parse(text, keys),
+                             dict((key, data[key]) for key in keys))
+
+    def test_summary_skips_log(self):
+        """Log events are not parsed when reading a summary"""
+        text = HEADER + FIELDS + "log_events:\n- - {unsupported: flow mapping}\n"
+        self.assertRaises(IssueParserError, self.parser.parse, text)
+        data = self.parser.parse(text, issuemodel.IssueModel.SUMMARY_KEYS)
+        self.assertEqual(data['title'], 'A title')
+        self.assertNotIn('log_events', data)
+        self.assertNotIn('desc', data)
+
+    def test_summary_with_sorted_keys(self):
+        """Summary is read also when log events are not the last item"""
+        text = HEADER + ("component: testing_project\n"
+                         "creation_time: 2015-06-02 17:15:34.123211 Z\n"
+                         "desc: a description\n"
+                         "disposition: ''\n"
+                         "id: abcd1234\n"
+                         "log_events:\n"
+                         "- - 2015-06-03 10:00:00+00:00\n"
+                         "  - A tester <mail@address.com>\n"
+                         "  - created\n"
+                         "  - ''\n"
+                         "references: []\n"
+                         "release: null\n"
+                         "reporter: A tester <mail@address.com>\n"
+                         "status: :unstarted\n"
+                         "title: A title\n"
+                         "type: :bugfix\n")
+        data = self.parser.parse(text, ['title', 'type'])
+        self.assertEqual(data, {'title': 'A title', 'type': ':bugfix'})
+
+    def test_unsupported_documents(self):
+        """Documents outside the supported subset are rejected"""
+        documents = [
+            HEADER + FIELDS + "log_events: []\nextra: value\n",
+            HEADER + FIELDS.replace("a description", ">\n  folded") + "log_events: []\n",
+            HEADER + FIELDS.replace("a description", "a\n  continued") + "log_events: []\n",
+            HEADER + FIELDS + "# a comment\nlog_events: []\n",
+            HEADER + FIELDS + "log_events: {}\n",
+            HEADER + FIELDS,
+            "--- !dit.random.org,2008-03-06/project\nname: x\n",
+            "title: no tag\n",
+        ]
+        for text in documents:
+            self.assertRaises(IssueParserError, self.parser.parse, text)
+
+
+class ReadingIssueTests(unittest.TestCase):
+    """
+    Unit tests for reading issues with IssueModel using the parser.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.temp_dir, 'cache')
+        self.model = issuemodel.IssueModel(self.temp_dir)
+
+    def tearDown(self):
+        if self.original_cache is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.original_cache
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, text):
+        with open(os.path.join(self.temp_dir, 'issue-abcd1234.yaml'), 'w') as stream:
+            stream.write(text)
+
+    def test_reading_issue(self):
+        """Read an issue as DitIssue"""
+        self._write(HEADER + FIELDS + "log_events: []\n")
+        issue = self.model.read_issue('abcd1234')
+        self.assertIsInstance(issue, DitIssue)
+        self.assertEqual(issue.title, 'A title')
+        self.assertEqual(issue.issue_type, 'bugfix')
+        self.assertEqual(issue.status, 'unstarted')
+        self.assertIsNone(issue.release)
+
+    def test_log_is_written_last(self):
+        """Log events are the last item in written issue files"""
+        self._write(HEADER + FIELDS + "log_events: []\n")
+        issue = issuemodel.IssueYamlObject.from_dit_issue(self.model.read_issue('abcd1234'))
+        self.model.write_issue_yaml(issue)
+        with open(os.path.join(self.temp_dir, 'issue-abcd1234.yaml'), 'r') as stream:
+            lines = stream.read().splitlines()
+        self.assertEqual(lines[1], 'title: A title')
+        self.assertEqual(lines[-1], 'log_events: []')
+
+    def test_reading_summary(self):
+        """Read an issue summary without parsing the log"""
+        self._write(HEADER + FIELDS.replace(":unstarted", ":in_progress") +
+                    "log_events:\n- - {unsupported: flow mapping}\n")
+        summary = self.model.read_issue_summary('abcd1234')
+        self.assertEqual(summary.identifier, 'abcd1234')
+        self.assertEqual(summary.status, 'in progress')
+        self.assertIsNone(summary.release)
+        self.assertEqual(summary.created.year, 2015)
+
+    def test_fallback_to_yaml(self):
+        """Issues not supported by the parser are read with PyYAML"""
+        self._write(HEADER + "# a comment\n" +
+                    FIELDS.replace("a description", ">\n  folded\n  text") +
+                    "log_events: []\n")
+        issue = self.model.read_issue('abcd1234')
+        self.assertEqual(issue.description, 'folded text\n')
+
+    def test_invalid_issue(self):
+        """Reading an invalid issue raises ApplicationError"""
+        self._write(HEADER + "title: [unterminated\n")
+        self.assertRaises(issuemodel.ApplicationError, self.model.read_issue, 'abcd1234')
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(IssueParserTests))
+    testsuite.addTest(unittest.makeSuite(ReadingIssueTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
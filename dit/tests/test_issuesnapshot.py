@@ -0,0 +1,117 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for issuesnapshot.py
+"""
+
+import unittest
+import os
+import shutil
+import tempfile
+import datetime
+
+import testlib
+from issuesnapshot import IssueSnapshot         # pylint: disable=F0401
+from common.items import IssueSummary           # pylint: disable=F0401
+
+
+class IssueSnapshotTests(unittest.TestCase):
+    """Unit tests for IssueSnapshot."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'snapshot.bin')
+        self.fingerprint = (1, 2, 3)
+        helsinki = datetime.timezone(datetime.timedelta(hours=2))
+        self.summaries = [
+            IssueSummary('c' * 40, "First", 'unstarted', 'v1.0', 'gui',
+                         datetime.datetime(2013, 1, 5, 10, 20, 30, 123456)),
+            IssueSummary('a' * 40, "Ünicode", 'closed', 'v1.0', '',
+                         datetime.datetime(2014, 2, 6, 11, 0, tzinfo=helsinki)),
+            IssueSummary('b' * 40, "Third", 'unstarted', None, None,
+                         datetime.datetime(2015, 3, 7, tzinfo=datetime.timezone.utc)),
+        ]
+        self.file_stats = {summary.identifier: (i * 10, i + 100)
+                           for i, summary in enumerate(self.summaries)}
+        # an issue with a log file
+        self.file_stats['a' * 40] += (5, 0)
+        self.snapshot = None
+
+    def tearDown(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+        shutil.rmtree(self.temp_dir)
+
+    def write_and_open(self):
+        """Write the summaries to a snapshot and open it."""
+        IssueSnapshot.write(self.path, self.fingerprint, self.summaries, self.file_stats, 8)
+        self.snapshot = IssueSnapshot.open(self.path, self.fingerprint)
+        self.assertIsNotNone(self.snapshot)
+        return self.snapshot
+
+    def test_reading_summaries(self):
+        """Summaries are read back as they were written"""
+        snapshot = self.write_and_open()
+        self.assertEqual(len(snapshot), 3)
+        self.assertEqual(snapshot.name_max_len, 8)
+        for position, summary in enumerate(self.summaries):
+            read = snapshot.get_summary(position)
+            self.assertEqual(read, summary)
+            self.assertEqual(read.created.utcoffset(), summary.created.utcoffset())
+        self.assertEqual(snapshot.get_file_stats(), self.file_stats)
+
+    def test_finding_issues(self):
+        """Issues are found by their identifier"""
+        snapshot = self.write_and_open()
+        for position, summary in enumerate(self.summaries):
+            self.assertEqual(snapshot.find(summary.identifier), position)
+        self.assertIsNone(snapshot.find('d' * 40))
+        self.assertIsNone(snapshot.find('not-a-hash'))
+        self.assertIsNone(snapshot.find(None))
+
+    def test_selecting_issues_of_release(self):
+        """Issues of a release are selected without reading all fields"""
+        snapshot = self.write_and_open()
+        self.assertEqual(snapshot.select('v1.0'), [0, 1])
+        self.assertEqual(snapshot.select('v1.0', False, 'closed'), [0])
+        self.assertEqual(snapshot.select(None), [2])
+        self.assertEqual(snapshot.select('v2.0'), [])
+
+    def test_invalid_snapshots(self):
+        """Snapshots of other fingerprints and invalid files are not opened"""
+        self.assertIsNone(IssueSnapshot.open(self.path, self.fingerprint))
+        IssueSnapshot.write(self.path, self.fingerprint, self.summaries, self.file_stats, 8)
+        self.assertIsNone(IssueSnapshot.open(self.path, (1, 2, 4)))
+        with open(self.path, 'ab') as stream:
+            stream.write(b'\0')
+        self.assertIsNone(IssueSnapshot.open(self.path, self.fingerprint))
+        with open(self.path, 'wb') as stream:
+            stream.write(b'DITSNAP')
+        self.assertIsNone(IssueSnapshot.open(self.path, self.fingerprint))
+
+    def test_unsupported_issues(self):
+        """Issues that can't be stored in a snapshot are not written"""
+        self.summaries[0] = self.summaries[0]._replace(identifier='abc')
+        self.assertRaises(ValueError, IssueSnapshot.write, self.path, self.fingerprint,
+                          self.summaries, self.file_stats, 8)
+        self.assertFalse(os.path.exists(self.path))
+
+    def test_empty_snapshot(self):
+        """A snapshot without issues can be written and read"""
+        self.summaries = []
+        snapshot = self.write_and_open()
+        self.assertEqual(len(snapshot), 0)
+        self.assertEqual(snapshot.select(None), [])
+        self.assertIsNone(snapshot.find('a' * 40))
+        self.assertEqual(snapshot.get_file_stats(), {})
+
+
+def suite():
+    """Test suite"""
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(IssueSnapshotTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
@@ -9,11 +9,17 @@ import unittest
 import re
 import string                                       # pylint: disable=W0402
 import random
+import os
+import shutil
+import tempfile
 from datetime import datetime, timedelta
 
 import testlib
 import itemcache                                    # pylint: disable=F0401
+import issuemodel                                   # pylint: disable=F0401
 from common.items import DitIssue, DitRelease     # pylint: disable=F0401
+from common.items import IssueSummary               # pylint: disable=F0401
+from issuesnapshot import IssueSnapshot             # pylint: disable=F0401
 
 class ItemCacheTests(unittest.TestCase):
     """Unit test for ItemCache.
@@ -402,14 +408,213 @@ class ItemCacheTests(unittest.TestCase):
         self.assertIsNotNone(re.match(r'^(issue-\d+)$', self.cache.issues[-1].name))
         self.assertIsNotNone(re.match(r'^(lolz-\d+)$', self.cache.issues[-2].name))
 
+    def test_getting_issue_by_name(self):
+        """Get issues by name after renaming them"""
+        self.fill_cache_with_some_data(10, 0)
+        self.cache.rename_issues()
+        for issue in self.cache.issues:
+            self.assertIs(self.cache.get_issue(issue.name), issue)
+            self.assertIs(self.cache.get_issue(issue.identifier), issue)
+        self.assertIsNone(self.cache.get_issue(self.cache.issues[0].identifier[:20]))
+
+    def test_updating_issue(self):
+        """Release and status indexes follow changes in cached issues"""
+        self.fill_cache_with_some_data(10, 0)
+        issue = self.create_random_issue(release='old_release')
+        self.assertTrue(self.cache.add_issue(issue))
+        self.assertEqual(self.cache.get_issues_by_release('old_release'), [issue])
+
+        issue.release = 'new_release'
+        issue.status = 'closed'
+        self.assertTrue(self.cache.update_issue(issue))
+        self.assertEqual(self.cache.get_issues_by_release('old_release'), [])
+        self.assertEqual(self.cache.get_issues_by_release('new_release'), [])
+        self.assertEqual(self.cache.get_issues_by_release('new_release', True), [issue])
+        self.assertEqual(self.cache.get_issues_by_status('closed'), [issue])
+        self.assertNotIn(issue, self.cache.get_issues_by_status('unstarted'))
+
+        # issues not in cache are not updated
+        self.assertFalse(self.cache.update_issue(self.create_random_issue()))
+
+    def test_replacing_issue(self):
+        """Replacing a cached issue keeps its name and updates indexes"""
+        issue = self.create_random_issue(release='rel')
+        issue.name = 'unittest-1'
+        self.assertTrue(self.cache.add_issue(issue))
+        new_issue = self.create_random_issue(release='other_rel')
+        new_issue.identifier = issue.identifier
+        self.assertTrue(self.cache.add_issue(new_issue))
+        self.assertEqual(self.cache.issue_count(), 1)
+        self.assertEqual(new_issue.name, 'unittest-1')
+        self.assertIs(self.cache.get_issue('unittest-1'), new_issue)
+        self.assertEqual(self.cache.get_issues_by_release('rel'), [])
+        self.assertEqual(self.cache.get_issues_by_release('other_rel'), [new_issue])
+
+    def test_issues_by_release_in_cache_order(self):
+        """Issues of a release are listed in cache order after sorting"""
+        for _ in range(20):
+            self.cache.add_issue(self.create_random_issue(release='rel'))
+        self.cache.issues[-1].created = datetime(2000, 1, 1)
+        self.cache.sort_issues()
+        self.assertEqual(self.cache.get_issues_by_release('rel'), self.cache.issues)
+
+    def test_interning_issue_fields(self):
+        """Indexed fields of cached issues are shared"""
+        first = self.create_random_issue(release='v1.0')
+        second = self.create_random_issue(release='v1.0')
+        second.status = ''.join(['un', 'started'])
+        second.release = ''.join(['v1', '.0'])
+        self.assertTrue(self.cache.add_issue(first))
+        self.assertTrue(self.cache.add_issue(second))
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.release, second.release)
+        self.assertIs(first.component, second.component)
+
+    def test_issues_by_release_without_closed(self):
+        """Closed issues are left out also when status is set later"""
+        issues = [self.create_random_issue(release='v1.0') for _ in range(3)]
+        for issue in issues:
+            self.assertTrue(self.cache.add_issue(issue))
+        issues[1].status = ''.join(['clo', 'sed'])
+        self.assertTrue(self.cache.update_issue(issues[1]))
+        self.assertEqual(self.cache.get_issues_by_release('v1.0'), [issues[0], issues[2]])
+        self.assertEqual(len(self.cache.get_issues_by_release('v1.0', True)), 3)
+
+    def test_adding_new_issue(self):
+        """New issues are named without renaming others, unless created earlier"""
+        self.fill_cache_with_some_data(5, 0)
+        self.cache.sort_issues(rename=True)
+        names = [issue.name for issue in self.cache.issues]
+        issue = self.create_random_issue()
+        issue.created = datetime.now() + timedelta(days=1)
+        self.assertTrue(self.cache.add_new_issue(issue))
+        self.assertEqual(issue.name, 'unittest-6')
+        self.assertIs(self.cache.get_issue('unittest-6'), issue)
+        self.assertEqual([issue.name for issue in self.cache.issues[:5]], names)
+        older = self.create_random_issue()
+        older.created = datetime.now() - timedelta(days=1)
+        self.assertTrue(self.cache.add_new_issue(older))
+        self.assertEqual(older.name, 'unittest-1')
+        self.assertEqual(issue.name, 'unittest-7')
+        self.assertIs(self.cache.get_issue('unittest-7'), issue)
+
+    def load_snapshot_of_cache(self, temp_dir):
+        """Write issues of the cache to a snapshot and load the cache from it."""
+        path = os.path.join(temp_dir, 'snapshot.bin')
+        summaries = [IssueSummary(issue.identifier, issue.title, issue.status, issue.release,
+                                  issue.component, issue.created)
+                     for issue in self.cache.issues]
+        file_stats = dict.fromkeys((issue.identifier for issue in self.cache.issues), (0, 0))
+        IssueSnapshot.write(path, (0,), summaries, file_stats,
+                            self.cache.get_issue_name_max_len())
+        snapshot = IssueSnapshot.open(path, (0,))
+        self.addCleanup(snapshot.close)
+        self.cache.load_snapshot(snapshot)
+        return summaries
+
+    def test_loading_snapshot(self):
+        """Issues are created from a snapshot only when needed"""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        for i in range(5):
+            issue = self.create_random_issue(release='v1.0' if i % 2 else 'v2.0')
+            issue.identifier = '{:040x}'.format(random.getrandbits(160))
+            issue.component = 'gui' if i else ''
+            issue.created = datetime(2015, 1, 1) + timedelta(days=i)
+            self.assertTrue(self.cache.add_issue(issue))
+        self.cache.issues[4].status = 'closed'
+        self.cache.sort_issues(rename=True)
+        names = [issue.name for issue in self.cache.issues]
+        max_len = self.cache.get_issue_name_max_len()
+        summaries = self.load_snapshot_of_cache(temp_dir)
+
+        self.assertTrue(self.cache.is_snapshot_loaded())
+        self.assertEqual(self.cache.issue_count(), 5)
+        self.assertEqual(self.cache.get_issue_name_max_len(), max_len)
+        issue = self.cache.get_issue(summaries[3].identifier)
+        self.assertEqual(issue.name, names[3])
+        self.assertIs(self.cache.get_issue(names[3]), issue)
+        self.assertEqual(issue.title, summaries[3].title)
+        self.assertIsNone(self.cache.get_issue('gui-6'))
+        self.assertIsNone(self.cache.get_issue('issue-2'))
+        self.assertEqual([issue.name for issue in self.cache.get_issues_by_release('v2.0')],
+                         [names[0], names[2]])
+        self.assertEqual(len(self.cache.get_issues_by_release('v2.0', True)), 3)
+        self.assertTrue(self.cache.is_snapshot_loaded())
+
+        # other operations create all issues
+        self.assertEqual([issue.name for issue in self.cache.issues], names)
+        self.assertFalse(self.cache.is_snapshot_loaded())
+        self.assertIs(self.cache.get_issue(names[3]), issue)
+        self.assertEqual(len(self.cache.get_issues_by_status('unstarted')), 4)
+
     #def test_sorting_releases(self):
     #    self.cache.sort_releases()
     #    self.fail("Not implemented")
 
 
+class ValuePoolTests(unittest.TestCase):
+    """Unit tests for ValuePool, and reading issues through it."""
+    ISSUE = ("--- !dit.random.org,2008-03-06/issue\n"
+             "title: A title\n"
+             "desc: a description\n"
+             "type: :bugfix\n"
+             "component: testing_project\n"
+             "release:\n"
+             "reporter: A tester <mail@address.com>\n"
+             "status: :unstarted\n"
+             "disposition:\n"
+             "creation_time: 2015-06-02 17:15:34.123211 Z\n"
+             "references: []\n"
+             "id: abcd1234\n")
+
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.temp_dir = tempfile.mkdtemp()
+        self.original_cache = os.environ.get('XDG_CACHE_HOME')
+        os.environ['XDG_CACHE_HOME'] = os.path.join(self.temp_dir, 'cache')
+        self.model = issuemodel.IssueModel(self.temp_dir)
+
+    def tearDown(self):
+        if self.original_cache is None:
+            del os.environ['XDG_CACHE_HOME']
+        else:
+            os.environ['XDG_CACHE_HOME'] = self.original_cache
+        shutil.rmtree(self.temp_dir)
+
+    def test_value_pool_statistics(self):
+        """Value pool counts lookups and hits"""
+        pool = itemcache.ValuePool()
+        values = pool.get_statistics()['values']
+        self.assertIs(pool.intern(''.join(['clo', 'sed'])), 'closed')
+        self.assertIsNone(pool.intern(None))
+        value = pool.intern(''.join(['new', ' value']))
+        self.assertIs(pool.intern('new value'), value)
+        self.assertEqual(pool.get_statistics(),
+                         {'values': values + 1, 'lookups': 3, 'hits': 2})
+
+    def test_reading_with_value_pool(self):
+        """Repeated fields of read issues are interned through the value pool"""
+        self.model.value_pool = itemcache.ValuePool()
+        for text in (self.ISSUE + "log_events:\n- - 2015-06-03 10:00:00+00:00\n"
+                     "  - A tester <mail@address.com>\n  - created\n  - ''\n",
+                     self.ISSUE.replace("title:", "# a comment\ntitle:") +
+                     "log_events: []\n"):
+            with open(os.path.join(self.temp_dir, 'issue-abcd1234.yaml'), 'w') as stream:
+                stream.write(text)
+            issue = self.model.read_issue('abcd1234')
+            self.assertIs(issue.status, 'unstarted')
+            self.assertIs(issue.issue_type, 'bugfix')
+            self.assertIs(issue.component, self.model.value_pool.intern('testing_project'))
+            self.assertIs(issue.creator, self.model.value_pool.intern(issue.creator))
+        issue = self.model.read_issue('abcd1234')
+        self.assertIs(issue.creator, self.model.read_issue('abcd1234').creator)
+
+
 def suite():
     testsuite = unittest.TestSuite()
     testsuite.addTest(unittest.makeSuite(ItemCacheTests))
+    testsuite.addTest(unittest.makeSuite(ValuePoolTests))
     return testsuite
 
 if __name__ == '__main__':
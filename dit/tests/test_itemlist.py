@@ -0,0 +1,139 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for itemlist.py
+"""
+
+import unittest
+import random
+from datetime import datetime
+
+import testlib
+from itemlist import ItemList                   # pylint: disable=F0401
+from common.items import DitIssue, DitRelease   # pylint: disable=F0401
+
+
+class ItemListTests(unittest.TestCase):
+    """
+    Unit tests for ItemList.
+
+    Changes are applied also to a list of keys like a view
+    would apply them, only using the information in the changes.
+    """
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.rows = ItemList()
+        self.view = []
+        self.changed = []
+
+    def create_issue(self, number, status='unstarted'):
+        """Create an issue to use for testing."""
+        return DitIssue('Issue {}'.format(number), 'test-{}'.format(number), 'task', 'test',
+                status, None, 'A description', 'A tester', datetime.now(), None, None,
+                '{:040x}'.format(number), None)
+
+    def update(self, items):
+        """Update the rows and the view, and check they are the same."""
+        changes = self.rows.diff(items)
+        for change in changes:
+            if change.action == ItemList.RESET:
+                self.view = [row[0] for row in change.rows]
+            elif change.action == ItemList.REMOVE:
+                del self.view[change.first:change.last + 1]
+            elif change.action == ItemList.INSERT:
+                self.assertEqual(change.last - change.first + 1, len(change.rows))
+                self.view[change.first:change.first] = [row[0] for row in change.rows]
+            else:
+                self.assertEqual(self.view[change.first:change.last + 1],
+                                 [row[0] for row in change.rows])
+                self.changed.extend(row[0] for row in change.rows)
+            self.rows.apply(change)
+        self.assertEqual(self.view, [self.rows._keys[row]
+                                     for row in range(self.rows.row_count())])
+        expected = [item for item in items]
+        shown = [self.rows.get_item(row) for row in range(self.rows.row_count())]
+        self.assertEqual([item for item in shown if item is not None], expected)
+        return changes
+
+    def test_rows_and_text(self):
+        """Rows contain releases, issues and spacers"""
+        items = [DitRelease('v1.0', 'Release'), self.create_issue(1),
+                 DitRelease('Unassigned'), self.create_issue(10)]
+        self.update(items)
+        self.assertTrue(self.rows.set_name_width(7))
+        self.assertFalse(self.rows.set_name_width(7))
+        self.assertEqual([self.rows.get_text(row) for row in range(self.rows.row_count())],
+                         ['Release v1.0', 'test-1  Issue 1', '', 'Unassigned',
+                          'test-10 Issue 10'])
+        self.assertIsNone(self.rows.get_item(2))
+        self.assertEqual(self.rows.find_row('{:040x}'.format(10)), 4)
+        self.assertEqual(self.rows.find_row(('release', 'Unassigned')), 3)
+        self.assertIsNone(self.rows.find_row('unknown'))
+
+    def test_changed_rows_only(self):
+        """Only rows added, removed or shown differently are changed"""
+        issues = [self.create_issue(i) for i in range(100)]
+        self.update([DitRelease('Unassigned')] + issues)
+        issues[10] = self.create_issue(10, 'paused')
+        issues[11] = self.create_issue(11)
+        del issues[50]
+        issues.insert(70, self.create_issue(1000))
+        changes = self.update([DitRelease('Unassigned')] + issues)
+        self.assertEqual(sorted(change.action for change in changes),
+                         [ItemList.CHANGE, ItemList.INSERT, ItemList.REMOVE])
+        self.assertEqual(self.changed, ['{:040x}'.format(10)])
+        self.assertIs(self.rows.get_item(12), issues[11])
+        self.assertEqual(self.update([DitRelease('Unassigned')] + issues), [])
+
+    def test_random_changes(self):
+        """Rows stay the same as the items after random changes"""
+        rnd = random.Random(2015)
+        items = []
+        number = 0
+        for _ in range(200):
+            for _ in range(rnd.randint(1, 5)):
+                action = rnd.random()
+                if action < 0.4 or not items:
+                    number += 1
+                    if rnd.random() < 0.2:
+                        item = DitRelease('v{}'.format(number), 'Release')
+                    else:
+                        item = self.create_issue(number)
+                    items.insert(rnd.randint(0, len(items)), item)
+                elif action < 0.7:
+                    del items[rnd.randrange(len(items))]
+                elif action < 0.85:
+                    i = rnd.randrange(len(items))
+                    items.insert(rnd.randint(0, len(items) - 1), items.pop(i))
+                else:
+                    i = rnd.randrange(len(items))
+                    if isinstance(items[i], DitIssue):
+                        items[i] = self.create_issue(int(items[i].identifier, 16),
+                                                     rnd.choice(['paused', 'closed']))
+            self.update(list(items))
+
+    def test_large_changes_reset(self):
+        """List is replaced when too many rows have changed"""
+        issues = [self.create_issue(i) for i in range(2 * ItemList.MAX_CHANGES + 10)]
+        self.update(issues)
+        issues.reverse()
+        changes = self.update(list(issues))
+        self.assertLessEqual(len(changes), 4)
+        swapped = []
+        for i in range(0, len(issues), 2):
+            swapped.extend(reversed(issues[i:i + 2]))
+        changes = self.update(swapped)
+        self.assertEqual([change.action for change in changes], [ItemList.RESET])
+        changes = self.update([])
+        self.assertEqual([change.action for change in changes], [ItemList.REMOVE])
+        self.assertEqual(self.rows.row_count(), 0)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(ItemListTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
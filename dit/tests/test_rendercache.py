@@ -0,0 +1,113 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for rendercache.py
+"""
+
+import unittest
+from datetime import datetime, timedelta, timezone
+
+import testlib
+from rendercache import RenderCache             # pylint: disable=F0401
+from common.items import DitIssue, LogEntry     # pylint: disable=F0401
+from common.utils.time import human_time_diffs  # pylint: disable=F0401
+
+
+class CountingIssue(DitIssue):
+    """A DitIssue counting how many times it is rendered."""
+    __slots__ = ('renders',)
+
+    def toHtml(self, format_times=None):
+        self.renders += 1
+        return super(CountingIssue, self).toHtml(format_times)
+
+
+class RenderCacheTests(unittest.TestCase):
+    """Unit tests for RenderCache."""
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        self.now = datetime(2015, 6, 2, 12, 0, 0, tzinfo=timezone.utc)
+        self.cache = RenderCache(size=3)
+
+    def create_issue(self, identifier, description='A description'):
+        """Create an issue with a couple of log entries."""
+        created = self.now - timedelta(days=3)
+        log = [LogEntry(created, 'A tester', 'created', ''),
+               LogEntry(created + timedelta(hours=1), 'A tester', 'commented', 'A comment')]
+        issue = CountingIssue('A test issue', 'test-1', 'bugfix', 'unittest', 'unstarted',
+                None, description, 'A tester', created, None, [], identifier, log)
+        issue.renders = 0
+        return issue
+
+    def test_rendering_once(self):
+        """Cached issue is rendered only once"""
+        issue = self.create_issue('a')
+        html = self.cache.render_html('a', (1, 100), issue, self.now)
+        self.assertEqual(html, issue.toHtml(lambda times: [
+                '3 days' if time == issue.created else '2 days 23 hours' for time in times]))
+        self.assertEqual(self.cache.get_html('a', (1, 100), self.now), html)
+        self.assertEqual(issue.renders, 2)
+
+    def test_changed_version(self):
+        """Cached issue is not used if the version is different"""
+        issue = self.create_issue('a')
+        self.cache.render_html('a', (1, 100), issue, self.now)
+        self.assertIsNone(self.cache.get_html('a', (2, 100), self.now))
+        self.assertIsNone(self.cache.get_html('b', (1, 100), self.now))
+
+    def test_refreshing_relative_times(self):
+        """Relative times are counted again when a cached issue is used"""
+        issue = self.create_issue('a')
+        self.cache.render_html('a', (1, 100), issue, self.now)
+        later = self.now + timedelta(days=30)
+        self.assertEqual(self.cache.get_html('a', (1, 100), later),
+                         issue.toHtml(lambda times: human_time_diffs(times, now=later)))
+        self.assertEqual(issue.renders, 2)
+
+    def test_least_recently_used_are_removed(self):
+        """Least recently used issues are removed when the cache is full"""
+        for identifier in 'abc':
+            self.cache.render_html(identifier, 1, self.create_issue(identifier), self.now)
+        self.assertIsNotNone(self.cache.get_html('a', 1))
+        self.cache.render_html('d', 1, self.create_issue('d'), self.now)
+        self.assertEqual(self.cache.item_count(), 3)
+        self.assertIsNone(self.cache.get_html('b', 1))
+        self.assertIsNotNone(self.cache.get_html('a', 1))
+        self.cache.set_size(1)
+        self.assertEqual(self.cache.item_count(), 1)
+        self.assertIsNotNone(self.cache.get_html('a', 1))
+
+    def test_disabled_cache(self):
+        """Nothing is cached if size is zero"""
+        self.cache.set_size(0)
+        self.assertIsNotNone(self.cache.render_html('a', 1, self.create_issue('a'), self.now))
+        self.assertEqual(self.cache.item_count(), 0)
+
+    def test_marker_in_content(self):
+        """Issues containing the time marker are rendered but not cached"""
+        issue = self.create_issue('a', 'A \x00 description')
+        self.cache.render_html('a', 1, self.create_issue('a'), self.now)
+        html = self.cache.render_html('a', 2, issue, self.now)
+        self.assertIn('A \x00 description', html)
+        self.assertIn('3 days', html)
+        self.assertIsNone(self.cache.get_html('a', 1))
+        self.assertIsNone(self.cache.get_html('a', 2))
+
+    def test_removing(self):
+        """Issues can be removed from the cache"""
+        self.cache.render_html('a', 1, self.create_issue('a'), self.now)
+        self.assertTrue(self.cache.remove('a'))
+        self.assertFalse(self.cache.remove('a'))
+        self.cache.render_html('a', 1, self.create_issue('a'), self.now)
+        self.cache.clear()
+        self.assertEqual(self.cache.item_count(), 0)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(RenderCacheTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
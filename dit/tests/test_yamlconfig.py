@@ -0,0 +1,127 @@
+#! /usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+A unit test for yamlconfig.py
+"""
+
+import unittest
+import os
+import yaml
+
+import testlib
+import issuemodel                               # pylint: disable=F0401
+import config                                   # pylint: disable=F0401
+from yamlconfig import YamlConfig               # pylint: disable=F0401
+
+
+class YamlConfigTests(unittest.TestCase):
+    """
+    Unit tests for YamlConfig.
+
+    Everything loaded and dumped with the LibYAML based loader and dumper
+    must be identical to what the pure Python versions produce.
+    """
+    data_dir = 'data/bugs'
+
+    def setUp(self):
+        self.out = testlib.NullWriter()
+        if YamlConfig.Loader is yaml.Loader:
+            self.skipTest("LibYAML is not available")
+        YamlConfig.add_representers()
+
+    def _data_files(self):
+        return sorted(os.path.join(self.data_dir, name)
+                      for name in os.listdir(self.data_dir) if name.endswith('.yaml'))
+
+    def _read(self, path):
+        with open(path, 'r') as stream:
+            return stream.read()
+
+    def _assert_same_data(self, first, second):
+        self.assertIs(type(first), type(second))
+        if isinstance(first, list):
+            self.assertEqual(len(first), len(second))
+            for first_item, second_item in zip(first, second):
+                self._assert_same_data(first_item, second_item)
+        elif isinstance(first, yaml.YAMLObject):
+            self.assertEqual(sorted(vars(first)), sorted(vars(second)))
+            for key in vars(first):
+                self._assert_same_data(getattr(first, key), getattr(second, key))
+        else:
+            self.assertEqual(first, second)
+
+    def test_selected_classes(self):
+        """LibYAML classes are used when available"""
+        self.assertIs(YamlConfig.Loader, yaml.CLoader)
+        self.assertIs(YamlConfig.Dumper, yaml.CDumper)
+
+    def test_loading_files(self):
+        """Data loaded with LibYAML is identical to pure Python loader"""
+        for path in self._data_files():
+            text = self._read(path)
+            expected = YamlConfig.load(text, yaml.Loader)
+            data = YamlConfig.load(text)
+            self._assert_same_data(expected, data)
+
+    def test_loading_from_stream(self):
+        """Documents can be loaded from an open file"""
+        path = self._data_files()[0]
+        with open(path, 'r') as stream:
+            data = YamlConfig.load(stream)
+        self.assertIsInstance(data, issuemodel.IssueYamlObject)
+
+    def test_dumping_issues(self):
+        """Issues are dumped byte for byte identically"""
+        model = issuemodel.IssueModel(self.data_dir)
+        for identifier in model.list_issue_identifiers():
+            issue = model.read_issue_yaml(identifier)
+            expected = YamlConfig.dump(issue, yaml.Dumper,
+                                       default_flow_style=False, explicit_start=True)
+            data = YamlConfig.dump(issue, default_flow_style=False, explicit_start=True)
+            self.assertEqual(data, expected)
+
+    def test_dumping_project(self):
+        """Project data is dumped byte for byte identically"""
+        project = YamlConfig.load(self._read(os.path.join(self.data_dir, 'project.yaml')))
+        self.assertIsInstance(project, config.DitProjectYaml)
+        expected = YamlConfig.dump(project, yaml.Dumper, default_flow_style=False)
+        data = YamlConfig.dump(project, default_flow_style=False)
+        self.assertEqual(data, expected)
+
+    def test_round_trip(self):
+        """Dumped issues are loaded back unchanged"""
+        model = issuemodel.IssueModel(self.data_dir)
+        for identifier in model.list_issue_identifiers():
+            issue = model.read_issue_yaml(identifier)
+            text = YamlConfig.dump(issue, default_flow_style=False, explicit_start=True)
+            self._assert_same_data(YamlConfig.load(text, yaml.Loader), YamlConfig.load(text))
+            self._assert_same_data(issue, YamlConfig.load(text))
+
+    def test_tag_in_description(self):
+        """Tag like text in a block scalar is not modified"""
+        text = ("--- !dit.random.org,2008-03-06/issue\n"
+                "desc: |-\n"
+                "  !dit.random.org,2008-03-06/issue\n"
+                "  - !dit.random.org,2008-03-06/release\n"
+                "title: a title\n")
+        data = YamlConfig.load(text)
+        self.assertEqual(data.desc, "!dit.random.org,2008-03-06/issue\n"
+                                    "- !dit.random.org,2008-03-06/release")
+
+    def test_fallback_to_python_loader(self):
+        """Documents not supported by LibYAML are loaded with pure Python loader"""
+        text = ("releases:\n"
+                "  - !dit.random.org,2008-03-06/release\n"
+                "    name: v1.0\n")
+        data = YamlConfig.load(text)
+        self.assertIsInstance(data['releases'][0], config.DitReleaseYaml)
+
+
+def suite():
+    testsuite = unittest.TestSuite()
+    testsuite.addTest(unittest.makeSuite(YamlConfigTests))
+    return testsuite
+
+if __name__ == '__main__':
+    testlib.parse_arguments_and_run_tests(suite)
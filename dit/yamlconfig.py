@@ -2,13 +2,33 @@
 # -*- coding: utf-8 -*-
 
 import datetime
+import re
 import yaml
 
 
 class YamlConfig(object):
     """
     YAML library configuration/extension
+
+    The C based LibYAML loader and dumper are used, when PyYAML
+    has been built with LibYAML support. Otherwise the pure Python
+    implementations are used. Custom tags and representers are
+    registered to both, so the results are the same.
     """
+    if getattr(yaml, '__with_libyaml__', False):
+        Loader = yaml.CLoader
+        Dumper = yaml.CDumper
+    else:
+        Loader = yaml.Loader
+        Dumper = yaml.Dumper
+
+    # LibYAML doesn't accept a comma in a tag shorthand, like the one in
+    # dit tags, but it accepts the same tag in the verbatim form.
+    # Only tags at the beginning of a line are rewritten, as those can't
+    # be part of a scalar value.
+    DIT_TAG_REGEXP = re.compile(r'^((?:--- |- )?)!(dit\.random\.org,2008-03-06/\w+)(?=[ \t]*$)',
+                                re.M)
+
     def __init__(self):
         """
         Initialize YamlConfig instance
@@ -16,17 +36,106 @@ class YamlConfig(object):
         if isinstance(self, YamlConfig):
             raise Exception("YamlConfig should not be instantiated")
 
+    @staticmethod
+    def get_dumpers():
+        """
+        Get all dumper classes used by the application.
+
+        Returns:
+        - list of dumper classes
+        """
+        dumpers = [yaml.Dumper]
+        if YamlConfig.Dumper not in dumpers:
+            dumpers.append(YamlConfig.Dumper)
+        return dumpers
+
+    @staticmethod
+    def get_loaders():
+        """
+        Get all loader classes used by the application.
+
+        Returns:
+        - list of loader classes
+        """
+        loaders = [yaml.Loader]
+        if YamlConfig.Loader not in loaders:
+            loaders.append(YamlConfig.Loader)
+        return loaders
+
     @staticmethod
     def add_representers():
         """
         Add new representers for PyYaml library
         """
-        yaml.add_representer(str, YamlConfig.represent_str)
+        for dumper in YamlConfig.get_dumpers():
+            dumper.add_representer(str, YamlConfig.represent_str)
 
         # Custom DateTimee representer has been disabled
         # and proper DateTime format will be used from now on
         #yaml.add_representer(datetime.datetime, YamlConfig.represent_datetime)
 
+    @staticmethod
+    def register_yaml_object(cls):
+        """
+        Register a YAMLObject class to all loaders and dumpers.
+
+        PyYAML registers YAMLObject classes only to the pure Python
+        loaders and dumper.
+
+        Parameters:
+        - cls: a YAMLObject subclass with a yaml_tag
+        """
+        for loader in YamlConfig.get_loaders():
+            loader.add_constructor(cls.yaml_tag, cls.from_yaml)
+        for dumper in YamlConfig.get_dumpers():
+            dumper.add_representer(cls, cls.to_yaml)
+        return cls
+
+    @staticmethod
+    def load(stream, loader=None):
+        """
+        Load a YAML document.
+
+        Parameters:
+        - stream: a string or an open file to read the document from
+        - loader: (optional) loader class to use, fastest available by default
+
+        Returns:
+        - loaded data
+        """
+        if loader is None:
+            loader = YamlConfig.Loader
+        if loader is yaml.Loader:
+            return yaml.load(stream, Loader=loader)
+
+        if hasattr(stream, 'read'):
+            stream = stream.read()
+        if isinstance(stream, bytes):
+            stream = stream.decode('utf-8')
+        try:
+            return yaml.load(YamlConfig.DIT_TAG_REGEXP.sub(r'\1!<!\2>', stream),
+                             Loader=loader)
+        except yaml.YAMLError:
+            # not supported by LibYAML, use the pure Python loader
+            return yaml.load(stream, Loader=yaml.Loader)
+
+    @staticmethod
+    def dump(data, dumper=None, **kwargs):
+        """
+        Dump data as a YAML document.
+
+        Parameters:
+        - data: data to dump
+        - dumper: (optional) dumper class to use, fastest available by default
+        - kwargs: other options passed to yaml.dump
+
+        Returns:
+        - YAML document as a string
+        """
+        if dumper is None:
+            dumper = YamlConfig.Dumper
+        return yaml.dump(data, Dumper=dumper, **kwargs)
+
     @staticmethod
     def represent_str(dumper, data):
         tag = None